@@ -0,0 +1,497 @@
+"""
+Offline end-to-end benchmark
+Runs process_all_pending over a synthetic memo corpus against local stand-ins
+for Whisper, Claude and Google Calendar, and saves throughput, per-stage
+latency and peak memory as JSON so runs can be compared
+With --fast-path-only, measures the local rule-based extractor on its own
+"""
+from src.stub_servers import StubWhisperServer, StubClaudeServer, StubCalendarServer, TRANSCRIPT_TAG
+from src.service_context import ServiceContext
+from src.fast_path import RuleBasedExtractor
+from src.metrics import enable_metrics
+from contextlib import redirect_stdout
+from collections import defaultdict
+from datetime import datetime
+import process_icloud
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import struct
+import sys
+import tempfile
+import time
+
+RESULTS_FOLDER = os.path.join("benchmarks", "results")
+
+# Seconds of silence in each synthetic recording (16 kHz mono 16-bit PCM)
+AUDIO_SECONDS = 1.0
+SAMPLE_RATE = 16000
+
+# Building blocks for synthetic memos
+TASKS = [
+    "buy milk", "pick up groceries", "order printer paper", "call the dentist",
+    "book a checkup with the doctor", "pay the electricity bill", "transfer money for rent",
+    "fix the leaky faucet", "do the laundry", "call mom", "pick up the kids from school",
+    "email the client about the proposal", "finish the quarterly report",
+    "prepare slides for the team meeting", "read that book on design", "book a flight to Denver",
+    "renew my passport", "plan dinner with Alex", "go to the gym", "reply to Sam's email",
+]
+DATES = [
+    None, "tomorrow", "today", "on Friday", "on Monday at 3pm", "next week", "tonight",
+    "tomorrow morning", "in 3 days", "by Thursday",
+]
+# Hedged phrasing the fast path leaves to Claude
+HEDGES = [
+    "maybe", "if there's time", "unless it rains", "actually", "depending on the budget",
+]
+
+DEFAULT_MEMOS = 100
+DEFAULT_COMPLEX_SHARE = 0.5
+
+# Labelled memos for --fast-path-only: the expected category (a list for
+# memos with several tasks), or None for memos the fast path must leave to Claude
+FAST_PATH_SAMPLES = [
+    ("Buy milk tomorrow", 'shopping'),
+    ("Call the dentist on Monday", 'health'),
+    ("I need to buy groceries tomorrow - milk, eggs, bread, and coffee. "
+     "Also remind me to call the dentist on Monday to schedule a cleaning. "
+     "And I should email Sarah about the project update by end of week.", ['emails', 'health', 'shopping']),
+    ("Pay the electricity bill by Friday", 'finance'),
+    ("Remind me to fix the leaky faucet this weekend", 'home'),
+    ("Book flights to Denver next week", 'travel'),
+    ("Email the client the quarterly report by Thursday at 3pm", 'emails'),
+    ("Gym session tomorrow morning", 'health'),
+    ("Read that book Sam recommended", 'learning'),
+    ("Birthday party for Sarah on Saturday at 7pm", 'social'),
+    ("Call mom tonight", 'family'),
+    ("If the meeting moves, maybe reschedule lunch with Alex or cancel it?", None),
+    ("Think about whether we should switch insurance providers or wait until next year", None),
+    ("Renew my passport in 3 days", 'travel'),
+    ("Urgent: submit the tax forms tomorrow", 'finance'),
+    # Words with several senses; a confident answer here would be a guess
+    ("Run errands tomorrow", None),
+    ("Run the dishwasher tonight", None),
+    ("Book a car wash on Friday", None),
+    ("Call Sonia tomorrow", 'calls'),
+    ("Ring the taxi company", 'calls'),
+]
+
+
+def generate_corpus(count, seed=0, complex_share=DEFAULT_COMPLEX_SHARE):
+    """
+    Build synthetic memo transcripts
+
+    Args:
+        count (int): Number of memos
+        seed (int): Random seed, so runs see the same corpus
+        complex_share (float): Fraction of memos worded so the fast path
+            passes them on to Claude
+
+    Returns:
+        list: Transcript strings
+    """
+    rng = random.Random(seed)
+    memos = []
+    for _ in range(count):
+        clauses = []
+        for task in rng.sample(TASKS, rng.randint(1, 4)):
+            date = rng.choice(DATES)
+            clauses.append(f"{task} {date}" if date else task)
+        text = ". ".join(clause[:1].upper() + clause[1:] for clause in clauses) + "."
+        if rng.random() < complex_share:
+            text = f"{text} {rng.choice(HEDGES).capitalize()} I should also {rng.choice(TASKS)}."
+        memos.append(text)
+    return memos
+
+
+def synthetic_wav(transcript, memo_id, seconds=AUDIO_SECONDS):
+    """
+    A silent WAV file whose extra chunk carries its transcript for StubWhisperServer
+
+    The memo id is stored too, so memos with the same text still hash differently.
+
+    Returns:
+        bytes: File contents
+    """
+    samples = b'\0' * (int(SAMPLE_RATE * seconds) * 2)
+    note = TRANSCRIPT_TAG + transcript.encode('utf-8') + b'\0' + memo_id.encode('ascii')
+    if len(note) % 2:
+        note += b'\0'
+    chunks = (
+        b'fmt ' + struct.pack('<IHHIIHH', 16, 1, 1, SAMPLE_RATE, SAMPLE_RATE * 2, 2, 16)
+        + b'data' + struct.pack('<I', len(samples)) + samples
+        + b'stub' + struct.pack('<I', len(note)) + note
+    )
+    return b'RIFF' + struct.pack('<I', 4 + len(chunks)) + b'WAVE' + chunks
+
+
+def write_corpus(memos, folder, seconds=AUDIO_SECONDS):
+    """Write one synthetic recording per memo into folder"""
+    os.makedirs(folder, exist_ok=True)
+    width = len(str(len(memos)))
+    for index, text in enumerate(memos):
+        memo_id = f"memo_{index:0{width}d}"
+        with open(os.path.join(folder, f"{memo_id}.wav"), 'wb') as f:
+            f.write(synthetic_wav(text, memo_id, seconds))
+
+
+def _percentile(ordered, q):
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, int(round(q * len(ordered))) - 1))]
+
+
+def _latency_summary(values):
+    ordered = sorted(values)
+    return {
+        'count': len(ordered),
+        'mean': sum(ordered) / len(ordered) if ordered else 0.0,
+        'p50': _percentile(ordered, 0.50),
+        'p95': _percentile(ordered, 0.95),
+        'p99': _percentile(ordered, 0.99),
+        'max': ordered[-1] if ordered else 0.0,
+    }
+
+
+def summarize_trace(trace_path):
+    """
+    Per-stage and per-memo latency from a trace file
+
+    Args:
+        trace_path (str): JSONL spans written by the metrics registry
+
+    Returns:
+        tuple: (stage name -> latency summary, summary of first span start
+            to last span end for each memo)
+    """
+    durations = defaultdict(list)
+    bounds = {}
+    if os.path.exists(trace_path):
+        with open(trace_path, encoding='utf-8') as f:
+            for line in f:
+                span = json.loads(line)
+                durations[span['name']].append(span['duration'])
+                start, end = span['start'], span['start'] + span['duration']
+                first, last = bounds.get(span['trace_id'], (start, end))
+                bounds[span['trace_id']] = (min(first, start), max(last, end))
+
+    stages = {name: _latency_summary(values) for name, values in sorted(durations.items())}
+    return stages, _latency_summary([end - start for start, end in bounds.values()])
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process so far, in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _counter(snapshot, name):
+    return sum(sample['value'] for sample in snapshot['counters'] if sample['name'] == name)
+
+
+def run_benchmark(memos=DEFAULT_MEMOS, seed=0, complex_share=DEFAULT_COMPLEX_SHARE,
+                  whisper_latency=0.2, claude_latency=0.5, calendar_latency=0.05,
+                  jitter=0.0, error_rate=0.0, rate_limits=False, fast_path=True,
+                  workdir=None, verbose=False, **pipeline_options):
+    """
+    Process a synthetic corpus end to end against stub servers
+
+    Args:
+        memos (int): Corpus size
+        seed (int): Corpus random seed
+        complex_share (float): Fraction of memos the fast path cannot answer
+        whisper_latency (float): Seconds per Whisper request
+        claude_latency (float): Seconds per Claude request
+        calendar_latency (float): Seconds per Calendar request
+        jitter (float): Extra random delay of up to this many seconds per request
+        error_rate (float): Fraction of requests that fail with a 429
+        rate_limits (bool): Keep the client-side rate limits (off by default,
+            since the stubs do not enforce any)
+        fast_path (bool): Answer simple memos locally
+        workdir (str): Folder for the corpus, outputs and state (a
+            temporary folder, removed afterwards, if omitted)
+        verbose (bool): Show the pipeline's own progress output
+        **pipeline_options: Worker and queue limits passed to process_files()
+
+    Returns:
+        dict: Configuration and results of the run
+    """
+    config = {
+        'memos': memos, 'seed': seed, 'complex_share': complex_share,
+        'whisper_latency': whisper_latency, 'claude_latency': claude_latency,
+        'calendar_latency': calendar_latency, 'jitter': jitter, 'error_rate': error_rate,
+        'rate_limits': rate_limits, 'fast_path': fast_path,
+    }
+    config.update(pipeline_options)
+
+    cleanup = workdir is None
+    workdir = workdir or tempfile.mkdtemp(prefix="voice-memo-bench-")
+    stub_options = {'jitter': jitter, 'error_rate': error_rate}
+    whisper = StubWhisperServer(latency=whisper_latency, **stub_options).start()
+    claude = StubClaudeServer(latency=claude_latency, **stub_options).start()
+    calendar = StubCalendarServer(latency=calendar_latency, **stub_options).start()
+    context = None
+
+    try:
+        process_icloud.INPUT_FOLDER = os.path.join(workdir, "input")
+        process_icloud.OUTPUT_FOLDER = os.path.join(workdir, "output")
+        write_corpus(generate_corpus(memos, seed, complex_share), process_icloud.INPUT_FOLDER)
+
+        os.environ.update({
+            'TRANSCRIPTION_BACKEND': 'http',
+            'TRANSCRIPTION_URL': f"{whisper.url}/v1",
+            'ANTHROPIC_BASE_URL': claude.url,
+            'CLAUDE_API_KEY': 'stub',
+        })
+        if not rate_limits:
+            for name in ('WHISPER_RPM', 'CLAUDE_RPM', 'CLAUDE_TPM', 'CALENDAR_RPM'):
+                os.environ[f"RATE_LIMIT_{name}"] = '0'
+
+        trace_path = os.path.join(workdir, "trace.jsonl")
+        metrics = enable_metrics(trace_path=trace_path)
+        # Caches are off so every memo takes the full cold path
+        context = ServiceContext(transcription_cache=False, categorization_cache=False,
+                                 ledger_path=os.path.join(workdir, "ledger.sqlite3"),
+                                 event_index_path=os.path.join(workdir, "event_index.sqlite3"),
+                                 fast_path=fast_path,
+                                 calendar_service_factory=calendar.build_service)
+        process_icloud.set_default_context(context)
+
+        with open(os.devnull, 'w') as devnull, redirect_stdout(sys.stdout if verbose else devnull):
+            started = time.perf_counter()
+            process_icloud.process_all_pending(**pipeline_options)
+            elapsed = time.perf_counter() - started
+
+        succeeded = len(os.listdir(process_icloud.OUTPUT_FOLDER))
+        stages, memo_latency = summarize_trace(trace_path)
+        snapshot = metrics.snapshot()
+        return {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'config': config,
+            'succeeded': succeeded,
+            'failed': memos - succeeded,
+            'elapsed_seconds': elapsed,
+            'memos_per_second': succeeded / elapsed if elapsed else 0.0,
+            'stages': stages,
+            'memo_seconds': memo_latency,
+            'peak_rss_mb': peak_rss_mb(),
+            'claude_calls': _counter(snapshot, 'claude_calls_total'),
+            'api_retries': _counter(snapshot, 'api_retries_total'),
+            'servers': {
+                name: {'requests': server.requests, 'injected_errors': server.errors}
+                for name, server in (('whisper', whisper), ('claude', claude), ('calendar', calendar))
+            },
+            'calendar_events': len(calendar.events),
+        }
+    finally:
+        if context is not None:
+            context.close()
+        for server in (whisper, claude, calendar):
+            server.stop()
+        if cleanup:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+def load_fast_path_samples(path):
+    """
+    Read memos for the fast-path benchmark
+
+    Args:
+        path (str): One memo per line, either plain text (not checked for
+            correctness) or JSON {"text": ..., "category": ...} where a null
+            category means the memo should go to Claude
+
+    Returns:
+        list: (memo, expected category) pairs, with ... for unlabelled memos
+    """
+    samples = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith('{'):
+                record = json.loads(line)
+                samples.append((record['text'], record.get('category', ...)))
+            else:
+                samples.append((line, ...))
+    return samples
+
+
+def run_fast_path_benchmark(samples=FAST_PATH_SAMPLES, rounds=None):
+    """
+    Measure the rule-based fast path on its own, without any servers
+
+    Args:
+        samples (list): (memo, expected category) pairs; None expects the
+            memo to be left to Claude and ... skips the check
+        rounds (int): Timed passes over the samples (default: about 20000 memos)
+
+    Returns:
+        dict: Hit rate, latency per memo and the memos answered wrongly
+    """
+    extractor = RuleBasedExtractor()
+    rounds = rounds or max(1, 20000 // max(1, len(samples)))
+    latencies = []
+    for _ in range(rounds):
+        for memo, _ in samples:
+            started = time.perf_counter()
+            extractor.extract(memo)
+            latencies.append(time.perf_counter() - started)
+
+    extractor = RuleBasedExtractor()
+    wrong = []
+    for memo, expected in samples:
+        result = extractor.try_extract(memo)
+        if expected is ...:
+            continue
+        got = sorted({task['category'] for task in result['tasks']}) if result else None
+        if isinstance(expected, str):
+            expected = [expected]
+        if got != (sorted(expected) if expected is not None else None):
+            wrong.append({'memo': memo, 'expected': expected, 'got': got})
+
+    report = extractor.report()
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': {'memos': len(samples), 'rounds': rounds, 'threshold': extractor.threshold},
+        'hits': report['hits'],
+        'hit_rate': report['hit_rate'],
+        'latency_seconds': _latency_summary(latencies),
+        'wrong': wrong,
+    }
+
+
+def print_fast_path_result(result, baseline=None):
+    """Print a fast-path result, with the hit rate of an earlier run if given"""
+    latency = result['latency_seconds']
+    print(f"📊 Fast-path hit rate: {result['hit_rate']:.0%} ({result['hits']}/{result['config']['memos']})"
+          + (f"  (was {baseline['hit_rate']:.0%})" if baseline else ''))
+    print(f"   Latency per memo: p50 {latency['p50'] * 1e6:.1f} µs, p95 {latency['p95'] * 1e6:.1f} µs")
+    print(f"   Wrong answers: {len(result['wrong'])}")
+    for miss in result['wrong']:
+        print(f"   ❌ {miss['memo'][:60]!r}: expected {miss['expected']}, got {miss['got']}")
+
+
+def save_result(result, path=None, prefix='bench'):
+    """
+    Write a result as JSON
+
+    Args:
+        result (dict): Output of run_benchmark() or run_fast_path_benchmark()
+        path (str): Destination (defaults to a timestamped file in RESULTS_FOLDER)
+        prefix (str): File name prefix for the default destination
+
+    Returns:
+        str: Path written
+    """
+    if path is None:
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        path = os.path.join(RESULTS_FOLDER, f"{prefix}_{result['config']['memos']}_{stamp}.json")
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(result, f, indent=2)
+    return path
+
+
+def print_result(result, baseline=None):
+    """Print a result, with changes relative to an earlier run if given"""
+    def change(value, old):
+        if not old:
+            return ''
+        return f"  ({(value - old) / old * 100:+.1f}%)"
+
+    base_stages = baseline['stages'] if baseline else {}
+    print(f"📊 {result['succeeded']}/{result['config']['memos']} memos in {result['elapsed_seconds']:.2f}s")
+    print(f"   Throughput: {result['memos_per_second']:.2f} memos/s"
+          + change(result['memos_per_second'], baseline and baseline['memos_per_second']))
+    print(f"   Peak RSS:   {result['peak_rss_mb']:.1f} MB"
+          + change(result['peak_rss_mb'], baseline and baseline['peak_rss_mb']))
+    print(f"   Claude calls: {result['claude_calls']}, retries: {result['api_retries']}")
+    print(f"   {'stage':<12}{'p50':>9}{'p95':>9}{'p99':>9}")
+    for name, stats in list(result['stages'].items()) + [('memo', result['memo_seconds'])]:
+        old = base_stages.get(name) if name != 'memo' else baseline and baseline['memo_seconds']
+        print(f"   {name:<12}{stats['p50']:>8.3f}s{stats['p95']:>8.3f}s{stats['p99']:>8.3f}s"
+              + change(stats['p95'], old and old['p95']))
+
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Benchmark the memo pipeline against local stub servers")
+    parser.add_argument("--memos", type=int, default=DEFAULT_MEMOS,
+                        help="Number of synthetic memos (10 to 10000 is a sensible range)")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus random seed")
+    parser.add_argument("--complex-share", type=float, default=DEFAULT_COMPLEX_SHARE,
+                        help="Fraction of memos the fast path sends on to Claude")
+    parser.add_argument("--whisper-latency", type=float, default=0.2,
+                        help="Seconds per Whisper request")
+    parser.add_argument("--claude-latency", type=float, default=0.5,
+                        help="Seconds per Claude request")
+    parser.add_argument("--calendar-latency", type=float, default=0.05,
+                        help="Seconds per Calendar request")
+    parser.add_argument("--jitter", type=float, default=0.0,
+                        help="Extra random delay of up to this many seconds per request")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="Fraction of requests that fail with a retriable 429")
+    parser.add_argument("--rate-limits", action="store_true",
+                        help="Keep the client-side rate limits")
+    parser.add_argument("--no-fast-path", action="store_true",
+                        help="Send every memo to Claude")
+    parser.add_argument("--fast-path-only", action="store_true",
+                        help="Only measure the local fast path (hit rate, latency, wrong answers)")
+    parser.add_argument("--samples",
+                        help="Memo file for --fast-path-only (plain lines or {\"text\", \"category\"} JSONL)")
+    parser.add_argument("--stream", action="store_true",
+                        help="Use streaming mode (tasks go to the calendar as Claude emits them)")
+    parser.add_argument("--transcribe-workers", type=int, default=process_icloud.DEFAULT_TRANSCRIBE_WORKERS)
+    parser.add_argument("--categorize-workers", type=int, default=process_icloud.DEFAULT_CATEGORIZE_WORKERS)
+    parser.add_argument("--calendar-workers", type=int, default=process_icloud.DEFAULT_CALENDAR_WORKERS)
+    parser.add_argument("--queue-size", type=int, default=process_icloud.DEFAULT_QUEUE_SIZE)
+    parser.add_argument("--output", help="Result file (defaults to benchmarks/results/bench_<memos>_<time>.json)")
+    parser.add_argument("--compare", help="Earlier result file to compare against")
+    parser.add_argument("--workdir", help="Keep the corpus, outputs and trace in this folder")
+    parser.add_argument("--verbose", action="store_true", help="Show the pipeline's progress output")
+    return parser.parse_args(argv)
+
+
+def main():
+    """Main entry point"""
+    args = parse_args()
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    if args.fast_path_only:
+        samples = load_fast_path_samples(args.samples) if args.samples else FAST_PATH_SAMPLES
+        result = run_fast_path_benchmark(samples)
+        print_fast_path_result(result, baseline)
+        print(f"💾 Saved {save_result(result, args.output, prefix='fast_path')}")
+        return
+
+    print(f"🏁 Benchmarking {args.memos} synthetic memo(s)...")
+    result = run_benchmark(
+        memos=args.memos, seed=args.seed, complex_share=args.complex_share,
+        whisper_latency=args.whisper_latency, claude_latency=args.claude_latency,
+        calendar_latency=args.calendar_latency, jitter=args.jitter, error_rate=args.error_rate,
+        rate_limits=args.rate_limits, fast_path=not args.no_fast_path,
+        workdir=args.workdir, verbose=args.verbose,
+        transcribe_workers=args.transcribe_workers, categorize_workers=args.categorize_workers,
+        calendar_workers=args.calendar_workers, queue_size=args.queue_size, stream=args.stream,
+    )
+    print_result(result, baseline)
+    print(f"💾 Saved {save_result(result, args.output)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,28 @@
 """
 File-based voice memo processor
 Reads transcription from input file, processes with Claude, writes results to output file
+In --jsonl mode, processes a stream of {"id", "text"} records into a stream of results
 """
 from src.voice_processor import VoiceProcessor
 from src.reminder_manager import ReminderManager
+from src.categorization_cache import CategorizationCache
+from src.models import parse_tasks
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from contextlib import nullcontext, redirect_stdout
+from collections import deque
+from itertools import islice
+import argparse
 import sys
 import json
-import os
-from pathlib import Path
+
+# Batches categorized at once in --jsonl mode (Claude calls are network-bound)
+DEFAULT_JSONL_WORKERS = 4
+
+# Records packed into each batched Claude request in --jsonl mode
+DEFAULT_JSONL_BATCH_SIZE = 10
+
+# Batches read ahead of the writer per worker; bounds memory for any input size
+IN_FLIGHT_PER_WORKER = 2
 
 def process_transcription_file(input_file, output_file):
     """
@@ -30,7 +45,8 @@ def process_transcription_file(input_file, output_file):
         print(f"Transcription length: {len(transcription)} characters")
         
         # Initialize processors
-        voice_processor = VoiceProcessor()
+        # Re-runs of the same transcript are answered from the cache
+        voice_processor = VoiceProcessor(cache=CategorizationCache())
         reminder_manager = ReminderManager()
         
         # Process with Claude
@@ -59,14 +75,229 @@ def process_transcription_file(input_file, output_file):
         print(f"Error processing file: {e}")
         return False
 
+def read_records(lines):
+    """
+    Parse JSONL input lazily, one record at a time
+    
+    Args:
+        lines (iterable): Lines of {"id": ..., "text": ...} records
+        
+    Yields:
+        tuple: (record id, transcript, error) - the id falls back to the line
+            number, and malformed lines carry an error instead of a transcript
+    """
+    for line_number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_number, None, f"Invalid JSON on line {line_number}: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield line_number, None, f"Line {line_number} is not a JSON object"
+            continue
+        record_id = record.get('id', line_number)
+        text = record.get('text')
+        if not isinstance(text, str) or not text.strip():
+            yield record_id, None, "Missing or empty text"
+            continue
+        yield record_id, text.strip(), None
+
+def process_record(record, context):
+    """
+    Categorize one JSONL record
+    
+    Args:
+        record (tuple): (record id, transcript, error) from read_records
+        context (ServiceContext): Shared API clients
+        
+    Returns:
+        dict: {"id", "reminders"} on success, {"id", "error"} otherwise
+    """
+    record_id, text, error = record
+    if error is None:
+        try:
+            tasks = context.voice_processor.extract_tasks(text)
+        except Exception as e:
+            error = str(e) or type(e).__name__
+    if error is not None:
+        return {"id": record_id, "error": error}
+    return reminders_result(record_id, tasks, context)
+
+def reminders_result(record_id, tasks, context):
+    """
+    Build the output record for successfully categorized tasks
+    
+    Args:
+        record_id: Id of the input record
+        tasks (list): Task objects
+        context (ServiceContext): Shared API clients
+        
+    Returns:
+        dict: {"id", "reminders"}
+    """
+    reminders = context.reminder_manager.to_reminders(tasks)
+    return {"id": record_id, "reminders": [reminder.to_dict() for reminder in reminders]}
+
+def process_batch(records, context):
+    """
+    Categorize a group of JSONL records with as few Claude requests as possible
+    
+    Records answered by the cache or the fast path never reach Claude; the
+    rest share batched requests. If a batched request fails outright, each
+    record is retried on its own so errors are reported per record.
+    
+    Args:
+        records (list): (record id, transcript, error) tuples from read_records
+        context (ServiceContext): Shared API clients
+        
+    Returns:
+        list: One result dict per record, in the same order
+    """
+    texts = [text for _, text, error in records if error is None]
+    if len(texts) < 2:
+        return [process_record(record, context) for record in records]
+    try:
+        answers = iter(context.voice_processor.process_transcriptions(texts))
+    except Exception:
+        return [process_record(record, context) for record in records]
+    
+    results = []
+    for record_id, text, error in records:
+        if error is not None:
+            results.append({"id": record_id, "error": error})
+        else:
+            results.append(reminders_result(record_id, parse_tasks(next(answers)), context))
+    return results
+
+def process_jsonl(lines, output, context, workers=DEFAULT_JSONL_WORKERS, ordered=True,
+                  batch_size=DEFAULT_JSONL_BATCH_SIZE):
+    """
+    Process a stream of transcripts concurrently, writing results as they finish
+    
+    Records are grouped into batches of batch_size, and each batch is
+    categorized with as few Claude requests as its size allows. At most
+    workers * IN_FLIGHT_PER_WORKER batches are read ahead of the writer,
+    so memory stays flat however long the input is. In input order, a
+    slow batch holds back the results queued behind it.
+    
+    Args:
+        lines (iterable): JSONL input lines
+        output (file): Writable text stream for JSONL results (flushed per line)
+        context (ServiceContext): Shared API clients
+        workers (int): Batches categorized at once
+        ordered (bool): Write results in input order (False for completion order)
+        batch_size (int): Records per batch (1 sends one request per record)
+        
+    Returns:
+        dict: Number of records that succeeded and failed
+    """
+    counts = {'succeeded': 0, 'failed': 0}
+    
+    def write(future):
+        for result in future.result():
+            counts['failed' if 'error' in result else 'succeeded'] += 1
+            output.write(json.dumps(result) + '\n')
+        output.flush()
+    
+    records = read_records(lines)
+    limit = max(1, workers) * IN_FLIGHT_PER_WORKER
+    pending = deque() if ordered else set()
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="jsonl") as executor:
+        for batch in iter(lambda: list(islice(records, max(1, batch_size))), []):
+            if len(pending) >= limit:
+                if ordered:
+                    write(pending.popleft())
+                else:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        write(future)
+            future = executor.submit(process_batch, batch, context)
+            if ordered:
+                pending.append(future)
+            else:
+                pending.add(future)
+        
+        while pending:
+            if ordered:
+                write(pending.popleft())
+            else:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    write(future)
+    
+    return counts
+
+def process_jsonl_file(input_file, output_file, workers=DEFAULT_JSONL_WORKERS, ordered=True,
+                       batch_size=DEFAULT_JSONL_BATCH_SIZE):
+    """
+    Run --jsonl mode between files or stdin/stdout
+    
+    When results go to stdout, progress messages are sent to stderr so the
+    output stays valid JSONL.
+    
+    Args:
+        input_file (str): JSONL input path, or '-' for stdin
+        output_file (str): JSONL output path, or '-' for stdout
+        workers (int): Batches categorized at once
+        ordered (bool): Write results in input order (False for completion order)
+        batch_size (int): Records per batched Claude request
+        
+    Returns:
+        bool: True if every record was processed
+    """
+    # Imported here so the single-file mode keeps its quick start
+    from src.service_context import ServiceContext
+    
+    to_stdout = output_file == '-'
+    try:
+        with open(input_file, 'r', encoding='utf-8') if input_file != '-' else nullcontext(sys.stdin) as lines, \
+                open(output_file, 'w', encoding='utf-8') if not to_stdout else nullcontext(sys.stdout) as output, \
+                redirect_stdout(sys.stderr) if to_stdout else nullcontext(), \
+                ServiceContext() as context:
+            # Fail once on a missing API key rather than once per record
+            context.voice_processor
+            counts = process_jsonl(lines, output, context, workers=workers, ordered=ordered,
+                                   batch_size=batch_size)
+    except FileNotFoundError as e:
+        print(f"Error: File not found: {e.filename}", file=sys.stderr)
+        return False
+    except Exception as e:
+        print(f"Error processing records: {e}", file=sys.stderr)
+        return False
+    
+    print(f"✅ {counts['succeeded']} record(s) processed, {counts['failed']} failed", file=sys.stderr)
+    return counts['failed'] == 0
+
 def main():
     """
     Main entry point - supports command line arguments or defaults
     """
-    if len(sys.argv) == 3:
+    parser = argparse.ArgumentParser(description='Process transcripts into reminders')
+    parser.add_argument('input_file', nargs='?', help='Transcript file (JSONL with --jsonl, - for stdin)')
+    parser.add_argument('output_file', nargs='?', help='Reminders file (JSONL with --jsonl, - for stdout)')
+    parser.add_argument('--jsonl', action='store_true',
+                        help='Process {"id", "text"} records, one per line, into JSONL results')
+    parser.add_argument('--workers', type=int, default=DEFAULT_JSONL_WORKERS,
+                        help=f'Batches processed at once in --jsonl mode (default: {DEFAULT_JSONL_WORKERS})')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_JSONL_BATCH_SIZE,
+                        help=f'Records per Claude request in --jsonl mode (default: {DEFAULT_JSONL_BATCH_SIZE})')
+    parser.add_argument('--order', choices=['input', 'completion'], default='input',
+                        help='Write --jsonl results in input order or as they finish (default: input)')
+    args = parser.parse_args()
+    
+    if args.jsonl:
+        success = process_jsonl_file(args.input_file or '-', args.output_file or '-',
+                                     workers=args.workers, ordered=args.order == 'input',
+                                     batch_size=args.batch_size)
+        sys.exit(0 if success else 1)
+    
+    if args.input_file and args.output_file:
         # Use command line arguments
-        input_file = sys.argv[1]
-        output_file = sys.argv[2]
+        input_file = args.input_file
+        output_file = args.output_file
     else:
         # Use default test files
         input_file = "test_input.txt"
@@ -3,13 +3,15 @@ iCloud Drive-based voice memo processor
 Monitors iCloud Drive for new audio files from Voice Memos and processes them
 Works with native Voice Memos app - no paid apps required
 """
-from src.audio_transcriber import AudioTranscriber
-from src.voice_processor import VoiceProcessor
-from src.reminder_manager import ReminderManager
-from src.calendar_manager import CalendarManager
+from src.service_context import ServiceContext
+from src.pipeline import Stage, StagedPipeline
+from src.folder_watcher import FolderWatcher
+from src.metrics import get_metrics, enable_metrics, MetricsExporter
+from src.models import Reminder, parse_tasks, tasks_to_result
+from functools import partial
+import argparse
+import hashlib
 import os
-import json
-import time
 from pathlib import Path
 from datetime import datetime
 
@@ -18,6 +20,23 @@ ICLOUD_BASE = os.path.expanduser("~/Library/Mobile Documents/com~apple~CloudDocs
 INPUT_FOLDER = os.path.join(ICLOUD_BASE, "input")
 OUTPUT_FOLDER = os.path.join(ICLOUD_BASE, "output")
 
+# Voice Memos typically use .m4a
+AUDIO_EXTENSIONS = ['*.m4a', '*.mp3', '*.wav', '*.m4v']
+
+# Per-stage concurrency limits - all three stages are network-bound
+DEFAULT_TRANSCRIBE_WORKERS = 4
+DEFAULT_CATEGORIZE_WORKERS = 4
+DEFAULT_CALENDAR_WORKERS = 1
+DEFAULT_QUEUE_SIZE = 8
+
+# Daemon mode: worker processes consuming the job queue, and where it listens
+DEFAULT_DAEMON_PROCESSES = 2
+DEFAULT_DAEMON_HOST = '127.0.0.1'
+DEFAULT_DAEMON_PORT = 8765
+
+# Shared API clients, created on first use
+_default_context = None
+
 def ensure_folders_exist():
     """Create iCloud folders if they don't exist"""
     os.makedirs(INPUT_FOLDER, exist_ok=True)
@@ -26,59 +45,230 @@ def ensure_folders_exist():
     print(f"   Input:  {INPUT_FOLDER}")
     print(f"   Output: {OUTPUT_FOLDER}")
 
-def process_audio_file(audio_path):
+def get_default_context():
+    """Return the process-wide service context, creating it on first use"""
+    global _default_context
+    if _default_context is None:
+        _default_context = ServiceContext()
+    return _default_context
+
+def set_default_context(context):
+    """Replace the process-wide service context (e.g. with CLI options applied)"""
+    global _default_context
+    _default_context = context
+
+def load_progress(job, context):
     """
-    Process a voice memo audio file
+    Seed a job with whatever earlier runs already finished for this memo
     
     Args:
-        audio_path (str): Path to audio file
+        job (dict): Job with an 'audio_path' key (and a 'content_hash' key,
+            if it is already known)
+        context (ServiceContext): Shared API clients
         
     Returns:
-        str: Path to output file, or None if failed
+        dict: Job with 'content_hash' and any stored stage output added
+        (stored tasks are validated into Task objects under 'tasks')
     """
-    try:
-        print(f"\n🎙️  Processing: {os.path.basename(audio_path)}")
-        
-        # Step 1: Transcribe audio
-        print("📝 Transcribing audio with Whisper...")
-        transcriber = AudioTranscriber()
-        transcription = transcriber.transcribe_audio(audio_path)
-        
-        if not transcription:
-            print("⚠️  Transcription failed, skipping...")
-            return None
+    if 'content_hash' not in job:
+        job['content_hash'] = context.ledger.content_hash(job['audio_path'])
+    entry = context.ledger.get(job['content_hash'])
+    if entry:
+        for field in ('transcription', 'categorized_tasks', 'formatted_results', 'output_path'):
+            if entry[field] is not None:
+                job[field] = entry[field]
+        if 'categorized_tasks' in job:
+            job['tasks'] = parse_tasks(job['categorized_tasks'])
+        job['stage'] = entry['stage']
+    return job
+
+def transcribe_step(job, context):
+    """
+    Pipeline stage: transcribe a job's audio file with Whisper
+    
+    Args:
+        job (dict): Job with an 'audio_path' key
+        context (ServiceContext): Shared API clients
         
-        print(f"   Transcription length: {len(transcription)} characters")
-        print(f"   Preview: {transcription[:100]}...")
+    Returns:
+        dict: Job with 'transcription' added, or None if failed
+    """
+    audio_path = job['audio_path']
+    name = os.path.basename(audio_path)
+    job = load_progress(job, context)
+    
+    if job.get('stage') == 'written':
+        print(f"⏭️  [{name}] Already processed, skipping")
+        return job
+    if 'transcription' in job:
+        print(f"⏭️  [{name}] Resuming after the '{job['stage']}' stage")
+        return job
+    
+    print(f"📝 [{name}] Transcribing audio with Whisper...")
+    with get_metrics().span('transcribe', trace_id=job['content_hash'], memo=name):
+        transcription = context.transcriber.transcribe_audio(audio_path)
+    
+    if not transcription:
+        print(f"⚠️  [{name}] Transcription failed, skipping...")
+        return None
+    
+    print(f"   [{name}] Transcription length: {len(transcription)} characters")
+    print(f"   [{name}] Preview: {transcription[:100]}...")
+    job['transcription'] = transcription
+    context.ledger.record(job['content_hash'], 'transcribed', audio_path,
+                          transcription=transcription)
+    return job
+
+def categorize_step(job, context):
+    """
+    Pipeline stage: extract and categorize tasks with Claude
+    
+    Args:
+        job (dict): Job with a 'transcription' key
+        context (ServiceContext): Shared API clients
         
-        # Step 2: Process with Claude
-        print("🤖 Processing with Claude...")
-        voice_processor = VoiceProcessor()
-        categorized_tasks = voice_processor.process_transcription(transcription)
+    Returns:
+        dict: Job with 'tasks' (Task objects) added
+    """
+    if 'tasks' in job:
+        return job
+    
+    name = os.path.basename(job['audio_path'])
+    print(f"🤖 [{name}] Processing with Claude...")
+    with get_metrics().span('categorize', trace_id=job['content_hash'], memo=name):
+        job['tasks'] = context.voice_processor.extract_tasks(job['transcription'])
+    context.ledger.record(job['content_hash'], 'categorized',
+                          categorized_tasks=tasks_to_result(job['tasks']))
+    return job
+
+def schedule_step(job, context):
+    """
+    Pipeline stage: format results, create calendar events and save the output file
+    
+    Args:
+        job (dict): Job with a 'tasks' key
+        context (ServiceContext): Shared API clients
         
-        # Step 3: Format output
-        print("📝 Formatting results...")
-        reminder_manager = ReminderManager()
-        formatted_results = reminder_manager.format_reminders(categorized_tasks)
+    Returns:
+        dict: Job with 'output_path' added
+    """
+    if 'output_path' in job:
+        return job
+    
+    name = os.path.basename(job['audio_path'])
+    
+    if 'formatted_results' not in job:
+        # Format output
+        print(f"📝 [{name}] Formatting results...")
+        metrics = get_metrics()
+        with metrics.span('format', trace_id=job['content_hash'], memo=name):
+            reminders = context.reminder_manager.to_reminders(job['tasks'])
+            formatted_results = context.reminder_manager.render(reminders)
         
-        # Step 4: Create Google Calendar events
-        print("📅 Creating calendar events...")
-        from src.calendar_manager import CalendarManager
-        calendar_manager = CalendarManager()
-        calendar_manager.create_events_from_json(formatted_results)
+        # Create Google Calendar events
+        print(f"📅 [{name}] Creating calendar events...")
+        with metrics.span('schedule', trace_id=job['content_hash'], memo=name):
+            context.calendar_manager.create_events(reminders, memo=job['content_hash'])
+        job['formatted_results'] = formatted_results
+        context.ledger.record(job['content_hash'], 'scheduled',
+                              formatted_results=formatted_results)
+    
+    return write_step(job, context)
+
+def stream_step(job, context):
+    """
+    Pipeline stage for streaming mode: categorize and schedule in one pass
+    
+    Tasks are pulled out of Claude's response while it is still being
+    generated and each one goes straight to the calendar, so the first
+    event is created at roughly the time to the first task.
+    
+    Args:
+        job (dict): Job with a 'transcription' key
+        context (ServiceContext): Shared API clients
         
-        # Step 5: Save results to file
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        input_basename = os.path.splitext(os.path.basename(audio_path))[0]
-        output_filename = f"{input_basename}_processed_{timestamp}.json"
-        output_path = os.path.join(OUTPUT_FOLDER, output_filename)
+    Returns:
+        dict: Job with 'tasks' and 'output_path' added
+    """
+    if 'tasks' in job:
+        # Resumed memo - Claude already answered, nothing left to stream
+        return schedule_step(job, context)
+    
+    name = os.path.basename(job['audio_path'])
+    print(f"🤖 [{name}] Streaming tasks from Claude into the calendar...")
+    
+    tasks = []
+    reminders = []
+    def stream_reminders():
+        for task in context.voice_processor.stream_tasks(job['transcription']):
+            reminder = Reminder.from_task(task)
+            tasks.append(task)
+            reminders.append(reminder)
+            yield reminder
+    
+    with get_metrics().span('stream', trace_id=job['content_hash'], memo=name):
+        context.calendar_manager.create_events_streaming(stream_reminders(),
+                                                          memo=job['content_hash'])
+    
+    job['tasks'] = tasks
+    job['formatted_results'] = context.reminder_manager.render(reminders)
+    context.ledger.record(job['content_hash'], 'categorized',
+                          categorized_tasks=tasks_to_result(tasks))
+    context.ledger.record(job['content_hash'], 'scheduled',
+                          formatted_results=job['formatted_results'])
+    
+    return write_step(job, context)
+
+def write_step(job, context):
+    """
+    Save a job's formatted results to the output folder
+    
+    Args:
+        job (dict): Job with a 'formatted_results' key
+        context (ServiceContext): Shared API clients
         
+    Returns:
+        dict: Job with 'output_path' added
+    """
+    name = os.path.basename(job['audio_path'])
+    
+    # Save results to file
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    input_basename = os.path.splitext(name)[0]
+    output_filename = f"{input_basename}_processed_{timestamp}.json"
+    output_path = os.path.join(OUTPUT_FOLDER, output_filename)
+    
+    with get_metrics().span('write', trace_id=job['content_hash'], memo=name):
         with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(formatted_results)
+            f.write(job['formatted_results'])
+    
+    print(f"✅ [{name}] Results saved: {os.path.basename(output_path)}")
+    job['output_path'] = output_path
+    context.ledger.record(job['content_hash'], 'written', output_path=output_path)
+    return job
+
+def process_audio_file(audio_path, context=None):
+    """
+    Process a voice memo audio file
+    
+    Args:
+        audio_path (str): Path to audio file
+        context (ServiceContext): Shared API clients (defaults to the process-wide one)
         
-        print(f"✅ Results saved: {os.path.basename(output_path)}")
+    Returns:
+        str: Path to output file, or None if failed
+    """
+    try:
+        print(f"\n🎙️  Processing: {os.path.basename(audio_path)}")
         
-        return output_path
+        context = context or get_default_context()
+        job = {'audio_path': audio_path}
+        for step in (transcribe_step, categorize_step, schedule_step):
+            job = step(job, context)
+            if job is None:
+                return None
+        
+        return job['output_path']
         
     except Exception as e:
         print(f"❌ Error processing {audio_path}: {e}")
@@ -86,16 +276,126 @@ def process_audio_file(audio_path):
         traceback.print_exc()
         return None
 
-def process_all_pending():
-    """Process all audio files currently in the input folder"""
-    ensure_folders_exist()
+def process_transcript(text, name, context=None):
+    """
+    Categorize, schedule and save a transcript that arrived without audio
+    
+    Args:
+        text (str): Transcript
+        name (str): Label used in log messages and the output file name
+        context (ServiceContext): Shared API clients (defaults to the process-wide one)
+        
+    Returns:
+        str: Path to output file
+    """
+    context = context or get_default_context()
+    content_hash = hashlib.sha256(text.encode('utf-8')).hexdigest()
+    job = load_progress({'audio_path': name, 'content_hash': content_hash}, context)
+    if job.get('stage') == 'written':
+        return job['output_path']
+    job.setdefault('transcription', text)
+    return schedule_step(categorize_step(job, context), context)['output_path']
+
+def process_queued_job(job, context):
+    """
+    Run one daemon job in a worker process
+    
+    Args:
+        job (dict): Job from the queue ('audio' jobs carry a file path,
+            'transcript' jobs the text itself)
+        context (ServiceContext): The worker's API clients
+        
+    Returns:
+        str: Path to output file
+        
+    Raises:
+        RuntimeError: If the memo could not be processed
+    """
+    if job['kind'] == 'transcript':
+        name = job['name'] or f"transcript_{job['id']}.txt"
+        return process_transcript(job['payload'], name, context)
+    
+    output_path = process_audio_file(job['payload'], context)
+    if output_path is None:
+        raise RuntimeError(f"Processing failed for {job['name'] or job['payload']}")
+    return output_path
+
+def process_files(audio_files, context=None, transcribe_workers=DEFAULT_TRANSCRIBE_WORKERS,
+                  categorize_workers=DEFAULT_CATEGORIZE_WORKERS,
+                  calendar_workers=DEFAULT_CALENDAR_WORKERS,
+                  queue_size=DEFAULT_QUEUE_SIZE, stream=False):
+    """
+    Run audio files through the staged transcribe -> categorize -> calendar pipeline
+    
+    Each stage has its own worker pool and stages are joined by bounded queues,
+    so a slow Whisper upload no longer holds up Claude or Calendar work for
+    other memos. Calendar writes and output files happen in input order.
+    
+    Args:
+        audio_files (list): Paths to audio files
+        context (ServiceContext): Shared API clients (defaults to the process-wide one)
+        transcribe_workers (int): Concurrent Whisper uploads
+        categorize_workers (int): Concurrent Claude requests
+        calendar_workers (int): Concurrent calendar writers
+        queue_size (int): Maximum jobs waiting between two stages
+        stream (bool): Stream tasks from Claude straight into the calendar;
+            categorize workers then also create events, in completion order
+        
+    Returns:
+        list: Output file path for each input file (None if it failed)
+    """
+    context = context or get_default_context()
+    stages = [
+        Stage("transcribe", partial(transcribe_step, context=context),
+              workers=transcribe_workers),
+    ]
+    if stream:
+        stages.append(Stage("stream", partial(stream_step, context=context),
+                            workers=categorize_workers))
+    else:
+        stages += [
+            Stage("categorize", partial(categorize_step, context=context),
+                  workers=categorize_workers),
+            Stage("calendar", partial(schedule_step, context=context),
+                  workers=calendar_workers, ordered=True),
+        ]
+    pipeline = StagedPipeline(stages, queue_size=queue_size)
     
-    # Get all audio files - Voice Memos typically use .m4a
-    audio_extensions = ['*.m4a', '*.mp3', '*.wav', '*.m4v']
+    jobs = ({'audio_path': str(audio_file)} for audio_file in audio_files)
+    results = pipeline.run(jobs)
+    return [job['output_path'] if job else None for job in results]
+
+def print_cache_report(context):
+    """Print cache and fast-path hit/miss counts for a context"""
+    for name, stats in context.cache_report().items():
+        line = f"💾 {name.capitalize()}: {stats['hits']} hit(s), {stats['misses']} miss(es)"
+        if 'evictions' in stats:
+            line += f", {stats['evictions']} eviction(s)"
+        print(line)
+
+def find_audio_files():
+    """
+    List audio files currently in the input folder
+    
+    Returns:
+        list: Sorted Path objects for each audio file
+    """
     input_files = []
+    for ext in AUDIO_EXTENSIONS:
+        input_files.extend(Path(INPUT_FOLDER).glob(ext))
+    return sorted(input_files)
+
+def process_all_pending(**pipeline_options):
+    """
+    Process all audio files currently in the input folder
     
-    for ext in audio_extensions:
-        input_files.extend(list(Path(INPUT_FOLDER).glob(ext)))
+    Args:
+        **pipeline_options: Worker and queue limits passed to process_files()
+    """
+    ensure_folders_exist()
+    
+    # Get all audio files
+    input_files = find_audio_files()
     
     if not input_files:
         print("\n📭 No audio files to process in input folder")
@@ -103,61 +403,167 @@ def process_all_pending():
     
     print(f"\n📬 Found {len(input_files)} audio file(s) to process")
     
-    for audio_file in input_files:
-        process_audio_file(str(audio_file))
-        print()  # Blank line between files
+    results = process_files(input_files, **pipeline_options)
+    failed = sum(1 for result in results if result is None)
     
+    if failed:
+        print(f"⚠️  {failed} of {len(results)} file(s) failed")
+    context = get_default_context()
+    print_cache_report(context)
+    usage = context.usage.summary()
+    if usage['calls']:
+        print(f"🧮 Claude: {usage['calls']} call(s), {usage['input_tokens']} input / "
+              f"{usage['cache_read_input_tokens']} cached / {usage['output_tokens']} output tokens, "
+              f"{usage['mean_time_to_first_token']:.2f}s mean time to first token")
+    if context.upload_bytes_saved:
+        print(f"📉 Preprocessing saved {context.upload_bytes_saved / (1024 * 1024):.1f} MB of uploads")
     print("🎉 All files processed!")
 
-def watch_mode(check_interval=30):
+def watch_mode(check_interval=30, **pipeline_options):
     """
     Watch mode - continuously monitor input folder for new audio files
     
+    Uses inotify where available so new memos are noticed within a second;
+    otherwise falls back to scanning the folder every check_interval seconds.
+    Files are only picked up once they have finished syncing.
+    
     Args:
-        check_interval (int): Seconds between checks (30s default for audio files)
+        check_interval (int): Seconds between scans when polling (30s default for audio files)
+        **pipeline_options: Worker and queue limits passed to process_files()
     """
     ensure_folders_exist()
     
-    print(f"\n👀 Watch mode started - checking every {check_interval} seconds")
-    print("   Monitoring for: .m4a, .mp3, .wav files")
+    watcher = FolderWatcher(INPUT_FOLDER, AUDIO_EXTENSIONS, poll_interval=check_interval)
+    if watcher.mode == 'inotify':
+        print("\n👀 Watch mode started - using filesystem events")
+    else:
+        print(f"\n👀 Watch mode started - checking every {check_interval} seconds")
+    print("   Monitoring for: .m4a, .mp3, .wav, .m4v files")
     print("   Press Ctrl+C to stop\n")
     
-    processed_files = set()
-    audio_extensions = ['*.m4a', '*.mp3', '*.wav', '*.m4v']
+    # One context for the whole session keeps connections and tokens warm
+    context = get_default_context()
     
     try:
-        while True:
-            # Get current audio files
-            current_files = set()
-            for ext in audio_extensions:
-                current_files.update(Path(INPUT_FOLDER).glob(ext))
-            
-            # Find new files
-            new_files = current_files - processed_files
-            
-            if new_files:
-                print(f"📬 Found {len(new_files)} new audio file(s)!")
-                for new_file in new_files:
-                    process_audio_file(str(new_file))
-                    processed_files.add(new_file)
-                    print()
-            
-            # Wait before next check
-            time.sleep(check_interval)
+        # The watcher reports each file once, after it stops changing;
+        # memos finished before a restart are skipped via the ledger
+        for new_files in watcher.watch(skip=context.ledger.is_finished):
+            print(f"📬 Found {len(new_files)} new audio file(s)!")
+            process_files(new_files, context, **pipeline_options)
+            print()
             
     except KeyboardInterrupt:
         print("\n\n👋 Watch mode stopped")
+    finally:
+        watcher.close()
+        context.close()
+
+def daemon_mode(processes=DEFAULT_DAEMON_PROCESSES, host=DEFAULT_DAEMON_HOST,
+                port=DEFAULT_DAEMON_PORT, socket_path=None, context_options=None):
+    """
+    Daemon mode - accept memos over a local API and process them from a durable queue
+    
+    Jobs are stored in SQLite before they are acknowledged, so nothing
+    submitted is lost across restarts. Ctrl+C or SIGTERM stops accepting
+    jobs, lets running ones finish and leaves queued ones for next time.
+    
+    Args:
+        processes (int): Worker processes consuming the queue
+        host (str): Interface for the HTTP endpoint
+        port (int): Port for the HTTP endpoint
+        socket_path (str): Listen on this Unix socket instead of host/port
+        context_options (dict): ServiceContext options for every worker
+    """
+    # Loaded here so one-shot runs skip the HTTP server modules
+    from src.daemon import Daemon
+    
+    ensure_folders_exist()
+    daemon = Daemon(process_queued_job, context_options=context_options, processes=processes,
+                    host=host, port=port, socket_path=socket_path).start()
+    print(f"\n🛰️  Daemon listening on {daemon.address} with {processes} worker process(es)")
+    print("   POST /jobs/audio?name=memo.m4a or /jobs/transcript, GET /jobs/<id> and /status")
+    print("   Press Ctrl+C to stop\n")
+    daemon.serve_forever()
+    print("👋 Daemon stopped")
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Process voice memos from iCloud Drive")
+    parser.add_argument("mode", nargs="?", choices=["watch", "daemon"],
+                        help="'watch' to keep monitoring the input folder, "
+                             "'daemon' to serve a local job submission API")
+    parser.add_argument("--interval", type=int, default=30,
+                        help="Seconds between folder scans when watch mode has to poll")
+    parser.add_argument("--workers", type=int,
+                        help="Shortcut for both --transcribe-workers and --categorize-workers")
+    parser.add_argument("--transcribe-workers", type=int, default=DEFAULT_TRANSCRIBE_WORKERS,
+                        help="Concurrent Whisper uploads")
+    parser.add_argument("--categorize-workers", type=int, default=DEFAULT_CATEGORIZE_WORKERS,
+                        help="Concurrent Claude requests")
+    parser.add_argument("--calendar-workers", type=int, default=DEFAULT_CALENDAR_WORKERS,
+                        help="Concurrent calendar writers")
+    parser.add_argument("--preprocess", action="store_true",
+                        help="Shrink audio with ffmpeg (mono, 16 kHz, silence trimmed) before upload")
+    parser.add_argument("--stream", action="store_true",
+                        help="Create calendar events as Claude emits each task")
+    parser.add_argument("--no-fast-path", action="store_true",
+                        help="Send every memo to Claude, even simple ones")
+    parser.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE,
+                        help="Maximum jobs waiting between two stages")
+    parser.add_argument("--processes", type=int, default=DEFAULT_DAEMON_PROCESSES,
+                        help="Worker processes in daemon mode")
+    parser.add_argument("--host", default=DEFAULT_DAEMON_HOST,
+                        help="Interface the daemon listens on")
+    parser.add_argument("--port", type=int, default=DEFAULT_DAEMON_PORT,
+                        help="Port the daemon listens on")
+    parser.add_argument("--socket",
+                        help="Unix socket for the daemon to listen on instead of --host/--port")
+    parser.add_argument("--metrics-port", type=int,
+                        help="Serve Prometheus metrics on localhost at this port (/metrics, /stats.json)")
+    parser.add_argument("--stats-file",
+                        help="Write a JSON metrics snapshot to this file every few seconds")
+    parser.add_argument("--trace-file",
+                        help="Append per-memo trace spans (JSON lines) to this file")
+    args = parser.parse_args(argv)
+    
+    if args.workers is not None:
+        args.transcribe_workers = args.workers
+        args.categorize_workers = args.workers
+    return args
 
 def main():
     """Main entry point"""
-    import sys
+    args = parse_args()
     
-    if len(sys.argv) > 1 and sys.argv[1] == "watch":
-        # Watch mode - continuous monitoring
-        watch_mode()
-    else:
-        # Process all pending files once
-        process_all_pending()
+    # Metrics stay a no-op unless one of the outputs is asked for
+    exporter = None
+    if args.metrics_port is not None or args.stats_file or args.trace_file:
+        metrics = enable_metrics(trace_path=args.trace_file)
+        exporter = MetricsExporter(metrics, port=args.metrics_port, stats_path=args.stats_file)
+    
+    context_options = {'preprocess_audio': args.preprocess, 'fast_path': not args.no_fast_path}
+    set_default_context(ServiceContext(**context_options))
+    pipeline_options = {
+        'transcribe_workers': args.transcribe_workers,
+        'categorize_workers': args.categorize_workers,
+        'calendar_workers': args.calendar_workers,
+        'queue_size': args.queue_size,
+        'stream': args.stream,
+    }
+    
+    try:
+        if args.mode == "watch":
+            # Watch mode - continuous monitoring
+            watch_mode(args.interval, **pipeline_options)
+        elif args.mode == "daemon":
+            # Each worker process builds its own clients from these options
+            daemon_mode(args.processes, args.host, args.port, args.socket, context_options)
+        else:
+            # Process all pending files once
+            process_all_pending(**pipeline_options)
+    finally:
+        if exporter is not None:
+            exporter.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,224 @@
+"""
+Audio Chunker - Splits long recordings into overlapping segments for parallel transcription
+Requires ffmpeg and ffprobe on the PATH
+"""
+import math
+import os
+import re
+import shutil
+import subprocess
+
+# Whisper rejects uploads above 25 MB
+WHISPER_MAX_UPLOAD_BYTES = 25 * 1024 * 1024
+
+DEFAULT_SEGMENT_SECONDS = 300   # Target segment length
+DEFAULT_OVERLAP_SECONDS = 3     # Audio shared by neighbouring segments
+SILENCE_SEARCH_WINDOW = 30      # Look this far either side of a target cut for silence
+SILENCE_NOISE_DB = -35
+SILENCE_MIN_SECONDS = 0.4
+
+# Removing duplicated text at a segment boundary: the overlap holds at most
+# this many words per second of shared audio, the shared words must reach
+# within STITCH_EDGE_SLACK_WORDS of the boundary on both sides (Whisper often
+# garbles a word where the audio is cut), and shorter runs than
+# STITCH_MIN_MATCH_WORDS are treated as coincidence ("and the", "I need")
+STITCH_WORDS_PER_SECOND = 4
+STITCH_EDGE_SLACK_WORDS = 3
+STITCH_MIN_MATCH_WORDS = 3
+
+_SILENCE_START = re.compile(r'silence_start: (-?[\d.]+)')
+_SILENCE_END = re.compile(r'silence_end: (-?[\d.]+)')
+
+
+def ffmpeg_available():
+    """Check that ffmpeg and ffprobe are installed"""
+    return bool(shutil.which('ffmpeg') and shutil.which('ffprobe'))
+
+
+def probe_duration(audio_path):
+    """
+    Get an audio file's duration
+
+    Args:
+        audio_path (str): Path to audio file
+
+    Returns:
+        float: Duration in seconds
+    """
+    output = subprocess.run(
+        ['ffprobe', '-v', 'error', '-show_entries', 'format=duration',
+         '-of', 'default=noprint_wrappers=1:nokey=1', audio_path],
+        capture_output=True, text=True, check=True
+    ).stdout
+    return float(output.strip())
+
+
+def find_silences(audio_path, noise_db=SILENCE_NOISE_DB, min_seconds=SILENCE_MIN_SECONDS):
+    """
+    Locate silent stretches with ffmpeg's silencedetect filter
+
+    Args:
+        audio_path (str): Path to audio file
+        noise_db (int): Level below which audio counts as silence
+        min_seconds (float): Shortest silence worth reporting
+
+    Returns:
+        list: (start, end) tuples in seconds
+    """
+    stderr = subprocess.run(
+        ['ffmpeg', '-hide_banner', '-nostats', '-i', audio_path, '-vn',
+         '-af', f'silencedetect=noise={noise_db}dB:d={min_seconds}', '-f', 'null', '-'],
+        capture_output=True, text=True, check=True
+    ).stderr
+
+    starts = [float(value) for value in _SILENCE_START.findall(stderr)]
+    ends = [float(value) for value in _SILENCE_END.findall(stderr)]
+    return list(zip(starts, ends))
+
+
+def plan_segments(duration, silences, segment_seconds=DEFAULT_SEGMENT_SECONDS,
+                  overlap_seconds=DEFAULT_OVERLAP_SECONDS):
+    """
+    Choose segment boundaries, preferring the middle of a silence near each target cut
+
+    Args:
+        duration (float): Total length in seconds
+        silences (list): (start, end) silent stretches
+        segment_seconds (float): Target segment length
+        overlap_seconds (float): Audio repeated at the start of each later segment
+
+    Returns:
+        list: (start, end) tuples in seconds
+    """
+    midpoints = [(start + end) / 2 for start, end in silences]
+    cuts = []
+    position = 0.0
+    while duration - position > segment_seconds:
+        target = position + segment_seconds
+        nearby = [m for m in midpoints
+                  if abs(m - target) <= SILENCE_SEARCH_WINDOW and m > position + overlap_seconds]
+        cut = min(nearby, key=lambda m: abs(m - target)) if nearby else target
+        cuts.append(cut)
+        position = cut
+
+    boundaries = [0.0] + cuts + [duration]
+    return [
+        (max(0.0, boundaries[i] - (overlap_seconds if i else 0)), boundaries[i + 1])
+        for i in range(len(boundaries) - 1)
+    ]
+
+
+def extract_segment(audio_path, start, end, output_path):
+    """
+    Cut one segment out of an audio file as compact mono audio
+
+    Args:
+        audio_path (str): Source audio file
+        start (float): Segment start in seconds
+        end (float): Segment end in seconds
+        output_path (str): Where to write the segment (.m4a)
+    """
+    subprocess.run(
+        ['ffmpeg', '-hide_banner', '-loglevel', 'error', '-y',
+         '-ss', f'{start:.3f}', '-t', f'{end - start:.3f}', '-i', audio_path,
+         '-vn', '-ac', '1', '-ar', '16000', '-c:a', 'aac', '-b:a', '48k', output_path],
+        check=True
+    )
+
+
+def split_audio(audio_path, output_dir, segment_seconds=DEFAULT_SEGMENT_SECONDS,
+                overlap_seconds=DEFAULT_OVERLAP_SECONDS):
+    """
+    Split an audio file into overlapping segments cut at silences
+
+    Args:
+        audio_path (str): Source audio file
+        output_dir (str): Directory for the segment files
+        segment_seconds (float): Target segment length
+        overlap_seconds (float): Audio shared by neighbouring segments
+
+    Returns:
+        list: Segment file paths in playback order
+    """
+    duration = probe_duration(audio_path)
+    segments = plan_segments(duration, find_silences(audio_path),
+                             segment_seconds, overlap_seconds)
+
+    paths = []
+    for i, (start, end) in enumerate(segments):
+        path = os.path.join(output_dir, f"segment_{i:04d}.m4a")
+        extract_segment(audio_path, start, end, path)
+        paths.append(path)
+    return paths
+
+
+def _normalize_word(word):
+    return re.sub(r'[^\w]', '', word.lower())
+
+
+def _find_overlap(tail, head):
+    """
+    Find the words shared by the end of one transcript and the start of the next
+
+    Args:
+        tail (list): Normalized last words of the earlier transcript
+        head (list): Normalized first words of the later transcript
+
+    Returns:
+        tuple: (start in tail, start in head, length) of the longest run that
+            ends near the end of tail and starts near the start of head,
+            or None if there is no such run
+    """
+    best = None
+    for b in range(min(STITCH_EDGE_SLACK_WORDS + 1, len(head))):
+        for a in range(len(tail)):
+            size = 0
+            while (a + size < len(tail) and b + size < len(head)
+                   and tail[a + size] and tail[a + size] == head[b + size]):
+                size += 1
+            if (size >= STITCH_MIN_MATCH_WORDS
+                    and a + size >= len(tail) - STITCH_EDGE_SLACK_WORDS
+                    and (best is None or size > best[2])):
+                best = (a, b, size)
+    return best
+
+
+def stitch_transcripts(texts, overlap_seconds=DEFAULT_OVERLAP_SECONDS):
+    """
+    Join segment transcripts, dropping text repeated in the overlaps
+
+    The tail of each transcript is aligned with the head of the next and
+    the duplicated words are kept only once. Only a run of words at the
+    very boundary counts as the overlap; transcripts with no such run are
+    simply joined.
+
+    Args:
+        texts (list): Segment transcripts in playback order
+        overlap_seconds (float): Audio shared by neighbouring segments
+
+    Returns:
+        str: Combined transcript
+    """
+    window = math.ceil(overlap_seconds * STITCH_WORDS_PER_SECOND) + STITCH_EDGE_SLACK_WORDS
+    words = []
+    for text in texts:
+        next_words = text.split()
+        if not words or not next_words:
+            words.extend(next_words)
+            continue
+
+        tail = words[-window:]
+        head = next_words[:window]
+        match = _find_overlap([_normalize_word(w) for w in tail],
+                              [_normalize_word(w) for w in head])
+
+        if match:
+            # Keep the earlier segment up to the end of the shared words,
+            # then continue with what follows them in the later one
+            a, b, size = match
+            cut = len(words) - len(tail) + a + size
+            words = words[:cut] + next_words[b + size:]
+        else:
+            words.extend(next_words)
+
+    return ' '.join(words)
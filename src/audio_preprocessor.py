@@ -0,0 +1,74 @@
+"""
+Audio Preprocessor - Shrinks recordings before upload
+Drops video tracks, downmixes to mono 16 kHz, trims silence and re-encodes with a compact codec
+Requires ffmpeg on the PATH
+"""
+import os
+import subprocess
+
+# Whisper resamples to 16 kHz mono anyway, so nothing useful is lost
+SAMPLE_RATE = 16000
+
+# Opus in Ogg is accepted by Whisper and holds speech well at low bitrates
+OUTPUT_EXTENSION = '.ogg'
+OUTPUT_CODEC = 'libopus'
+OUTPUT_BITRATE = '24k'
+
+SILENCE_THRESHOLD_DB = -40
+EDGE_SILENCE_SECONDS = 0.3      # Leading/trailing silence longer than this is cut
+INTERNAL_SILENCE_SECONDS = 1.5  # Internal pauses are shortened to this
+
+
+def build_filter():
+    """
+    Build the ffmpeg audio filter that trims silence
+
+    Leading silence is removed outright; stop_periods=-1 applies the
+    stop rule throughout, and stop_silence keeps the first
+    INTERNAL_SILENCE_SECONDS of each longer pause (including the trailing
+    one), so sentence breaks survive for Whisper's segmentation.
+
+    Returns:
+        str: ffmpeg -af argument
+    """
+    return (
+        f"silenceremove=start_periods=1:start_duration={EDGE_SILENCE_SECONDS}"
+        f":start_threshold={SILENCE_THRESHOLD_DB}dB"
+        f":stop_periods=-1:stop_duration={INTERNAL_SILENCE_SECONDS}"
+        f":stop_silence={INTERNAL_SILENCE_SECONDS}"
+        f":stop_threshold={SILENCE_THRESHOLD_DB}dB"
+    )
+
+
+def preprocess_audio(audio_path, output_dir):
+    """
+    Produce a compact, speech-only copy of an audio or video file
+
+    Args:
+        audio_path (str): Source recording (.m4a, .m4v, .wav, ...)
+        output_dir (str): Directory for the processed copy
+
+    Returns:
+        dict: 'path' of the processed file plus 'original_bytes',
+            'processed_bytes' and 'bytes_saved'
+    """
+    basename = os.path.splitext(os.path.basename(audio_path))[0]
+    output_path = os.path.join(output_dir, basename + OUTPUT_EXTENSION)
+
+    subprocess.run(
+        ['ffmpeg', '-hide_banner', '-loglevel', 'error', '-y', '-i', audio_path,
+         '-vn', '-ac', '1', '-ar', str(SAMPLE_RATE),
+         '-af', build_filter(),
+         '-c:a', OUTPUT_CODEC, '-b:a', OUTPUT_BITRATE, '-application', 'voip',
+         output_path],
+        check=True
+    )
+
+    original_bytes = os.path.getsize(audio_path)
+    processed_bytes = os.path.getsize(output_path)
+    return {
+        'path': output_path,
+        'original_bytes': original_bytes,
+        'processed_bytes': processed_bytes,
+        'bytes_saved': original_bytes - processed_bytes,
+    }
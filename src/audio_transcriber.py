@@ -1,25 +1,143 @@
 """
-Audio Transcriber - Handles audio file transcription using OpenAI Whisper
+Audio Transcriber - Handles audio file transcription using OpenAI Whisper or another configured backend
 """
-from openai import OpenAI
 from dotenv import load_dotenv
+from src.transcription_backends import get_backend
+from src.transcription_cache import TranscriptionCache
+from src import audio_chunker
+from src.audio_preprocessor import preprocess_audio
+from src.rate_limiter import get_retry_policy
+from src.metrics import get_metrics
+from concurrent.futures import ThreadPoolExecutor
 import os
+import subprocess
+import tempfile
+import threading
 
 # Load environment variables
 load_dotenv()
 
+# Recordings longer than this are split and transcribed in parallel
+CHUNK_THRESHOLD_SECONDS = 600
+DEFAULT_CHUNK_WORKERS = 4
+
 class AudioTranscriber:
-    def __init__(self):
-        """Initialize OpenAI client"""
-        api_key = os.getenv('OPENAI_API_KEY')
-        if not api_key:
-            raise ValueError("OPENAI_API_KEY not found in environment variables")
-        self.client = OpenAI(api_key=api_key)
+    def __init__(self, cache=None, model="whisper-1", language="en",
+                 chunk_workers=DEFAULT_CHUNK_WORKERS,
+                 chunk_threshold_seconds=CHUNK_THRESHOLD_SECONDS,
+                 segment_seconds=audio_chunker.DEFAULT_SEGMENT_SECONDS,
+                 preprocess=False, backend=None, retry_policy=None):
+        """
+        Initialize the transcription backend
+        
+        Args:
+            cache (TranscriptionCache): Optional cache of earlier transcripts
+            model (str): Whisper model name
+            language (str): Force transcription in this language
+            chunk_workers (int): Segments of a long recording transcribed at once
+            chunk_threshold_seconds (float): Recordings longer than this are split
+            segment_seconds (float): Target length of each split segment
+            preprocess (bool): Shrink audio with ffmpeg before uploading
+            backend (TranscriptionBackend): Engine to use (defaults to the
+                one named by TRANSCRIPTION_BACKEND, normally OpenAI Whisper)
+            retry_policy (RetryPolicy): Throttling and retries for uploads
+                (defaults to the shared 'whisper' limiter)
+        """
+        self.backend = backend or get_backend()
+        self.cache = cache
+        self.model = model
+        self.language = language
+        self.chunk_workers = chunk_workers
+        self.chunk_threshold_seconds = chunk_threshold_seconds
+        self.segment_seconds = segment_seconds
+        self.preprocess = preprocess
+        self.retry_policy = retry_policy or get_retry_policy('whisper')
+        self.bytes_saved = 0
+        self._stats_lock = threading.Lock()
+    
+    def _transcribe_file(self, audio_file_path):
+        """Send one file to the backend and return the raw text, retrying rate limits and outages"""
+        get_metrics().inc('upload_bytes_total', os.path.getsize(audio_file_path), provider='whisper')
+        return self.retry_policy.call(
+            lambda: self.backend.transcribe(audio_file_path, self.model, self.language))
+    
+    def _needs_chunking(self, audio_file_path):
+        """Check whether a recording is too long or too big for one request"""
+        if not audio_chunker.ffmpeg_available():
+            if os.path.getsize(audio_file_path) > audio_chunker.WHISPER_MAX_UPLOAD_BYTES:
+                print("⚠️  File exceeds the Whisper upload limit and ffmpeg is not installed to split it")
+            return False
+        if os.path.getsize(audio_file_path) > audio_chunker.WHISPER_MAX_UPLOAD_BYTES:
+            return True
+        return audio_chunker.probe_duration(audio_file_path) > self.chunk_threshold_seconds
+    
+    def _transcribe_chunked(self, audio_file_path):
+        """
+        Split a long recording at silences and transcribe the pieces concurrently
+        
+        Args:
+            audio_file_path (str): Path to audio file
+            
+        Returns:
+            str: Stitched transcript
+        """
+        with tempfile.TemporaryDirectory(prefix="voice-memo-chunks-") as chunk_dir:
+            segments = audio_chunker.split_audio(
+                audio_file_path, chunk_dir, segment_seconds=self.segment_seconds)
+            print(f"   Split into {len(segments)} segment(s), transcribing {self.chunk_workers} at a time")
+            
+            with ThreadPoolExecutor(max_workers=self.chunk_workers) as pool:
+                texts = list(pool.map(self._transcribe_file, segments))
+        
+        return audio_chunker.stitch_transcripts(texts)
+    
+    def _prepare_upload(self, audio_file_path, work_dir):
+        """
+        Pick the file to upload, shrinking it first if preprocessing is on
+        
+        Args:
+            audio_file_path (str): Original recording
+            work_dir (str): Scratch directory for the processed copy
+            
+        Returns:
+            str: Path to upload
+        """
+        if not self.preprocess:
+            return audio_file_path
+        if not audio_chunker.ffmpeg_available():
+            print("⚠️  ffmpeg not installed, uploading audio as-is")
+            return audio_file_path
+        
+        try:
+            result = preprocess_audio(audio_file_path, work_dir)
+        except subprocess.CalledProcessError as e:
+            # e.g. an ffmpeg build without libopus, or a container it cannot read
+            print(f"⚠️  ffmpeg failed on {os.path.basename(audio_file_path)} "
+                  f"(exit status {e.returncode}), uploading audio as-is")
+            return audio_file_path
+        except OSError as e:
+            print(f"⚠️  Preprocessing failed for {os.path.basename(audio_file_path)} ({e}), "
+                  f"uploading audio as-is")
+            return audio_file_path
+        if result['bytes_saved'] <= 0:
+            return audio_file_path
+        
+        with self._stats_lock:
+            self.bytes_saved += result['bytes_saved']
+        percent = 100 * result['bytes_saved'] / result['original_bytes']
+        print(f"   Preprocessed {os.path.basename(audio_file_path)}: "
+              f"{result['original_bytes'] / 1024:.0f} KB -> {result['processed_bytes'] / 1024:.0f} KB "
+              f"({percent:.0f}% smaller)")
+        return result['path']
     
     def transcribe_audio(self, audio_file_path):
         """
         Transcribe an audio file to text using Whisper API
         
+        With preprocessing on, the audio is shrunk before upload. Long
+        recordings are split into overlapping segments that are
+        transcribed in parallel and stitched back together.
+        
         Args:
             audio_file_path (str): Path to audio file (.m4a, .mp3, .wav, etc.)
             
@@ -27,17 +145,25 @@ class AudioTranscriber:
             str: Transcribed text
         """
         try:
-            # Open audio file
-            with open(audio_file_path, 'rb') as audio_file:
-                # Call Whisper API
-                transcript = self.client.audio.transcriptions.create(
-                    model="whisper-1",
-                    file=audio_file,
-                    response_format="text",
-                    language="en"  # Force English transcription
-                )
+            # A cache hit skips the upload entirely
+            cache_key = None
+            if self.cache is not None:
+                cache_key = self.cache.make_key(audio_file_path, self.model, self.language,
+                                                 self.backend.cache_identity)
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    return cached
+            
+            with tempfile.TemporaryDirectory(prefix="voice-memo-upload-") as work_dir:
+                upload_path = self._prepare_upload(audio_file_path, work_dir)
+                if self._needs_chunking(upload_path):
+                    text = self._transcribe_chunked(upload_path)
+                else:
+                    text = self._transcribe_file(upload_path)
             
-            return transcript.strip()
+            if cache_key is not None and text:
+                self.cache.put(cache_key, text, source=os.path.basename(audio_file_path))
+            return text
             
         except Exception as e:
             print(f"Error transcribing audio: {e}")
@@ -48,7 +174,7 @@ if __name__ == "__main__":
     import sys
     
     if len(sys.argv) < 2:
-        print("Usage: python src/audio_transcriber.py <audio_file_path>")
+        print("Usage: python -m src.audio_transcriber <audio_file_path>")
         sys.exit(1)
     
     audio_path = sys.argv[1]
@@ -58,8 +184,9 @@ if __name__ == "__main__":
         sys.exit(1)
     
     print(f"Transcribing: {audio_path}")
-    transcriber = AudioTranscriber()
+    transcriber = AudioTranscriber(cache=TranscriptionCache())
     result = transcriber.transcribe_audio(audio_path)
+    print(f"Cache: {transcriber.cache.report()}")
     
     if result:
         print(f"\nTranscription:\n{result}")
@@ -1,92 +1,188 @@
 """
 Calendar Manager - Handles Google Calendar event creation
 """
-from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+from googleapiclient.discovery import build_from_document
 from googleapiclient.errors import HttpError
+from googleapiclient.version import __version__ as GOOGLEAPICLIENT_VERSION
 from datetime import datetime, timedelta
+from functools import lru_cache
+from src.date_parser import NaturalDateParser
+from src.duration_estimator import DurationEstimator
+from src.slot_scheduler import SlotScheduler, MAX_SPILL_DAYS
+from src.event_index import task_fingerprint, event_id_for, FINGERPRINT_PROPERTY
+from src.rate_limiter import get_retry_policy, is_retriable_error, retry_after
+from src.models import coerce_reminder
 from dateutil import parser
+from zoneinfo import ZoneInfo
 import os
 import json
+import tempfile
+import time
 
 # Scopes required for calendar access
 SCOPES = ['https://www.googleapis.com/auth/calendar']
 
+# Parsed Calendar discovery documents, one file per googleapiclient version
+DISCOVERY_CACHE_DIR = os.path.join('.cache', 'discovery')
+DISCOVERY_URL = 'https://calendar.googleapis.com/$discovery/rest?version=v3'
+
+# Time zone for new events and free/busy lookups
+TIME_ZONE = 'America/Los_Angeles'
+
+# Calendar batch requests accept up to 50 calls
+BATCH_SIZE = 50
+MAX_BATCH_RETRIES = 3
+BATCH_RETRY_DELAY = 1.0  # Seconds, backoff ceiling doubled each retry round
+
+# Seconds between incremental syncs of the event index
+SYNC_INTERVAL = 300
+
+# Streaming mode fetches free/busy for this many days ahead on its first
+# query; most spoken due dates ("tomorrow", "Friday", "next week") fall inside
+STREAM_PREFETCH_DAYS = 7
+
+def load_credentials(credentials_path='credentials.json', token_path='token.json'):
+    """
+    Load Google OAuth credentials, refreshing or logging in if needed
+    
+    Args:
+        credentials_path (str): Path to OAuth client secrets
+        token_path (str): Path to cached user token
+        
+    Returns:
+        Credentials: Valid Google credentials
+    """
+    creds = None
+    
+    # Token stores the user's access and refresh tokens
+    if os.path.exists(token_path):
+        creds = Credentials.from_authorized_user_file(token_path, SCOPES)
+    
+    # If no valid credentials, let user log in
+    if not creds or not creds.valid:
+        if creds and creds.expired and creds.refresh_token:
+            from google.auth.transport.requests import Request
+            creds.refresh(Request())
+        else:
+            # The OAuth flow stack is only loaded for an interactive login
+            from google_auth_oauthlib.flow import InstalledAppFlow
+            flow = InstalledAppFlow.from_client_secrets_file(
+                credentials_path, SCOPES)
+            creds = flow.run_local_server(port=0)
+        
+        # Save credentials for next run
+        save_credentials(creds, token_path)
+    
+    return creds
+
+def save_credentials(creds, token_path='token.json'):
+    """Write credentials to the token file for the next run"""
+    with open(token_path, 'w') as token:
+        token.write(creds.to_json())
+
+@lru_cache(maxsize=None)
+def load_discovery_document(cache_dir=DISCOVERY_CACHE_DIR):
+    """
+    Calendar v3 discovery document, parsed once per process
+    
+    Read from a local file named after the installed googleapiclient
+    version, so an upgrade brings a fresh copy. On a miss the document
+    comes from the copy bundled with googleapiclient (or the network, for
+    versions without one) and is saved for the next run.
+    
+    Args:
+        cache_dir (str): Folder holding cached documents
+        
+    Returns:
+        dict: Discovery document, shared by every caller (do not modify)
+    """
+    path = os.path.join(cache_dir, f"calendar_v3_{GOOGLEAPICLIENT_VERSION}.json")
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        pass
+    
+    from googleapiclient.discovery_cache import get_static_doc
+    content = get_static_doc('calendar', 'v3')
+    if content is None:
+        import httplib2
+        response, content = httplib2.Http().request(DISCOVERY_URL)
+        if response.status != 200:
+            raise RuntimeError(f"Could not fetch the Calendar discovery document (HTTP {response.status})")
+    document = json.loads(content)
+    
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(document, f)
+        os.replace(temp_path, path)
+    except OSError as e:
+        print(f"⚠️  Could not cache the Calendar discovery document: {e}")
+    return document
+
+def _day_runs(days):
+    """Group sorted dates into (first, last) runs of consecutive days"""
+    runs = []
+    for day in days:
+        if runs and day == runs[-1][1] + timedelta(days=1):
+            runs[-1][1] = day
+        else:
+            runs.append([day, day])
+    return [tuple(run) for run in runs]
+
+
+def _without_id(event):
+    """Event body with its client-supplied ID removed, so Calendar assigns one"""
+    return {key: value for key, value in event.items() if key != 'id'}
+
 class CalendarManager:
-    def __init__(self, credentials_path='credentials.json'):
-        """Initialize Google Calendar API client"""
+    def __init__(self, credentials_path='credentials.json', credentials=None, event_index=None,
+                 retry_policy=None, service=None):
+        """
+        Initialize Google Calendar API client
+        
+        Args:
+            credentials_path (str): Path to OAuth client secrets
+            credentials (Credentials): Already loaded credentials to reuse
+            event_index (EventIndex): Tasks already on the calendar; when set,
+                repeated tasks are skipped instead of created again
+            retry_policy (RetryPolicy): Throttling and retries for API calls
+                (defaults to the shared 'calendar' limiter)
+            service (Resource): Ready-built Calendar client (e.g. pointed at
+                a stub server); skips OAuth when given
+        """
         self.credentials_path = credentials_path
-        self.service = self._authenticate()
+        self.credentials = credentials
+        self.event_index = event_index
+        self.retry_policy = retry_policy or get_retry_policy(
+            'calendar', max_retries=MAX_BATCH_RETRIES, base_delay=BATCH_RETRY_DELAY)
+        self.date_parser = NaturalDateParser()
+        self.duration_estimator = DurationEstimator()
+        self.service = service or self._authenticate()
     
     def _authenticate(self):
         """Authenticate with Google Calendar API"""
-        creds = None
-        token_path = 'token.json'
-        
-        # Token stores the user's access and refresh tokens
-        if os.path.exists(token_path):
-            creds = Credentials.from_authorized_user_file(token_path, SCOPES)
+        if self.credentials is None:
+            self.credentials = load_credentials(self.credentials_path)
         
-        # If no valid credentials, let user log in
-        if not creds or not creds.valid:
-            if creds and creds.expired and creds.refresh_token:
-                creds.refresh(Request())
-            else:
-                flow = InstalledAppFlow.from_client_secrets_file(
-                    self.credentials_path, SCOPES)
-                creds = flow.run_local_server(port=0)
-            
-            # Save credentials for next run
-            with open(token_path, 'w') as token:
-                token.write(creds.to_json())
-        
-        return build('calendar', 'v3', credentials=creds)
+        return build_from_document(load_discovery_document(), credentials=self.credentials)
     
-    def parse_natural_date(self, date_string):
+    def parse_natural_date(self, date_string, reference=None):
         """
-        Parse natural language dates like 'tomorrow', 'Friday', 'next week'
+        Parse natural language dates like 'tomorrow', 'Friday at 2pm', 'in 3 days'
         
         Args:
             date_string (str): Natural language date
+            reference (datetime): Clock to resolve relative dates against
+                (defaults to now)
             
         Returns:
-            datetime: Parsed datetime object
-        """
-        if not date_string:
-            # Default to tomorrow at 9 AM if no date specified
-            return datetime.now().replace(hour=9, minute=0, second=0, microsecond=0) + timedelta(days=1)
-        
-        date_string = date_string.lower().strip()
-        now = datetime.now()
-        
-        # Handle common cases
-        if 'tomorrow' in date_string:
-            return now.replace(hour=9, minute=0, second=0, microsecond=0) + timedelta(days=1)
-        elif 'today' in date_string:
-            return now.replace(hour=9, minute=0, second=0, microsecond=0)
-        elif 'next week' in date_string:
-            return now.replace(hour=9, minute=0, second=0, microsecond=0) + timedelta(days=7)
-        
-        # Try to parse day of week (Monday, Tuesday, etc.)
-        days_of_week = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
-        for i, day in enumerate(days_of_week):
-            if day in date_string:
-                # Find next occurrence of this day
-                current_weekday = now.weekday()
-                target_weekday = i
-                days_ahead = target_weekday - current_weekday
-                if days_ahead <= 0:
-                    days_ahead += 7
-                return now.replace(hour=9, minute=0, second=0, microsecond=0) + timedelta(days=days_ahead)
-        
-        # Try general date parsing
-        try:
-            return parser.parse(date_string, default=now.replace(hour=9, minute=0))
-        except:
-            # Default to tomorrow if parsing fails
-            return now.replace(hour=9, minute=0, second=0, microsecond=0) + timedelta(days=1)
+            datetime: Parsed datetime object (9 AM unless a time was given)
+        """
+        return self.date_parser.parse(date_string, reference)
     
     def estimate_duration(self, task_description, category):
         """
@@ -99,113 +195,338 @@ class CalendarManager:
         Returns:
             int: Duration in minutes
         """
-        description_lower = task_description.lower()
-        
-        # Category-based defaults
-        category_durations = {
-            'calls': 30,
-            'emails': 15,
-            'shopping': 60,
-            'health': 60,
-            'finance': 30,
-            'home': 90,
-            'social': 120,
-            'learning': 60,
-            'travel': 180,
-            'work': 60
-        }
-        
-        # Quick tasks (override category)
-        if any(word in description_lower for word in ['quick', 'briefly', 'check']):
-            return 15
-        
-        # Specific keywords
-        if 'meeting' in description_lower:
-            return 60
-        if 'appointment' in description_lower or 'doctor' in description_lower:
-            return 60
-        if 'gym' in description_lower or 'workout' in description_lower:
-            return 60
-        if 'call' in description_lower or 'phone' in description_lower:
-            return 30
-        if 'email' in description_lower:
-            return 15
-        
-        # Use category default or fallback to 30
-        return category_durations.get(category, 30)
+        return self.duration_estimator.estimate(task_description or '', category or '')
     
     def _get_color_for_priority(self, priority):
         """Map priority to Google Calendar color"""
-        colors = {
-            'urgent': '11',    # Red
-            'high': '11',      # Red
-            'medium': '5',     # Yellow
-            'low': '10'        # Green/Blue
+        return self.duration_estimator.color_for_priority(priority)
+    
+    def _plan_task(self, task, reference=None):
+        """
+        Resolve a task's due date and duration once, ready for scheduling
+        
+        Args:
+            task (Reminder): Task details
+            reference (datetime): Clock to resolve relative dates against
+            
+        Returns:
+            dict: Scheduler request (day, duration, priority, fixed_start)
+        """
+        # Keep an explicit time like "Friday at 2pm" as a fixed start
+        due, has_time = self.date_parser.parse_details(task.due_date, reference)
+        return {
+            'day': due.date(),
+            'duration': self.estimate_duration(task.title, task.category),
+            'priority': task.priority,
+            'fixed_start': due if has_time else None,
         }
-        return colors.get(priority.lower(), '5')
     
-    def _create_event_with_time(self, task, start_hour, calendar_id='primary'):
+    def _build_event(self, task, start_time, duration, fingerprint=None):
         """
-        Create event with specific start hour
+        Build the Calendar API body for a task
         
         Args:
-            task (dict): Task details
-            start_hour (float): Hour to start (e.g., 9.5 for 9:30 AM)
+            task (Reminder): Task details
+            start_time (datetime): Start of the event
+            duration (int): Length in minutes
+            fingerprint (str): Task fingerprint; sets a deterministic event ID
+            
+        Returns:
+            dict: Event body
+        """
+        end_time = start_time + timedelta(minutes=duration)
+        
+        event = {
+            'summary': task.title,
+            'description': task.notes,
+            'start': {
+                'dateTime': start_time.isoformat(),
+                'timeZone': TIME_ZONE,
+            },
+            'end': {
+                'dateTime': end_time.isoformat(),
+                'timeZone': TIME_ZONE,
+            },
+            'colorId': self._get_color_for_priority(task.priority)
+        }
+        if fingerprint:
+            event['id'] = event_id_for(fingerprint)
+            event['extendedProperties'] = {'private': {FINGERPRINT_PROPERTY: fingerprint}}
+        return event
+    
+    def _create_event_with_time(self, task, start_time, duration, calendar_id='primary',
+                                fingerprint=None):
+        """
+        Create event at a specific start time
+        
+        Args:
+            task (Reminder): Task details
+            start_time (datetime): Start of the event
+            duration (int): Length in minutes
             calendar_id (str): Calendar ID
+            fingerprint (str): Task fingerprint for an idempotent insert
             
         Returns:
             dict: Created event or None
         """
         try:
-            # Parse base date
-            base_date = self.parse_natural_date(task.get('dueDate'))
-            
-            # Set specific time
-            hour = int(start_hour)
-            minute = int((start_hour % 1) * 60)
-            start_time = base_date.replace(hour=hour, minute=minute, second=0, microsecond=0)
-            
-            # Estimate duration
-            duration = self.estimate_duration(
-                task.get('title', ''),
-                task.get('category', '')
-            )
-            end_time = start_time + timedelta(minutes=duration)
-            
-            # Create event
-            event = {
-                'summary': task.get('title', 'Untitled Task'),
-                'description': task.get('notes', ''),
-                'start': {
-                    'dateTime': start_time.isoformat(),
-                    'timeZone': 'America/Los_Angeles',
-                },
-                'end': {
-                    'dateTime': end_time.isoformat(),
-                    'timeZone': 'America/Los_Angeles',
-                },
-                'colorId': self._get_color_for_priority(task.get('priority', 'medium'))
-            }
+            event = self._build_event(task, start_time, duration, fingerprint)
             
             # Create the event
-            created_event = self.service.events().insert(
-                calendarId=calendar_id,
-                body=event
-            ).execute()
+            try:
+                created_event = self._execute(self.service.events().insert(
+                    calendarId=calendar_id,
+                    body=event
+                ))
+            except HttpError as error:
+                if not (fingerprint and self._is_conflict(error)):
+                    raise
+                if self._conflict_is_live(event['id'], calendar_id):
+                    # Created by an earlier run that never recorded it
+                    created_event = self._execute(self.service.events().update(
+                        calendarId=calendar_id,
+                        eventId=event['id'],
+                        body=event
+                    ))
+                else:
+                    # The ID belongs to a deleted event and stays reserved
+                    created_event = self._execute(self.service.events().insert(
+                        calendarId=calendar_id,
+                        body=_without_id(event)
+                    ))
             
-            print(f"   📅 Created: {task.get('title')} on {start_time.strftime('%A, %B %d at %I:%M %p')}")
+            if fingerprint and self.event_index is not None:
+                self.event_index.record(fingerprint, calendar_id, created_event['id'],
+                                        event['start']['dateTime'])
+            
+            print(f"   📅 Created: {task.title} on {start_time.strftime('%A, %B %d at %I:%M %p')}")
             return created_event
             
         except HttpError as error:
             print(f"   ❌ Error creating event: {error}")
             return None
     
-    def create_events_from_json(self, json_data):
+    def query_busy(self, start_day, end_day, calendar_id='primary'):
+        """
+        Fetch busy time with a single freebusy query
+        
+        Args:
+            start_day (date): First day to check
+            end_day (date): Last day to check (inclusive)
+            calendar_id (str): Calendar ID
+            
+        Returns:
+            list: (start, end) naive local datetimes; empty if the query fails
+        """
+        zone = ZoneInfo(TIME_ZONE)
+        time_min = datetime.combine(start_day, datetime.min.time(), tzinfo=zone)
+        time_max = datetime.combine(end_day + timedelta(days=1), datetime.min.time(), tzinfo=zone)
+        
+        try:
+            response = self._execute(self.service.freebusy().query(body={
+                'timeMin': time_min.isoformat(),
+                'timeMax': time_max.isoformat(),
+                'timeZone': TIME_ZONE,
+                'items': [{'id': calendar_id}],
+            }))
+        except HttpError as error:
+            print(f"   ⚠️  Could not read free/busy, scheduling without it: {error}")
+            return []
+        
+        busy = []
+        for block in response.get('calendars', {}).get(calendar_id, {}).get('busy', []):
+            start = parser.isoparse(block['start'])
+            end = parser.isoparse(block['end'])
+            if start.tzinfo is not None:
+                start = start.astimezone(zone).replace(tzinfo=None)
+                end = end.astimezone(zone).replace(tzinfo=None)
+            busy.append((start, end))
+        return busy
+    
+    def _execute(self, request):
+        """Execute one API request under the shared limiter, retrying rate limits and outages"""
+        return self.retry_policy.call(request.execute)
+    
+    def _is_retriable(self, error):
+        """Check whether a failed insert is worth sending again"""
+        return is_retriable_error(error)
+    
+    def _is_conflict(self, error):
+        """Check whether an insert failed because the event ID already exists"""
+        return isinstance(error, HttpError) and error.resp.status == 409
+    
+    def _conflict_is_live(self, event_id, calendar_id='primary'):
+        """
+        Check whether an event ID that failed with 409 belongs to a live event
+        
+        Returns:
+            bool: True to overwrite the existing event, False if it was
+                deleted and the task needs a fresh ID
+        """
+        try:
+            existing = self._execute(self.service.events().get(calendarId=calendar_id,
+                                                                eventId=event_id))
+        except HttpError as error:
+            # Unreadable for another reason - overwriting is the safe default
+            return error.resp.status not in (404, 410)
+        return existing.get('status') != 'cancelled'
+    
+    def insert_events_batched(self, events, calendar_id='primary',
+                              batch_size=BATCH_SIZE, max_retries=MAX_BATCH_RETRIES, method='insert'):
+        """
+        Insert events through Calendar batch requests
+        
+        Events go out in chunks of batch_size, each counted against the
+        shared calendar rate limit. Inserts that fail with a retriable error
+        are resent in a later round after a jittered backoff that honors
+        Retry-After; events that already succeeded are never sent again.
+        
+        Args:
+            events (list): Event bodies to insert
+            calendar_id (str): Calendar ID
+            batch_size (int): Maximum inserts per batch request
+            max_retries (int): Retry rounds for retriable failures
+            method (str): 'insert', or 'update' to overwrite events by their 'id'
+            
+        Returns:
+            list: One (created event, error) pair per input event
+        """
+        results = [(None, None)] * len(events)
+        pending = list(range(len(events)))
+        
+        for attempt in range(max_retries + 1):
+            retry = []
+            retry_errors = []
+            
+            def callback(request_id, response, exception):
+                index = int(request_id)
+                if exception is None:
+                    results[index] = (response, None)
+                else:
+                    results[index] = (None, exception)
+                    if self._is_retriable(exception):
+                        retry.append(index)
+                        retry_errors.append(exception)
+            
+            for chunk_start in range(0, len(pending), batch_size):
+                chunk = pending[chunk_start:chunk_start + batch_size]
+                self.retry_policy.acquire(requests=len(chunk))
+                batch = self.service.new_batch_http_request(callback=callback)
+                for index in chunk:
+                    if method == 'update':
+                        request = self.service.events().update(
+                            calendarId=calendar_id, eventId=events[index]['id'], body=events[index])
+                    else:
+                        request = self.service.events().insert(calendarId=calendar_id, body=events[index])
+                    batch.add(request, request_id=str(index))
+                try:
+                    batch.execute()
+                except HttpError as error:
+                    # The whole batch request failed, so every insert in it did
+                    for index in chunk:
+                        results[index] = (None, error)
+                    if self._is_retriable(error):
+                        retry.extend(chunk)
+                        retry_errors.append(error)
+            
+            if not retry or attempt == max_retries:
+                break
+            
+            pending = sorted(retry)
+            # Back off once per round; a Retry-After from any failure applies
+            longest = max(retry_errors, key=lambda e: retry_after(e) or 0)
+            self.retry_policy.backoff(attempt, longest)
+        
+        return results
+    
+    def sync_event_index(self, calendar_id='primary', max_age=SYNC_INTERVAL):
+        """
+        Bring the event index up to date with the calendar
+        
+        Uses incremental sync: only events changed since the stored
+        syncToken are listed, so a quiet calendar costs one small request.
+        Events deleted on the calendar are marked cancelled so their tasks
+        are not recreated. Skipped entirely if the last sync is recent.
+        
+        Args:
+            calendar_id (str): Calendar ID
+            max_age (float): Seconds a previous sync stays fresh
+            
+        Returns:
+            int: Number of index entries changed
+        """
+        if self.event_index is None:
+            return 0
+        
+        sync_token, synced_at = self.event_index.sync_state(calendar_id)
+        if sync_token and time.time() - synced_at < max_age:
+            return 0
+        
+        changed = 0
+        page_token = None
+        while True:
+            params = {
+                'calendarId': calendar_id,
+                'showDeleted': True,
+                'maxResults': 2500,
+                'fields': 'items(id,status,start,extendedProperties),nextPageToken,nextSyncToken',
+            }
+            if sync_token:
+                params['syncToken'] = sync_token
+            if page_token:
+                params['pageToken'] = page_token
+            
+            try:
+                response = self._execute(self.service.events().list(**params))
+            except HttpError as error:
+                if error.resp.status == 410 and sync_token:
+                    # Token expired - start over with a full sync
+                    sync_token, page_token = None, None
+                    continue
+                print(f"   ⚠️  Could not sync event index: {error}")
+                return changed
+            
+            for item in response.get('items', []):
+                if item.get('status') == 'cancelled':
+                    changed += self.event_index.mark_cancelled(calendar_id, item['id'])
+                    continue
+                fingerprint = item.get('extendedProperties', {}).get('private', {}).get(FINGERPRINT_PROPERTY)
+                if fingerprint:
+                    self.event_index.record(fingerprint, calendar_id, item['id'],
+                                            item.get('start', {}).get('dateTime'))
+                    changed += 1
+            
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                self.event_index.set_sync_token(calendar_id, response.get('nextSyncToken'))
+                return changed
+    
+    def _already_created(self, reminder, plan, calendar_id, memo=None):
+        """
+        Look a reminder up in the event index
+        
+        Args:
+            reminder (Reminder): Task details
+            plan (dict): Scheduler request from _plan_task
+            calendar_id (str): Calendar ID
+            memo (str): Content hash of the source memo
+            
+        Returns:
+            tuple: (fingerprint or None, True if an event exists or was deleted on purpose)
+        """
+        if self.event_index is None:
+            return None, False
+        fingerprint = task_fingerprint(reminder, plan['fixed_start'] or plan['day'], calendar_id, memo)
+        return fingerprint, self.event_index.get(fingerprint) is not None
+    
+    def create_events_from_json(self, json_data, calendar_id='primary', memo=None):
         """
         Create multiple events from formatted JSON
         
         Args:
             json_data (str or dict): JSON with reminders array
+            calendar_id (str): Calendar ID
+            memo (str): Content hash of the source memo
             
         Returns:
             list: Created events
@@ -214,35 +535,141 @@ class CalendarManager:
             data = json.loads(json_data)
         else:
             data = json_data
+        return self.create_events([coerce_reminder(reminder) for reminder in data.get('reminders', [])],
+                                  calendar_id, memo)
+    
+    def create_events(self, reminders, calendar_id='primary', memo=None):
+        """
+        Create an event for each reminder
         
-        created_events = []
-        reminders = data.get('reminders', [])
+        Existing calendar entries are read with one freebusy query, each
+        task goes into the earliest free slot on its due date (most urgent
+        first), and all event bodies are sent through batch requests.
+        With an event index, tasks created by an earlier run are skipped.
         
+        Args:
+            reminders (list): Reminder objects
+            calendar_id (str): Calendar ID
+            memo (str): Content hash of the source memo, so identical
+                wording in different memos gives different events
+            
+        Returns:
+            list: Created events
+        """
         print(f"\n📅 Creating {len(reminders)} calendar event(s)...")
         
-        # Group tasks by date to handle time conflicts
-        tasks_by_date = {}
+        # Resolve every relative date against the same clock
+        reference = datetime.now()
+        
+        # Skip tasks an earlier run already put on the calendar
+        self.sync_event_index(calendar_id)
+        fingerprints = []
+        new_reminders = []
+        plans = []
         for reminder in reminders:
-            date_key = reminder.get('dueDate', 'tomorrow')
-            if date_key not in tasks_by_date:
-                tasks_by_date[date_key] = []
-            tasks_by_date[date_key].append(reminder)
-        
-        # Process each date group
-        for date_key, tasks in tasks_by_date.items():
-            start_hour = 9  # Start at 9 AM for tasks on same day
-            
-            for task in tasks:
-                # Create event with staggered time
-                event = self._create_event_with_time(task, start_hour)
-                if event:
-                    created_events.append(event)
-                    
-                    # Increment start time for next task
-                    duration = self.estimate_duration(
-                        task.get('title', ''),
-                        task.get('category', '')
-                    )
-                    start_hour += (duration / 60)  # Convert minutes to hours
-        
-        return created_events
\ No newline at end of file
+            plan = self._plan_task(reminder, reference)
+            fingerprint, exists = self._already_created(reminder, plan, calendar_id, memo)
+            if exists:
+                print(f"   ⏭️  Already on calendar: {reminder.title}")
+                continue
+            fingerprints.append(fingerprint)
+            new_reminders.append(reminder)
+            plans.append(plan)
+        reminders = new_reminders
+        
+        if not reminders:
+            return []
+        
+        # One freebusy query covering every due date plus room to spill over
+        days = [plan['day'] for plan in plans]
+        busy = self.query_busy(min(days), max(days) + timedelta(days=MAX_SPILL_DAYS), calendar_id)
+        scheduler = SlotScheduler(busy, not_before=reference)
+        start_times = scheduler.schedule(plans)
+        
+        events = [self._build_event(reminder, start_time, plan['duration'], fingerprint)
+                  for reminder, start_time, plan, fingerprint
+                  in zip(reminders, start_times, plans, fingerprints)]
+        results = self.insert_events_batched(events, calendar_id)
+        
+        # IDs that already exist belong to events a crashed run created but
+        # never recorded - overwrite them instead of failing. IDs of deleted
+        # events stay reserved, so those tasks are inserted under a new ID.
+        conflicts = [i for i, (_, error) in enumerate(results)
+                     if fingerprints[i] and self._is_conflict(error)]
+        live = [i for i in conflicts if self._conflict_is_live(events[i]['id'], calendar_id)]
+        deleted = [i for i in conflicts if i not in live]
+        if live:
+            updates = self.insert_events_batched([events[i] for i in live], calendar_id,
+                                                 method='update')
+            for i, result in zip(live, updates):
+                results[i] = result
+        if deleted:
+            inserts = self.insert_events_batched([_without_id(events[i]) for i in deleted], calendar_id)
+            for i, result in zip(deleted, inserts):
+                results[i] = result
+        
+        # Report per task
+        created_events = []
+        for task, event, fingerprint, start_time, (created_event, error) in zip(
+                reminders, events, fingerprints, start_times, results):
+            if created_event:
+                if fingerprint:
+                    self.event_index.record(fingerprint, calendar_id, created_event['id'],
+                                            event['start']['dateTime'])
+                print(f"   📅 Created: {task.title} on {start_time.strftime('%A, %B %d at %I:%M %p')}")
+                created_events.append(created_event)
+            else:
+                print(f"   ❌ Error creating event '{task.title}': {error}")
+        
+        return created_events
+    
+    def create_events_streaming(self, reminders, calendar_id='primary', memo=None):
+        """
+        Create events one by one as reminders arrive from a stream
+        
+        Each reminder is inserted as soon as it is yielded instead of
+        waiting for the whole list. Free/busy is fetched only for days no
+        earlier query covered, and each event goes into the earliest free slot.
+        With an event index, tasks created by an earlier run are skipped.
+        
+        Args:
+            reminders (iterable): Reminder objects (or dicts), possibly still being generated
+            calendar_id (str): Calendar ID
+            memo (str): Content hash of the source memo
+            
+        Returns:
+            list: Created events
+        """
+        created_events = []
+        reference = datetime.now()
+        scheduler = SlotScheduler(not_before=reference)
+        fetched_days = set()
+        self.sync_event_index(calendar_id)
+        
+        for reminder in reminders:
+            reminder = coerce_reminder(reminder)
+            plan = self._plan_task(reminder, reference)
+            fingerprint, exists = self._already_created(reminder, plan, calendar_id, memo)
+            if exists:
+                print(f"   ⏭️  Already on calendar: {reminder.title}")
+                continue
+            
+            # The task may spill up to MAX_SPILL_DAYS past its due date
+            first_day = plan['day']
+            last_day = plan['day'] + timedelta(days=MAX_SPILL_DAYS)
+            if not fetched_days:
+                first_day = min(first_day, reference.date())
+                last_day = max(last_day, reference.date() + timedelta(days=STREAM_PREFETCH_DAYS + MAX_SPILL_DAYS))
+            window = [first_day + timedelta(days=offset) for offset in range((last_day - first_day).days + 1)]
+            for first, last in _day_runs([day for day in window if day not in fetched_days]):
+                for start, end in self.query_busy(first, last, calendar_id):
+                    scheduler.busy.add(start, end)
+            fetched_days.update(window)
+            
+            start_time = scheduler.place(plan['day'], plan['duration'], plan['fixed_start'])
+            event = self._create_event_with_time(reminder, start_time, plan['duration'], calendar_id,
+                                                 fingerprint)
+            if event:
+                created_events.append(event)
+        
+        return created_events
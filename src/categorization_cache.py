@@ -0,0 +1,142 @@
+"""
+Categorization Cache - Persistent LRU cache of Claude task extraction results
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_CACHE_PATH = os.path.join('.cache', 'categorizations.sqlite3')
+DEFAULT_MAX_ENTRIES = 1000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS categorizations (
+    key TEXT PRIMARY KEY,
+    tasks TEXT NOT NULL,
+    used_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS categorizations_by_use ON categorizations (used_at);
+"""
+
+
+def normalize_transcript(text):
+    """
+    Normalize a transcript so trivially different copies share a cache entry
+
+    Args:
+        text (str): Transcript text
+
+    Returns:
+        str: Lowercased text with runs of whitespace collapsed
+    """
+    return ' '.join(text.lower().split())
+
+
+class CategorizationCache:
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_entries=DEFAULT_MAX_ENTRIES):
+        """
+        Open (or create) the cache database
+
+        Entries live in SQLite, so each put writes one row instead of the
+        whole cache, and daemon workers can share the file.
+
+        Args:
+            path (str): SQLite database file
+            max_entries (int): Drop least recently used entries above this count
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+
+    def make_key(self, transcript, model, prompt_version):
+        """
+        Build the cache key for a transcript
+
+        Args:
+            transcript (str): Transcript text
+            model (str): Claude model name
+            prompt_version (str): Hash of the prompt template
+
+        Returns:
+            str: Cache key
+        """
+        material = f"{model}\0{prompt_version}\0{normalize_transcript(transcript)}"
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """
+        Look up parsed tasks
+
+        Args:
+            key (str): Cache key from make_key()
+
+        Returns:
+            dict: Cached tasks dict, or None on a miss
+        """
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT tasks FROM categorizations WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE categorizations SET used_at = ? WHERE key = ?",
+                               (time.time(), key))
+            self.hits += 1
+        # Decoded fresh each time, so callers cannot mutate the cached value
+        return json.loads(row[0])
+
+    def put(self, key, tasks):
+        """
+        Store parsed tasks, evicting the least recently used entries
+
+        Args:
+            key (str): Cache key from make_key()
+            tasks (dict): Parsed {"tasks": [...]} result
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO categorizations (key, tasks, used_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET tasks = excluded.tasks, used_at = excluded.used_at",
+                (key, json.dumps(tasks), time.time())
+            )
+            # Counted in SQL, so processes sharing the file agree on the size
+            cursor = self._conn.execute(
+                "DELETE FROM categorizations WHERE key NOT IN "
+                "(SELECT key FROM categorizations ORDER BY used_at DESC LIMIT ?)",
+                (self.max_entries,)
+            )
+            self.evictions += cursor.rowcount
+
+    def report(self):
+        """
+        Summarize cache effectiveness
+
+        Returns:
+            dict: Hit, miss and eviction counts plus hit rate
+        """
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
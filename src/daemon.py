@@ -0,0 +1,507 @@
+"""
+Daemon - Local submission API in front of a durable job queue and a pool of worker processes
+Other programs hand over audio files or transcripts over localhost HTTP or a Unix socket
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from socketserver import ThreadingMixIn, UnixStreamServer
+from urllib.parse import parse_qs, urlparse
+from src.job_queue import JobQueue, DEFAULT_QUEUE_PATH, STATUSES
+from src.metrics import get_metrics
+import json
+import multiprocessing
+import os
+import queue as queue_module
+import re
+import signal
+import tempfile
+import threading
+import time
+import traceback
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_PROCESSES = 2
+DEFAULT_SPOOL_DIR = os.path.join('.cache', 'spool')
+
+# Seconds an idle worker waits before checking the queue again
+POLL_INTERVAL = 0.5
+
+# Seconds shutdown waits for running jobs before stopping their workers
+DRAIN_TIMEOUT = 300
+
+# A worker that dies within WORKER_STABLE_SECONDS of starting is restarted
+# after a doubling delay (up to RESTART_BACKOFF_MAX); after
+# MAX_QUICK_RESTARTS such deaths in a row its slot is left empty
+WORKER_STABLE_SECONDS = 60
+RESTART_BACKOFF_BASE = 1.0
+RESTART_BACKOFF_MAX = 60.0
+MAX_QUICK_RESTARTS = 5
+
+# Largest accepted upload; long recordings are split before transcription
+MAX_UPLOAD_BYTES = 512 * 1024 * 1024
+_COPY_CHUNK = 1024 * 1024
+
+_SAFE_NAME = re.compile(r'[^A-Za-z0-9._-]+')
+
+
+def _discard_upload(job, spool_dir):
+    """Delete a finished audio job's spooled upload (never files outside the spool)"""
+    if job['kind'] != 'audio':
+        return
+    path = os.path.abspath(job['payload'])
+    if os.path.dirname(path) != os.path.abspath(spool_dir):
+        return
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def _worker_main(queue_path, handler, context_options, stop, worker_name, poll_interval, spool_dir,
+                 limit_share, metrics_queue=None, trace_path=None):
+    """
+    Worker process loop: claim a job, run it, record the outcome
+
+    The stop event is only checked between jobs, so a job that has started
+    always finishes. Ctrl+C is ignored here; the parent drains the pool.
+    Uploaded audio is deleted once its job is done or has failed. With a
+    metrics queue, the metrics recorded for each job are sent to the parent.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # Imported in the child so the parent never loads the provider clients
+    from src.service_context import ServiceContext
+    from src.rate_limiter import set_limit_share
+    from src.metrics import enable_metrics
+
+    # Every worker has its own limiters; together they keep to the configured rates
+    set_limit_share(limit_share)
+    # Enabled before the context is built so its collectors register
+    metrics = enable_metrics(trace_path=trace_path) if metrics_queue is not None else None
+
+    queue = JobQueue(queue_path)
+    context = ServiceContext(**context_options)
+    try:
+        while not stop.is_set():
+            job = queue.claim(worker_name)
+            if job is None:
+                stop.wait(poll_interval)
+                continue
+            try:
+                result = handler(job, context)
+            except Exception as e:
+                traceback.print_exc()
+                queue.fail(job['id'], str(e) or type(e).__name__)
+            else:
+                queue.complete(job['id'], result)
+            _discard_upload(job, spool_dir)
+            if metrics is not None:
+                metrics_queue.put(metrics.take_delta())
+    finally:
+        context.close()
+        queue.close()
+
+
+class _UnixHTTPServer(ThreadingMixIn, UnixStreamServer):
+    daemon_threads = True
+
+
+class _DaemonHandler(BaseHTTPRequestHandler):
+    """
+    Routes:
+        POST /jobs/audio?name=memo.m4a   Raw audio bytes in the body
+        POST /jobs/transcript            JSON {"text": ..., "name": ...} or plain text
+        GET  /jobs/<id>                  One job
+        GET  /jobs?status=queued&limit=N Recent jobs
+        GET  /status                     Queue counts, workers and drain state
+    """
+
+    protocol_version = 'HTTP/1.1'
+
+    def _send_json(self, data, status=200):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status, message):
+        self._send_json({'error': message}, status=status)
+
+    def do_GET(self):
+        daemon = self.server.daemon
+        url = urlparse(self.path)
+        params = parse_qs(url.query)
+        path = url.path.rstrip('/')
+
+        if path == '/status':
+            self._send_json(daemon.status())
+        elif path == '/jobs':
+            status = params.get('status', [None])[0]
+            if status is not None and status not in STATUSES:
+                self._error(400, f"Unknown status: {status}")
+                return
+            try:
+                limit = int(params.get('limit', ['100'])[0])
+            except ValueError:
+                self._error(400, "limit must be a number")
+                return
+            self._send_json({'jobs': daemon.queue.list(status=status, limit=limit)})
+        elif path.startswith('/jobs/') and path[len('/jobs/'):].isdigit():
+            job = daemon.queue.get(int(path[len('/jobs/'):]))
+            if job is None:
+                self._error(404, "No such job")
+            else:
+                self._send_json(job)
+        else:
+            self._error(404, "Not found")
+
+    def do_POST(self):
+        daemon = self.server.daemon
+        url = urlparse(self.path)
+        params = parse_qs(url.query)
+        path = url.path.rstrip('/')
+        length = int(self.headers.get('Content-Length') or 0)
+
+        if daemon.draining:
+            # Leave the body unread; the connection is closed after this reply
+            self.close_connection = True
+            self._error(503, "Shutting down, not accepting jobs")
+            return
+        if length <= 0:
+            self._error(400, "Empty request body")
+            return
+        if length > MAX_UPLOAD_BYTES:
+            self.close_connection = True
+            self._error(413, f"Body larger than {MAX_UPLOAD_BYTES} bytes")
+            return
+
+        if path == '/jobs/audio':
+            name = params.get('name', [None])[0]
+            job_id = daemon.submit_audio(self.rfile, length, name)
+        elif path == '/jobs/transcript':
+            body = self.rfile.read(length).decode('utf-8', 'replace')
+            name = params.get('name', [None])[0]
+            if 'json' in (self.headers.get('Content-Type') or ''):
+                try:
+                    data = json.loads(body)
+                    text, name = data['text'], data.get('name') or name
+                except (ValueError, KeyError, TypeError):
+                    self._error(400, 'Expected JSON like {"text": "..."}')
+                    return
+            else:
+                text = body
+            if not text.strip():
+                self._error(400, "Empty transcript")
+                return
+            job_id = daemon.queue.submit('transcript', text, name=name)
+        else:
+            self._error(404, "Not found")
+            return
+
+        self._send_json({'id': job_id, 'status': 'queued'}, status=202)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class Daemon:
+    def __init__(self, handler, context_options=None, queue_path=DEFAULT_QUEUE_PATH,
+                 spool_dir=DEFAULT_SPOOL_DIR, processes=DEFAULT_PROCESSES, host=DEFAULT_HOST,
+                 port=DEFAULT_PORT, socket_path=None, poll_interval=POLL_INTERVAL):
+        """
+        Configure the daemon (nothing starts until start())
+
+        Args:
+            handler (callable): Top-level function (job dict, ServiceContext)
+                -> result string, run in a worker process for each job;
+                raising marks the job failed
+            context_options (dict): Keyword arguments for each worker's ServiceContext
+            queue_path (str): SQLite file backing the job queue
+            spool_dir (str): Folder for uploaded audio waiting to be processed
+            processes (int): Worker processes
+            host (str): Interface for the HTTP endpoint
+            port (int): Port for the HTTP endpoint
+            socket_path (str): Serve on this Unix socket instead of host/port
+            poll_interval (float): Seconds idle workers wait between queue checks
+        """
+        if processes < 1:
+            raise ValueError("Daemon needs at least one worker process")
+        self.handler = handler
+        self.context_options = context_options or {}
+        self.queue_path = queue_path
+        self.spool_dir = spool_dir
+        self.processes = processes
+        self.host = host
+        self.port = port
+        self.socket_path = socket_path
+        self.poll_interval = poll_interval
+        self.queue = None
+        self.draining = False
+        self.started_at = None
+        self._workers = []
+        # Worker slot -> {'started', 'failures', 'restart_at', 'exitcode', 'gave_up'}
+        self._worker_state = {}
+        self._server = None
+        self._server_thread = None
+        self._stop_workers = None
+        self._metrics_queue = None
+        self._metrics_thread = None
+        self._stopped = threading.Event()
+        # spawn gives workers a clean interpreter, free of the server's threads
+        self._mp = multiprocessing.get_context('spawn')
+
+    @property
+    def address(self):
+        """Where the daemon listens, for log messages"""
+        if self.socket_path:
+            return f"unix:{self.socket_path}"
+        return f"http://{self.host}:{self.port}"
+
+    def start(self):
+        """Recover interrupted jobs, start the workers, then the endpoint"""
+        os.makedirs(self.spool_dir, exist_ok=True)
+        self.queue = JobQueue(self.queue_path)
+        requeued = self.queue.requeue_running()
+        if requeued:
+            print(f"♻️  Re-queued {requeued} job(s) interrupted by the last shutdown")
+        swept = self.sweep_spool()
+        if swept:
+            print(f"🧹 Removed {swept} spooled upload(s) with no job waiting for them")
+
+        metrics = get_metrics()
+        if metrics.enabled:
+            # Workers record into their own registries and ship per-job deltas here
+            metrics.add_collector(self.collect_metrics)
+            self._metrics_queue = self._mp.Queue()
+            self._metrics_thread = threading.Thread(target=self._merge_worker_metrics,
+                                                    name="daemon-metrics", daemon=True)
+            self._metrics_thread.start()
+
+        self._stop_workers = self._mp.Event()
+        self._workers = [self._start_worker(n) for n in range(self.processes)]
+
+        if self.socket_path:
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+            self._server = _UnixHTTPServer(self.socket_path, _DaemonHandler)
+        else:
+            self._server = ThreadingHTTPServer((self.host, self.port), _DaemonHandler)
+            self._server.daemon_threads = True
+            self.port = self._server.server_address[1]
+        self._server.daemon = self
+        self._server_thread = threading.Thread(target=self._server.serve_forever,
+                                               name="daemon-http", daemon=True)
+        self._server_thread.start()
+        self.started_at = time.time()
+        return self
+
+    def _start_worker(self, n):
+        state = self._worker_state.setdefault(
+            n, {'failures': 0, 'restart_at': None, 'exitcode': None, 'gave_up': False})
+        state['started'] = time.monotonic()
+        state['restart_at'] = None
+        worker = self._mp.Process(
+            target=_worker_main,
+            args=(self.queue_path, self.handler, self.context_options,
+                  self._stop_workers, f"worker-{n}", self.poll_interval, self.spool_dir,
+                  1 / self.processes, self._metrics_queue, get_metrics().trace_path),
+            name=f"daemon-worker-{n}",
+        )
+        worker.start()
+        return worker
+
+    def submit_audio(self, stream, length, name=None):
+        """
+        Spool an uploaded recording to disk and queue it
+
+        Args:
+            stream (file): Readable body
+            length (int): Bytes to read
+            name (str): Original file name (its extension is kept)
+
+        Returns:
+            int: Job id
+        """
+        name = _SAFE_NAME.sub('_', os.path.basename(name or 'upload.m4a')) or 'upload.m4a'
+        stem, extension = os.path.splitext(name)
+        fd, path = tempfile.mkstemp(dir=self.spool_dir, prefix=f"{stem}-", suffix=extension or '.m4a')
+        with os.fdopen(fd, 'wb') as f:
+            remaining = length
+            while remaining:
+                chunk = stream.read(min(_COPY_CHUNK, remaining))
+                if not chunk:
+                    break
+                f.write(chunk)
+                remaining -= len(chunk)
+        return self.queue.submit('audio', path, name=name)
+
+    def _merge_worker_metrics(self):
+        """Fold metrics deltas sent by the workers into this process's registry"""
+        metrics = get_metrics()
+        while True:
+            try:
+                delta = self._metrics_queue.get(timeout=0.5)
+            except queue_module.Empty:
+                if self._stopped.is_set():
+                    return
+                continue
+            except (EOFError, OSError):
+                return
+            metrics.merge(delta)
+
+    def collect_metrics(self):
+        """
+        Queue and pool gauges for the metrics exporter
+
+        Returns:
+            list: (name, kind, labels, value) tuples
+        """
+        if self._stopped.is_set():
+            return []
+        samples = [('daemon_jobs', 'gauge', {'status': status}, count)
+                   for status, count in self.queue.counts().items()]
+        samples.append(('daemon_workers', 'gauge', {},
+                        sum(1 for worker in self._workers if worker.is_alive())))
+        return samples
+
+    def sweep_spool(self):
+        """
+        Delete spooled uploads that no queued or running job refers to
+
+        Covers uploads left by jobs that failed for good (e.g. interrupted
+        too many times) and by crashes between spooling and queueing.
+
+        Returns:
+            int: Files removed
+        """
+        active = {os.path.abspath(path) for path in self.queue.active_payloads('audio')}
+        removed = 0
+        for entry in os.scandir(self.spool_dir):
+            if entry.is_file() and os.path.abspath(entry.path) not in active:
+                try:
+                    os.unlink(entry.path)
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+        return removed
+
+    def check_workers(self):
+        """
+        Restart workers that died, backing off when they keep failing
+
+        A worker that ran for WORKER_STABLE_SECONDS before dying (e.g.
+        killed by the OOM killer) is replaced straight away. One that dies
+        soon after starting, such as on a missing API key, is retried after
+        a doubling delay and given up on after MAX_QUICK_RESTARTS attempts.
+        """
+        if self._stop_workers.is_set():
+            return
+        now = time.monotonic()
+        for n, worker in enumerate(self._workers):
+            state = self._worker_state[n]
+            if worker.is_alive() or state['gave_up']:
+                continue
+            if state['restart_at'] is None:
+                # Newly noticed death
+                self.queue.requeue_running(worker=f"worker-{n}")
+                state['exitcode'] = worker.exitcode
+                if now - state['started'] >= WORKER_STABLE_SECONDS:
+                    state['failures'] = 0
+                state['failures'] += 1
+                if state['failures'] > MAX_QUICK_RESTARTS:
+                    state['gave_up'] = True
+                    print(f"❌ {worker.name} keeps exiting (code {worker.exitcode}); "
+                          f"not restarting it, see /status")
+                    continue
+                delay = min(RESTART_BACKOFF_MAX, RESTART_BACKOFF_BASE * 2 ** (state['failures'] - 1))
+                state['restart_at'] = now + delay
+                print(f"⚠️  {worker.name} exited unexpectedly (code {worker.exitcode}), "
+                      f"restarting it in {delay:g}s")
+            if now >= state['restart_at']:
+                self._workers[n] = self._start_worker(n)
+
+    def status(self):
+        """
+        Daemon health for the /status endpoint
+
+        Returns:
+            dict: Job counts by state, live workers, drain flag, uptime and
+                workers that are exiting unexpectedly
+        """
+        failing = [
+            {
+                'worker': f"worker-{n}",
+                'exitcode': state['exitcode'],
+                'failures': state['failures'],
+                'restarting': not state['gave_up'],
+            }
+            for n, state in sorted(self._worker_state.items())
+            if state['failures'] and (state['gave_up'] or state['restart_at'] is not None
+                                      or time.monotonic() - state['started'] < WORKER_STABLE_SECONDS)
+        ]
+        return {
+            'jobs': self.queue.counts(),
+            'workers': sum(1 for worker in self._workers if worker.is_alive()),
+            'processes': self.processes,
+            'failing_workers': failing,
+            'draining': self.draining,
+            'uptime_seconds': time.time() - self.started_at if self.started_at else 0,
+        }
+
+    def shutdown(self, timeout=DRAIN_TIMEOUT):
+        """
+        Stop gracefully: refuse new jobs, let running ones finish, then exit
+
+        Jobs still queued stay in the database for the next start. Workers
+        that outlive the timeout are terminated and their jobs re-queued.
+
+        Args:
+            timeout (float): Seconds to wait for running jobs
+        """
+        if self._stopped.is_set():
+            return
+        self.draining = True
+        self._stop_workers.set()
+
+        deadline = time.monotonic() + timeout
+        for worker in self._workers:
+            worker.join(max(0, deadline - time.monotonic()))
+        for worker in self._workers:
+            if worker.is_alive():
+                print(f"⚠️  {worker.name} did not finish in time, stopping it")
+                worker.terminate()
+                worker.join()
+        self.queue.requeue_running()
+
+        self._server.shutdown()
+        self._server.server_close()
+        if self.socket_path and os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self._stopped.set()
+        if self._metrics_thread is not None:
+            # Takes whatever the workers sent before exiting, then stops
+            self._metrics_thread.join(timeout=5)
+        self.queue.close()
+
+    def serve_forever(self, drain_timeout=DRAIN_TIMEOUT):
+        """
+        Run until SIGINT or SIGTERM, then shut down gracefully
+
+        Args:
+            drain_timeout (float): Seconds to wait for running jobs on shutdown
+        """
+        stop = threading.Event()
+
+        def request_stop(signum, frame):
+            stop.set()
+
+        previous = {sig: signal.signal(sig, request_stop) for sig in (signal.SIGINT, signal.SIGTERM)}
+        try:
+            while not stop.wait(1):
+                self.check_workers()
+            print("\n🛑 Draining running jobs...")
+            self.shutdown(drain_timeout)
+        finally:
+            for sig, handler in previous.items():
+                signal.signal(sig, handler)
@@ -0,0 +1,345 @@
+"""
+Date Parser - Precompiled, memoized grammar for natural language due dates
+Handles phrases like "tomorrow", "end of week", "in 3 days", "in 2 hours", "next Tuesday 2:30pm"
+"""
+from datetime import datetime, timedelta
+from functools import lru_cache
+from dateutil import parser as dateutil_parser
+import calendar
+import re
+
+# Tasks without an explicit time start at 9 AM
+DEFAULT_HOUR = 9
+
+# "End of day" means the end of the working day
+END_OF_DAY = (17, 0)
+
+WEEKDAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+_WEEKDAY_INDEX = {name: i for i, name in enumerate(WEEKDAYS)}
+_WEEKDAY_INDEX.update({name[:3]: i for i, name in enumerate(WEEKDAYS)})
+_WEEKDAY_INDEX.update({'tues': 1, 'wed': 2, 'thur': 3, 'thurs': 3})
+
+_NUMBER_WORDS = {
+    'a': 1, 'an': 1, 'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5,
+    'six': 6, 'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10, 'couple of': 2, 'few': 3,
+}
+
+_PARTS_OF_DAY = {'morning': (9, 0), 'noon': (12, 0), 'midday': (12, 0), 'afternoon': (14, 0),
+                 'evening': (18, 0), 'tonight': (19, 0), 'night': (20, 0)}
+
+_WEEKDAY_WORDS = '|'.join(sorted(_WEEKDAY_INDEX, key=len, reverse=True))
+_NUMBER = r'\d+|' + '|'.join(sorted(_NUMBER_WORDS, key=len, reverse=True))
+
+_DAY_PATTERN = re.compile(
+    r'\b(?:'
+    r'(?P<today>today|tonight)|'
+    r'(?P<after_tomorrow>(?:the\s+)?day\s+after\s+tomorrow)|'
+    r'(?P<tomorrow>tomorrow|tmrw|tmr)|'
+    r'in\s+(?P<count>%s)\s+(?P<unit>days?|weeks?|months?)|'
+    r'(?P<end_of>end\s+of\s+(?:the\s+)?(?:this\s+)?(?P<end_unit>day|week|month)|eod)|'
+    r'(?P<weekend_mod>this|next)\s+weekend|(?P<weekend>weekend)|'
+    r'(?P<period_mod>next|this)\s+(?P<period>week|month)|'
+    r'(?:(?P<weekday_mod>next|this|coming)\s+)?(?P<weekday>%s)\b'
+    r')' % (_NUMBER, _WEEKDAY_WORDS),
+    re.I
+)
+
+# "in 2 hours" is relative to the clock, not the day, so it is resolved outside the memo
+_DURATION_PATTERN = re.compile(
+    r'\bin\s+(?:(?P<half>half\s+an)\s+hour|(?:a\s+)?(?P<count>%s)\s+(?P<unit>hours?|hrs?|minutes?|mins?))\b'
+    % _NUMBER,
+    re.I
+)
+
+# Words around a date that dateutil may skip ("by March 3", "due on the 5th")
+_DATE_FILLER = {'by', 'on', 'at', 'before', 'until', 'due', 'the', 'of', 'this', 'next',
+                'around', 'no', 'later', 'than', 'in', 'for', ','}
+
+# An explicitly spoken year; without one, absolute dates are never in the past
+_YEAR_PATTERN = re.compile(r'\b\d{4}\b')
+
+_TIME_PATTERN = re.compile(
+    r'\b(?:'
+    r'(?P<hour>\d{1,2})(?::(?P<minute>\d{2}))?\s*(?P<ampm>a\.?m\.?|p\.?m\.?)|'
+    r'(?:at\s+)?(?P<hour24>[01]?\d|2[0-3]):(?P<minute24>\d{2})|'
+    r'at\s+(?P<bare_hour>\d{1,2})(?!\s*(?:days?|weeks?))\b|'
+    r'(?P<part>morning|noon|midday|afternoon|evening|tonight|night)'
+    r')',
+    re.I
+)
+
+
+def _parse_time(phrase):
+    """
+    Find an explicit time of day
+
+    Returns:
+        tuple: (hour, minute) or None
+    """
+    match = _TIME_PATTERN.search(phrase)
+    if not match:
+        return None
+
+    if match.group('hour'):
+        hour = int(match.group('hour')) % 12
+        if match.group('ampm').lower().startswith('p'):
+            hour += 12
+        return hour, int(match.group('minute') or 0)
+    if match.group('hour24'):
+        return int(match.group('hour24')), int(match.group('minute24'))
+    if match.group('bare_hour'):
+        # "at 3" almost always means the afternoon for reminders
+        hour = int(match.group('bare_hour'))
+        if 1 <= hour <= 7:
+            hour += 12
+        return (hour, 0) if hour < 24 else None
+    return _PARTS_OF_DAY[match.group('part').lower()]
+
+
+def _next_weekday(reference_date, weekday):
+    """Next occurrence of a weekday strictly after the reference date"""
+    days_ahead = weekday - reference_date.weekday()
+    if days_ahead <= 0:
+        days_ahead += 7
+    return reference_date + timedelta(days=days_ahead)
+
+
+def _resolve_day(match, reference_date):
+    """Turn a _DAY_PATTERN match into a date"""
+    if match.group('today'):
+        return reference_date
+    if match.group('after_tomorrow'):
+        return reference_date + timedelta(days=2)
+    if match.group('tomorrow'):
+        return reference_date + timedelta(days=1)
+
+    if match.group('count'):
+        count = match.group('count').lower()
+        count = int(count) if count.isdigit() else _NUMBER_WORDS[count]
+        unit = match.group('unit').lower()
+        if unit.startswith('day'):
+            return reference_date + timedelta(days=count)
+        if unit.startswith('week'):
+            return reference_date + timedelta(weeks=count)
+        return reference_date + timedelta(days=30 * count)
+
+    if match.group('end_of'):
+        unit = (match.group('end_unit') or 'day').lower()
+        if unit == 'day':
+            return reference_date
+        if unit == 'week':
+            # Friday of this week, or today if it is already the weekend
+            days_ahead = 4 - reference_date.weekday()
+            return reference_date + timedelta(days=max(days_ahead, 0))
+        last_day = calendar.monthrange(reference_date.year, reference_date.month)[1]
+        return reference_date.replace(day=last_day)
+
+    if match.group('weekend_mod') or match.group('weekend'):
+        saturday = _next_weekday(reference_date, 5) if reference_date.weekday() != 5 else reference_date
+        if (match.group('weekend_mod') or '').lower() == 'next':
+            saturday += timedelta(days=7)
+        return saturday
+
+    if match.group('period'):
+        if match.group('period_mod').lower() == 'this':
+            return reference_date
+        if match.group('period').lower() == 'week':
+            return reference_date + timedelta(days=7)
+        return reference_date + timedelta(days=30)
+
+    # Weekdays always mean the next occurrence after today
+    return _next_weekday(reference_date, _WEEKDAY_INDEX[match.group('weekday').lower()])
+
+
+def _next_year(day):
+    """The same month and day a year later (Feb 29 becomes Feb 28)"""
+    try:
+        return day.replace(year=day.year + 1)
+    except ValueError:
+        return day.replace(year=day.year + 1, day=28)
+
+
+@lru_cache(maxsize=4096)
+def _resolve(phrase, reference_date):
+    """
+    Resolve a normalized phrase against a reference day (memoized)
+
+    Args:
+        phrase (str): Lowercased, stripped phrase
+        reference_date (date): Day the phrase is relative to
+
+    Returns:
+        tuple: (date, (hour, minute) or None)
+    """
+    time_of_day = _parse_time(phrase)
+    match = _DAY_PATTERN.search(phrase)
+    if match:
+        end_unit = match.group('end_unit') or ('day' if match.group('end_of') else '')
+        if time_of_day is None and end_unit.lower() == 'day':
+            time_of_day = END_OF_DAY
+        return _resolve_day(match, reference_date), time_of_day
+
+    # A bare time like "at 3pm" or "this afternoon" means today
+    date_text = _TIME_PATTERN.sub(' ', phrase) if time_of_day else phrase
+    if time_of_day and all(word in _DATE_FILLER for word in date_text.split()):
+        return reference_date, time_of_day
+
+    # Absolute dates such as "March 3" or "2024-05-01". Only a clean parse
+    # counts: fuzzy matching would pull numbers out of unrelated words.
+    try:
+        default = datetime.combine(reference_date, datetime.min.time()).replace(hour=DEFAULT_HOUR)
+        parsed, skipped = dateutil_parser.parse(phrase, default=default, fuzzy_with_tokens=True)
+        if all(word in _DATE_FILLER for token in skipped for word in token.split()):
+            day = parsed.date()
+            # "by March 3" in October is next March, unless a year was spoken
+            if day < reference_date and not _YEAR_PATTERN.search(phrase):
+                day = _next_year(day)
+            return day, time_of_day
+    except (ValueError, OverflowError):
+        pass
+    # Default to tomorrow if parsing fails
+    return reference_date + timedelta(days=1), time_of_day
+
+
+@lru_cache(maxsize=1024)
+def _relative_offset(phrase):
+    """
+    Offset for phrases relative to the clock, such as "in 2 hours"
+
+    Args:
+        phrase (str): Lowercased, stripped phrase
+
+    Returns:
+        timedelta: Offset from the reference time, or None
+    """
+    match = _DURATION_PATTERN.search(phrase)
+    if not match:
+        return None
+    if match.group('half'):
+        return timedelta(minutes=30)
+    count = match.group('count').lower()
+    count = int(count) if count.isdigit() else _NUMBER_WORDS[count]
+    if match.group('unit').lower().startswith('h'):
+        return timedelta(hours=count)
+    return timedelta(minutes=count)
+
+
+class NaturalDateParser:
+    def __init__(self, default_hour=DEFAULT_HOUR):
+        """
+        Initialize the parser
+
+        Args:
+            default_hour (int): Hour used when a phrase has no explicit time
+        """
+        self.default_hour = default_hour
+
+    def parse_details(self, date_string, reference=None):
+        """
+        Parse a natural language date and report whether it named a time
+
+        Args:
+            date_string (str): Natural language date (None means tomorrow)
+            reference (datetime): Clock to resolve relative phrases against
+                (defaults to now)
+
+        Returns:
+            tuple: (datetime, True if the phrase included a time of day)
+        """
+        reference = reference or datetime.now()
+        if not date_string:
+            day, time_of_day = reference.date() + timedelta(days=1), None
+        else:
+            phrase = date_string.lower().strip()
+            offset = _relative_offset(phrase)
+            if offset is not None:
+                return (reference + offset).replace(second=0, microsecond=0), True
+            day, time_of_day = _resolve(phrase, reference.date())
+
+        hour, minute = time_of_day or (self.default_hour, 0)
+        return datetime.combine(day, datetime.min.time()).replace(hour=hour, minute=minute), \
+            time_of_day is not None
+
+    def parse(self, date_string, reference=None):
+        """
+        Parse a natural language date
+
+        Args:
+            date_string (str): Natural language date
+            reference (datetime): Clock to resolve relative phrases against
+
+        Returns:
+            datetime: Parsed datetime (9 AM unless the phrase named a time)
+        """
+        return self.parse_details(date_string, reference)[0]
+
+    def parse_many(self, date_strings, reference=None):
+        """
+        Parse many phrases against one reference clock
+
+        Args:
+            date_strings (iterable): Natural language dates
+            reference (datetime): Shared clock (defaults to now, read once)
+
+        Returns:
+            list: Parsed datetimes in input order
+        """
+        reference = reference or datetime.now()
+        return [self.parse(date_string, reference) for date_string in date_strings]
+
+
+if __name__ == "__main__":
+    # Benchmark against the original CalendarManager.parse_natural_date
+    import random
+    import time
+
+    def legacy_parse_natural_date(date_string):
+        if not date_string:
+            return datetime.now().replace(hour=9, minute=0, second=0, microsecond=0) + timedelta(days=1)
+        date_string = date_string.lower().strip()
+        now = datetime.now()
+        if 'tomorrow' in date_string:
+            return now.replace(hour=9, minute=0, second=0, microsecond=0) + timedelta(days=1)
+        elif 'today' in date_string:
+            return now.replace(hour=9, minute=0, second=0, microsecond=0)
+        elif 'next week' in date_string:
+            return now.replace(hour=9, minute=0, second=0, microsecond=0) + timedelta(days=7)
+        for i, day in enumerate(WEEKDAYS):
+            if day in date_string:
+                days_ahead = i - now.weekday()
+                if days_ahead <= 0:
+                    days_ahead += 7
+                return now.replace(hour=9, minute=0, second=0, microsecond=0) + timedelta(days=days_ahead)
+        try:
+            return dateutil_parser.parse(date_string, default=now.replace(hour=9, minute=0))
+        except Exception:
+            return now.replace(hour=9, minute=0, second=0, microsecond=0) + timedelta(days=1)
+
+    samples = [
+        "tomorrow", "today", "tonight", "next week", "Friday", "friday at 2pm", "next Tuesday 2:30pm",
+        "end of week", "end of the month", "in 3 days", "in two weeks", "this weekend",
+        "Monday morning", "by Thursday", "March 3", "2024-12-01", "day after tomorrow",
+        "tomorrow at 10am", "sometime soon", "at 3", None,
+    ]
+    corpus = [random.choice(samples) for _ in range(50000)]
+
+    date_parser = NaturalDateParser()
+    reference = datetime.now()
+    for phrase in ["tomorrow", "friday at 2pm", "next Tuesday 2:30pm", "end of week",
+                   "in 3 days", "this weekend", "March 3"]:
+        print(f"{phrase!r:>24} -> {date_parser.parse(phrase, reference):%a %Y-%m-%d %H:%M}")
+
+    started = time.perf_counter()
+    for phrase in corpus:
+        legacy_parse_natural_date(phrase)
+    legacy = time.perf_counter() - started
+
+    _resolve.cache_clear()
+    started = time.perf_counter()
+    date_parser.parse_many(corpus, reference)
+    compiled = time.perf_counter() - started
+
+    print(f"\n{len(corpus)} phrases")
+    print(f"legacy parse_natural_date: {legacy * 1e6 / len(corpus):6.2f} µs/phrase")
+    print(f"NaturalDateParser.parse_many: {compiled * 1e6 / len(corpus):6.2f} µs/phrase "
+          f"({legacy / compiled:.1f}x faster)")
@@ -0,0 +1,110 @@
+"""
+Duration Estimator - Compiled keyword rules for task durations and priority colors
+Rules are loaded once from a JSON file (duration_rules.json by default)
+"""
+from functools import lru_cache
+import json
+import os
+import re
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'duration_rules.json')
+
+
+class DurationEstimator:
+    def __init__(self, rules_path=DEFAULT_RULES_PATH, cache_size=4096):
+        """
+        Load and compile the rules
+
+        Args:
+            rules_path (str): JSON file with keyword_rules, category_minutes,
+                default_minutes, priority_colors and default_color
+            cache_size (int): Number of (description, category) lookups to keep
+        """
+        with open(rules_path, 'r', encoding='utf-8') as f:
+            rules = json.load(f)
+
+        self.default_minutes = rules.get('default_minutes', 30)
+        self.category_minutes = rules.get('category_minutes', {})
+        self.priority_colors = rules.get('priority_colors', {})
+        self.default_color = rules.get('default_color', '5')
+
+        # One alternation over every keyword; earlier rules win when several match
+        self._rule_minutes = []
+        self._keyword_rank = {}
+        for rank, rule in enumerate(rules.get('keyword_rules', [])):
+            self._rule_minutes.append(rule['minutes'])
+            for keyword in rule['keywords']:
+                self._keyword_rank.setdefault(keyword.lower(), rank)
+
+        keywords = sorted(self._keyword_rank, key=len, reverse=True)
+        self._pattern = re.compile('|'.join(map(re.escape, keywords))) if keywords else None
+        self.estimate = lru_cache(maxsize=cache_size)(self._estimate)
+
+    def _estimate(self, task_description, category):
+        if self._pattern is not None:
+            ranks = [self._keyword_rank[keyword]
+                     for keyword in self._pattern.findall(task_description.lower())]
+            if ranks:
+                return self._rule_minutes[min(ranks)]
+
+        # Use category default or fallback
+        return self.category_minutes.get(category, self.default_minutes)
+
+    def color_for_priority(self, priority):
+        """Map priority to Google Calendar color ID"""
+        return self.priority_colors.get((priority or '').lower(), self.default_color)
+
+
+if __name__ == "__main__":
+    # Benchmark against the original CalendarManager.estimate_duration
+    import random
+    import time
+
+    def legacy_estimate_duration(task_description, category):
+        description_lower = task_description.lower()
+        category_durations = {
+            'calls': 30, 'emails': 15, 'shopping': 60, 'health': 60, 'finance': 30,
+            'home': 90, 'social': 120, 'learning': 60, 'travel': 180, 'work': 60
+        }
+        if any(word in description_lower for word in ['quick', 'briefly', 'check']):
+            return 15
+        if 'meeting' in description_lower:
+            return 60
+        if 'appointment' in description_lower or 'doctor' in description_lower:
+            return 60
+        if 'gym' in description_lower or 'workout' in description_lower:
+            return 60
+        if 'call' in description_lower or 'phone' in description_lower:
+            return 30
+        if 'email' in description_lower:
+            return 15
+        return category_durations.get(category, 30)
+
+    samples = [
+        ("Buy groceries", "shopping"), ("Call dentist to schedule cleaning", "health"),
+        ("Email Sarah about project update", "emails"), ("Quick check of the budget", "finance"),
+        ("Team meeting prep", "work"), ("Fix the leaky faucet", "home"),
+        ("Book flights to Denver", "travel"), ("Gym workout", "health"),
+        ("Doctor appointment", "health"), ("Read chapter 4", "learning"),
+        ("Birthday party for Sam", "social"), ("Phone the bank", "finance"),
+    ]
+    corpus = [random.choice(samples) for _ in range(100000)]
+
+    estimator = DurationEstimator()
+    mismatches = sum(1 for d, c in samples if estimator.estimate(d, c) != legacy_estimate_duration(d, c))
+
+    started = time.perf_counter()
+    for description, category in corpus:
+        legacy_estimate_duration(description, category)
+    legacy = time.perf_counter() - started
+
+    estimator.estimate.cache_clear()
+    started = time.perf_counter()
+    for description, category in corpus:
+        estimator.estimate(description, category)
+    compiled = time.perf_counter() - started
+
+    print(f"{len(corpus)} tasks, {mismatches} mismatches against the original rules")
+    print(f"legacy estimate_duration: {legacy * 1e6 / len(corpus):5.2f} µs/task")
+    print(f"DurationEstimator.estimate: {compiled * 1e6 / len(corpus):5.2f} µs/task "
+          f"({legacy / compiled:.1f}x faster)")
@@ -0,0 +1,179 @@
+"""
+Event Index - SQLite map from task fingerprints to the Calendar events created for them
+Makes event creation idempotent: a task seen before is skipped instead of created again
+"""
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+
+DEFAULT_EVENT_INDEX_PATH = os.path.join('.cache', 'event_index.sqlite3')
+
+# Private extended property that tags events created from voice memos
+FINGERPRINT_PROPERTY = 'voiceMemoFingerprint'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    fingerprint TEXT PRIMARY KEY,
+    calendar_id TEXT,
+    event_id TEXT,
+    status TEXT,
+    start TEXT,
+    updated_at REAL
+);
+CREATE INDEX IF NOT EXISTS events_by_id ON events (calendar_id, event_id);
+CREATE TABLE IF NOT EXISTS sync_state (
+    calendar_id TEXT PRIMARY KEY,
+    sync_token TEXT,
+    synced_at REAL
+);
+"""
+
+
+def _normalize(value):
+    return re.sub(r'\s+', ' ', str(value or '')).strip().lower()
+
+
+def task_fingerprint(task, due, calendar_id='primary', memo=None):
+    """
+    Deterministic fingerprint of a task from one memo
+
+    Built from the title, the due date, the notes and the memo the task
+    came from. With a memo, the spoken due phrase is used: the memo hash
+    already tells "tomorrow" said on Monday from the same words said on
+    Thursday, and the phrase stays the same when a crashed run is retried
+    on a later day, where the resolved date would not. Without a memo the
+    resolved date is the only thing separating the two.
+
+    Args:
+        task (Reminder): Task details
+        due (date or datetime): Resolved due day, or the start for tasks
+            with a fixed time (only used when memo is None)
+        calendar_id (str): Calendar the event goes to
+        memo (str): Content hash of the source memo (None if unknown)
+
+    Returns:
+        str: 40 hex characters
+    """
+    when = _normalize(task.due_date) if memo else due.isoformat()
+    parts = [calendar_id, memo or '', _normalize(task.title), when, _normalize(task.notes)]
+    return hashlib.sha1('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+
+def event_id_for(fingerprint):
+    """
+    Client-supplied Calendar event ID for a fingerprint
+
+    Calendar IDs must use base32hex characters (0-9, a-v); lowercase hex is
+    a subset, so the fingerprint itself is a valid ID. Calendar keeps the
+    IDs of deleted events reserved, so a 409 for a cancelled event is
+    answered with a server-assigned ID instead (see CalendarManager).
+    """
+    return fingerprint
+
+
+class EventIndex:
+    def __init__(self, path=DEFAULT_EVENT_INDEX_PATH):
+        """
+        Open (or create) the index database
+
+        Args:
+            path (str): SQLite database file
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+
+    def get(self, fingerprint):
+        """
+        Look up the event created for a task
+
+        Args:
+            fingerprint (str): Task fingerprint
+
+        Returns:
+            dict: calendar_id, event_id, status and start, or None if unseen
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM events WHERE fingerprint = ?", (fingerprint,)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def record(self, fingerprint, calendar_id, event_id, start=None, status='confirmed'):
+        """
+        Remember the event for a task
+
+        Args:
+            fingerprint (str): Task fingerprint
+            calendar_id (str): Calendar ID
+            event_id (str): Calendar event ID
+            start (str): Event start (ISO format), if known
+            status (str): 'confirmed' or 'cancelled'
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO events (fingerprint, calendar_id, event_id, status, start, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(fingerprint) DO UPDATE SET calendar_id = excluded.calendar_id, "
+                "event_id = excluded.event_id, status = excluded.status, "
+                "start = COALESCE(excluded.start, events.start), updated_at = excluded.updated_at",
+                (fingerprint, calendar_id, event_id, status, start, time.time())
+            )
+
+    def mark_cancelled(self, calendar_id, event_id):
+        """
+        Record that an event was deleted on the calendar
+
+        The row is kept so the task is not recreated on the next run.
+
+        Returns:
+            bool: True if the event was in the index
+        """
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE events SET status = 'cancelled', updated_at = ? "
+                "WHERE calendar_id = ? AND event_id = ?",
+                (time.time(), calendar_id, event_id)
+            )
+        return cursor.rowcount > 0
+
+    def sync_state(self, calendar_id):
+        """
+        Get the stored incremental sync position
+
+        Returns:
+            tuple: (sync token or None, time of last sync or 0)
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT sync_token, synced_at FROM sync_state WHERE calendar_id = ?", (calendar_id,)
+            ).fetchone()
+        if row is None:
+            return None, 0
+        return row['sync_token'], row['synced_at'] or 0
+
+    def set_sync_token(self, calendar_id, sync_token):
+        """Store the token for the next incremental sync (None forces a full one)"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO sync_state (calendar_id, sync_token, synced_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(calendar_id) DO UPDATE SET sync_token = excluded.sync_token, "
+                "synced_at = excluded.synced_at",
+                (calendar_id, sync_token, time.time())
+            )
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
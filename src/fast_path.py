@@ -0,0 +1,258 @@
+"""
+Fast Path - Deterministic task extraction for simple memos, skipping the Claude call
+Returns the same {"tasks": [...]} schema as VoiceProcessor plus a confidence score
+"""
+import re
+import threading
+
+# Memos scoring at least this much are answered locally
+DEFAULT_CONFIDENCE_THRESHOLD = 0.8
+
+# Longer memos tend to need real understanding
+MAX_FAST_PATH_CHARS = 400
+MAX_CLAUSE_WORDS = 16
+
+# Keyword rules per category, most specific first. Subject words (dentist,
+# bill, flight) win over action verbs (call, email, buy), matching the
+# prompt's examples such as "call doctor" -> health. Keywords only match
+# whole words ("son" must not fire on "Sonia"), so inflected forms are
+# listed explicitly. Verbs whose sense depends on their object ("run",
+# "book") are left out; see _AMBIGUOUS_VERBS.
+CATEGORY_RULES = [
+    ('health', r'dentists?|doctors?|dr\.?|pharmacy|prescriptions?|medicines?|meds|therapist|clinic|'
+               r'checkups?|check-ups?|gym|workouts?|physio|vaccines?|vaccinations?|yoga|'
+               r'go for a (?:run|jog)|jog|jogging'),
+    ('finance', r'bills?|rent|bank|taxes|tax|invoices?|mortgage|insurance|budget|pay|paycheck|'
+                r'credit card|loans?|transfer money'),
+    ('travel', r'flights?|hotels?|airport|passport|trains?|trips?|rental car|car rental|'
+               r'itinerary|pack for|visa'),
+    ('home', r'fix|fixing|repair|repairs|clean|cleaning|laundry|dishes|vacuum|vacuuming|faucet|'
+             r'plumber|trash|garbage|mow|mowing|lawn|groom|leak|leaking'),
+    ('family', r'mom|dad|mother|father|grandma|grandpa|kids?|sons?|daughters?|sisters?|brothers?|'
+               r'family|wife|husband|pick up the kids|school'),
+    ('social', r'party|birthday|dinner with|drinks|wedding|hang out|invite|bbq|barbecue|'
+               r'get together|reunion'),
+    ('learning', r'read|reading|course|study|studying|lessons?|class|learn|learning|homework|'
+                 r'practice|tutorials?|podcasts?'),
+    ('work', r'meetings?|reports?|projects?|clients?|deadlines?|presentations?|slides|review|'
+             r'proposals?|manager|boss|standup|quarterly|office|colleagues?|coworkers?'),
+    ('shopping', r'buy|groceries|grocery|shop|shopping|order|purchase|pick up|milk|eggs|bread|store|'
+                 r'amazon|supermarket'),
+    ('calls', r'call|calls|calling|phone|ring|video chat|facetime|zoom'),
+    ('emails', r'e-?mails?|inbox|reply to|respond to|write to'),
+    ('personal', r'haircut|appointments?|errands?|renew|dmv|post office|mail|packages?|'
+                 r'dry clean|self-care'),
+]
+_CATEGORY_PATTERNS = [(name, re.compile(r'\b(?:%s)\b' % words, re.I)) for name, words in CATEGORY_RULES]
+
+# Category pairs where the first reliably overrides the second
+_OVERRIDES = {
+    ('health', 'calls'), ('health', 'personal'), ('health', 'emails'), ('health', 'home'),
+    ('finance', 'calls'), ('finance', 'emails'), ('finance', 'personal'),
+    ('travel', 'calls'), ('travel', 'emails'), ('travel', 'personal'),
+    ('shopping', 'personal'), ('home', 'calls'),
+    ('family', 'calls'), ('social', 'calls'), ('social', 'emails'),
+    # Messages about work are still filed under the messaging category
+    ('emails', 'work'), ('calls', 'work'),
+}
+
+_WEEKDAYS = r'monday|tuesday|wednesday|thursday|friday|saturday|sunday'
+_TIME = r'(?:\s+(?:at\s+)?\d{1,2}(?::\d{2})?\s*(?:am|pm)|\s+(?:in the\s+)?(?:morning|afternoon|evening|tonight))?'
+_DATE_PHRASE = re.compile(
+    r'\b(?:(?:on|by|before|this|next|until)\s+)?'
+    r'(?P<date>'
+    r'today|tonight|tomorrow(?:\s+(?:morning|afternoon|evening|night))?|'
+    r'(?:the\s+)?day after tomorrow|'
+    r'(?:next|this)\s+(?:week(?:end)?|month)|'
+    r'(?:the\s+)?end of (?:the\s+)?(?:week|month|day)|'
+    r'in\s+\d+\s+(?:days?|weeks?)|'
+    r'(?:next\s+|this\s+)?(?:%s)'
+    r')%s'
+    r'|\b(?P<time>at\s+\d{1,2}(?::\d{2})?\s*(?:am|pm))' % (_WEEKDAYS, _TIME),
+    re.I
+)
+
+_URGENT = re.compile(r'\b(?:urgent(?:ly)?|asap|right away|immediately|critical)\b', re.I)
+_HIGH = re.compile(r'\b(?:important|high priority|must|don\'t forget|do not forget)\b', re.I)
+_LOW = re.compile(r'\b(?:sometime|eventually|whenever|low priority|if i have time|no rush)\b', re.I)
+
+# Wording that suggests the memo needs real interpretation
+_HARD = re.compile(r'\?|\b(?:if|unless|maybe|perhaps|depending|either|or not|instead|'
+                   r'actually|never mind|cancel|wait)\b', re.I)
+
+# Clauses starting with these verbs need Claude ("run errands", "run the
+# dishwasher", "run the numbers" belong to different categories)
+_AMBIGUOUS_VERBS = re.compile(r'^(?:run|runs|running)\b', re.I)
+
+_CLAUSE_SPLIT = re.compile(
+    r'[.!;\n]+|\s+-\s+(?=(?:and\s+)?(?:also|then)\b)|'
+    r',?\s+(?:and\s+)?(?:also|then|plus)\s+|'
+    r',?\s+and\s+(?=(?:i\s+(?:need|have|should|must|want)\s+to\s+)?'
+    r'(?:call|email|buy|pay|book|fix|clean|schedule|pick up|send|finish|read|renew|order|text|write)\b)',
+    re.I
+)
+
+_FILLER = re.compile(
+    r'^(?:(?:and|also|so|oh|okay|ok|um|uh|then|plus|please)[,\s]+)*'
+    r'(?:(?:urgent|important|reminder|note)\s*[:,-]\s*)?'
+    r'(?:(?:i\s+(?:really\s+)?(?:need|have|should|must|want|gotta|got)\s+to|'
+    r'i\s+should|i\s+need|i\'ll|i\s+will|(?:don\'t|do not)\s+forget\s+to|'
+    r'(?:please\s+)?remind\s+me\s+to|make\s+sure\s+(?:i|to)|need\s+to|have\s+to|'
+    r'remember\s+to|gotta|let\'s)\s+)?',
+    re.I
+)
+
+
+class RuleBasedExtractor:
+    def __init__(self, threshold=DEFAULT_CONFIDENCE_THRESHOLD):
+        """
+        Initialize the extractor
+
+        Args:
+            threshold (float): Minimum confidence for a memo to skip Claude
+        """
+        self.threshold = threshold
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _categorize(self, clause):
+        """
+        Pick a category for one clause
+
+        Returns:
+            tuple: (category, confidence)
+        """
+        matched = [name for name, pattern in _CATEGORY_PATTERNS if pattern.search(clause)]
+        if not matched:
+            return 'other', 0.3
+        if len(matched) == 1:
+            return matched[0], 0.95
+
+        # Several rules fired - only trust a category that overrides all the others
+        for candidate in matched:
+            if all((candidate, other) in _OVERRIDES for other in matched if other != candidate):
+                return candidate, 0.85
+        return matched[0], 0.5
+
+    def _priority(self, clause):
+        if _URGENT.search(clause):
+            return 'urgent'
+        if _HIGH.search(clause):
+            return 'high'
+        if _LOW.search(clause):
+            return 'low'
+        return 'medium'
+
+    def _extract_date(self, clause):
+        """
+        Find the due date phrase in a clause
+
+        Returns:
+            tuple: (due date phrase or None, clause with the phrase removed)
+        """
+        dates = []
+        times = []
+
+        def strip(match):
+            if match.group('date'):
+                dates.append(match.group(0))
+            else:
+                times.append(match.group('time'))
+            return ' '
+
+        remainder = _DATE_PHRASE.sub(strip, clause)
+        if not dates and not times:
+            return None, clause
+
+        # Keep the date words without a leading "on"/"by", e.g. "Friday at 2pm"
+        phrase = ' '.join(dates + times)
+        phrase = re.sub(r'^(?:on|by|before|until)\s+', '', phrase.strip(), flags=re.I)
+        return phrase, remainder
+
+    def _clean_description(self, clause):
+        text = _FILLER.sub('', clause.strip())
+        text = re.sub(r'\s+', ' ', text).strip(' ,-')
+        text = re.sub(r'\s+([,.])', r'\1', text)
+        return text[:1].upper() + text[1:] if text else text
+
+    def extract(self, transcription_text):
+        """
+        Extract tasks from a memo without calling Claude
+
+        Args:
+            transcription_text (str): The transcribed voice memo text
+
+        Returns:
+            tuple: ({"tasks": [...]} in VoiceProcessor's schema, confidence 0-1)
+        """
+        text = transcription_text.strip()
+        if not text:
+            return {"tasks": []}, 0.0
+
+        confidence = 1.0
+        if len(text) > MAX_FAST_PATH_CHARS:
+            confidence = 0.4
+        if _HARD.search(text):
+            confidence = min(confidence, 0.4)
+
+        tasks = []
+        for clause in _CLAUSE_SPLIT.split(text):
+            if not clause or not clause.strip(' ,-'):
+                continue
+
+            due_date, remainder = self._extract_date(clause)
+            description = self._clean_description(remainder)
+            if not description:
+                continue
+
+            category, clause_confidence = self._categorize(description)
+            if _AMBIGUOUS_VERBS.match(description):
+                clause_confidence = min(clause_confidence, 0.5)
+            if len(description.split()) > MAX_CLAUSE_WORDS:
+                clause_confidence = min(clause_confidence, 0.5)
+            confidence = min(confidence, clause_confidence)
+
+            tasks.append({
+                "description": description,
+                "priority": self._priority(clause),
+                "category": category,
+                "due_date": due_date,
+            })
+
+        if not tasks:
+            return {"tasks": []}, 0.0
+        return {"tasks": tasks}, confidence
+
+    def try_extract(self, transcription_text):
+        """
+        Return local results only when they are trustworthy
+
+        Args:
+            transcription_text (str): The transcribed voice memo text
+
+        Returns:
+            dict: {"tasks": [...]} if confident enough, otherwise None
+        """
+        result, confidence = self.extract(transcription_text)
+        with self._lock:
+            if confidence >= self.threshold:
+                self.hits += 1
+                return result
+            self.misses += 1
+        return None
+
+    def report(self):
+        """
+        Summarize how often the fast path answered
+
+        Returns:
+            dict: Hit and miss counts plus hit rate
+        """
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+        }
+
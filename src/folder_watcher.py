@@ -0,0 +1,225 @@
+"""
+Folder Watcher - Notices new audio files as soon as they finish syncing
+Uses inotify on Linux and falls back to polling everywhere else
+"""
+import ctypes
+import ctypes.util
+import fnmatch
+import os
+import select
+import struct
+import sys
+import time
+
+# inotify event masks (from <sys/inotify.h>)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = 0x00000800
+IN_CLOEXEC = 0x00080000
+
+_EVENT_HEADER = struct.Struct('iIII')
+
+# A file counts as finished once its size and mtime hold still this long
+DEFAULT_SETTLE_TIME = 2.0
+
+# How often to re-check files that are still changing
+STABILITY_CHECK_INTERVAL = 0.5
+
+
+class _Inotify:
+    """Minimal ctypes wrapper around the Linux inotify API"""
+
+    def __init__(self, folder):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        # Removals are watched too, so the watcher can forget those files
+        mask = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_MODIFY | IN_DELETE | IN_MOVED_FROM
+        if libc.inotify_add_watch(self.fd, os.fsencode(folder), mask) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"inotify_add_watch failed for {folder}")
+
+    def read_names(self, timeout):
+        """
+        Wait for events and return the file names they mention
+
+        Args:
+            timeout (float): Seconds to wait, or None to block
+
+        Returns:
+            set: File names that changed
+        """
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+
+        names = set()
+        offset = 0
+        while offset < len(data):
+            _, _, _, name_len = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + name_len].rstrip(b'\0')
+            offset += name_len
+            if name:
+                names.add(os.fsdecode(name))
+        return names
+
+    def close(self):
+        os.close(self.fd)
+
+
+class FolderWatcher:
+    def __init__(self, folder, patterns, poll_interval=30, settle_time=DEFAULT_SETTLE_TIME,
+                 use_inotify=None):
+        """
+        Watch a folder for new files
+
+        Args:
+            folder (str): Folder to watch
+            patterns (list): Glob patterns such as '*.m4a'
+            poll_interval (int): Seconds between scans when polling
+            settle_time (float): Seconds a file's size and mtime must stay
+                unchanged before it is reported
+            use_inotify (bool): Force inotify on or off (default: use it on Linux)
+        """
+        self.folder = folder
+        self.patterns = patterns
+        self.poll_interval = poll_interval
+        self.settle_time = settle_time
+
+        # path -> (size, mtime, time the signature was first seen)
+        self._candidates = {}
+        # path -> (size, mtime) when it was last reported or skipped
+        self._reported = {}
+
+        self._inotify = None
+        if use_inotify is None:
+            use_inotify = sys.platform.startswith('linux')
+        if use_inotify:
+            try:
+                self._inotify = _Inotify(folder)
+            except (OSError, AttributeError) as e:
+                print(f"⚠️  inotify unavailable ({e}), falling back to polling")
+
+    @property
+    def mode(self):
+        """'inotify' or 'polling'"""
+        return 'inotify' if self._inotify else 'polling'
+
+    def _matches(self, name):
+        return any(fnmatch.fnmatch(name, pattern) for pattern in self.patterns)
+
+    def _scan(self):
+        """Add every new or changed matching file in the folder as a candidate"""
+        try:
+            entries = list(os.scandir(self.folder))
+        except OSError:
+            return
+
+        present = set()
+        for entry in entries:
+            if not self._matches(entry.name):
+                continue
+            present.add(entry.path)
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            if self._reported.get(entry.path) != (stat.st_size, stat.st_mtime_ns):
+                self._candidates.setdefault(entry.path, None)
+
+        # Forget files that left the folder
+        for path in set(self._reported) - present:
+            del self._reported[path]
+
+    def _track(self, name):
+        if self._matches(name):
+            self._candidates.setdefault(os.path.join(self.folder, name), None)
+
+    def _collect_settled(self):
+        """
+        Return candidates whose size and mtime have stopped changing
+
+        Returns:
+            list: Paths of files that finished writing
+        """
+        now = time.monotonic()
+        settled = []
+        for path, previous in list(self._candidates.items()):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                # Deleted or renamed away; forget it so _reported stays bounded
+                del self._candidates[path]
+                self._reported.pop(path, None)
+                continue
+
+            signature = (stat.st_size, stat.st_mtime_ns)
+            if previous is None or previous[:2] != signature:
+                self._candidates[path] = signature + (now,)
+            elif stat.st_size > 0 and now - previous[2] >= self.settle_time:
+                del self._candidates[path]
+                if self._reported.get(path) != signature:
+                    self._reported[path] = signature
+                    settled.append(path)
+        return sorted(settled)
+
+    def _wait(self, timeout):
+        """Block until something may have changed, tracking new file names"""
+        if self._inotify:
+            for name in self._inotify.read_names(timeout):
+                self._track(name)
+        else:
+            time.sleep(timeout)
+            self._scan()
+
+    def watch(self, skip=None):
+        """
+        Yield batches of files that have finished writing
+
+        Files already in the folder are reported first. Each file is
+        reported again only if its contents change; pass skip to ignore
+        paths handled by an earlier run.
+
+        Args:
+            skip (callable): Returns True for paths that should be ignored
+
+        Yields:
+            list: Paths that are ready to process
+        """
+        self._scan()
+        try:
+            while True:
+                ready = [path for path in self._collect_settled()
+                         if not (skip and skip(path))]
+                if ready:
+                    yield ready
+
+                if self._candidates:
+                    # Something is still syncing - check back soon
+                    timeout = STABILITY_CHECK_INTERVAL
+                elif self._inotify:
+                    timeout = None
+                else:
+                    timeout = self.poll_interval
+                self._wait(timeout)
+        finally:
+            self.close()
+
+    def close(self):
+        """Release the inotify descriptor"""
+        if self._inotify:
+            self._inotify.close()
+            self._inotify = None
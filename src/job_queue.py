@@ -0,0 +1,227 @@
+"""
+Job Queue - Durable SQLite queue of memos waiting for the daemon's workers
+Jobs survive restarts; any left running by a crash are queued again on startup
+"""
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_QUEUE_PATH = os.path.join('.cache', 'jobs.sqlite3')
+
+# Job kinds: an audio file on disk, or a transcript stored inline
+KINDS = ('audio', 'transcript')
+
+# Job states, in the order a job normally passes through them
+STATUSES = ('queued', 'running', 'done', 'failed')
+
+# Jobs interrupted this many times are given up on
+MAX_ATTEMPTS = 3
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    name TEXT,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    result TEXT,
+    error TEXT,
+    created_at REAL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_by_status ON jobs (status, id);
+"""
+
+
+class JobQueue:
+    def __init__(self, path=DEFAULT_QUEUE_PATH):
+        """
+        Open (or create) the queue database
+
+        Each process opens its own JobQueue; SQLite arbitrates between them.
+
+        Args:
+            path (str): SQLite database file
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        # Autocommit mode, so claim() can open its own IMMEDIATE transaction
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30,
+                                     isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+
+    def submit(self, kind, payload, name=None):
+        """
+        Add a job to the end of the queue
+
+        Args:
+            kind (str): 'audio' (payload is a file path) or 'transcript'
+                (payload is the text)
+            payload (str): File path or transcript
+            name (str): Label shown in logs and used for the output file name
+
+        Returns:
+            int: Job id
+        """
+        if kind not in KINDS:
+            raise ValueError(f"Unknown job kind: {kind}")
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO jobs (kind, payload, name, status, created_at) VALUES (?, ?, ?, 'queued', ?)",
+                (kind, payload, name, time.time())
+            )
+        return cursor.lastrowid
+
+    def claim(self, worker):
+        """
+        Take the oldest queued job, marking it running
+
+        Args:
+            worker (str): Name of the claiming worker
+
+        Returns:
+            dict: The job, or None if the queue is empty
+        """
+        with self._lock:
+            # IMMEDIATE takes the write lock up front, so two processes
+            # can never claim the same row
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT * FROM jobs WHERE status = 'queued' ORDER BY id LIMIT 1"
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE jobs SET status = 'running', worker = ?, started_at = ?, "
+                        "attempts = attempts + 1 WHERE id = ?",
+                        (worker, time.time(), row['id'])
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        job = dict(row)
+        job.update(status='running', worker=worker, attempts=job['attempts'] + 1)
+        return job
+
+    def _finish(self, job_id, status, result=None, error=None):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ?",
+                (status, result, error, time.time(), job_id)
+            )
+
+    def complete(self, job_id, result=None):
+        """Mark a job done, storing its result (e.g. the output file path)"""
+        self._finish(job_id, 'done', result=result)
+
+    def fail(self, job_id, error):
+        """Mark a job failed with an error message"""
+        self._finish(job_id, 'failed', error=error)
+
+    def requeue_running(self, worker=None, max_attempts=MAX_ATTEMPTS):
+        """
+        Put interrupted jobs back in the queue
+
+        Jobs that were already tried max_attempts times are failed instead,
+        so a memo that crashes its worker cannot loop forever.
+
+        Args:
+            worker (str): Only requeue this worker's jobs (None for all)
+            max_attempts (int): Attempts allowed per job
+
+        Returns:
+            int: Number of jobs queued again
+        """
+        condition = "status = 'running'" + (" AND worker = ?" if worker else "")
+        params = (worker,) if worker else ()
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE jobs SET status = 'failed', error = 'Interrupted too many times', "
+                f"finished_at = ? WHERE {condition} AND attempts >= ?",
+                (time.time(), *params, max_attempts)
+            )
+            cursor = self._conn.execute(
+                f"UPDATE jobs SET status = 'queued', worker = NULL WHERE {condition}", params
+            )
+        return cursor.rowcount
+
+    def get(self, job_id):
+        """
+        Look up a job
+
+        Returns:
+            dict: Job fields, or None if there is no such job
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def list(self, status=None, limit=100):
+        """
+        Most recent jobs, newest first
+
+        Args:
+            status (str): Only jobs in this state (None for all)
+            limit (int): Maximum jobs returned
+
+        Returns:
+            list: Job dicts
+        """
+        query = "SELECT * FROM jobs"
+        params = []
+        if status:
+            query += " WHERE status = ?"
+            params.append(status)
+        query += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [dict(row) for row in rows]
+
+    def active_payloads(self, kind):
+        """
+        Payloads of jobs that are still queued or running
+
+        Args:
+            kind (str): Job kind, e.g. 'audio'
+
+        Returns:
+            set: Payload strings (file paths for audio jobs)
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT payload FROM jobs WHERE kind = ? AND status IN ('queued', 'running')", (kind,)
+            ).fetchall()
+        return {row['payload'] for row in rows}
+
+    def counts(self):
+        """
+        Number of jobs in each state
+
+        Returns:
+            dict: Status -> count (every status present, possibly 0)
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        counts = dict.fromkeys(STATUSES, 0)
+        counts.update({row['status']: row['n'] for row in rows})
+        return counts
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,156 @@
+"""
+Ledger - SQLite record of which memos reached which pipeline stage
+Lets restarts skip finished memos and resume half-finished ones
+"""
+from src.transcription_cache import hash_audio_file
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_LEDGER_PATH = os.path.join('.cache', 'ledger.sqlite3')
+
+# Pipeline stages in the order a memo passes through them
+STAGES = ['transcribed', 'categorized', 'scheduled', 'written']
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS memos (
+    content_hash TEXT PRIMARY KEY,
+    path TEXT,
+    size INTEGER,
+    mtime_ns INTEGER,
+    stage TEXT,
+    transcription TEXT,
+    categorized_tasks TEXT,
+    formatted_results TEXT,
+    output_path TEXT,
+    transcribed_at REAL,
+    categorized_at REAL,
+    scheduled_at REAL,
+    written_at REAL
+);
+CREATE INDEX IF NOT EXISTS memos_by_file ON memos (path, size, mtime_ns);
+"""
+
+
+class Ledger:
+    def __init__(self, path=DEFAULT_LEDGER_PATH):
+        """
+        Open (or create) the ledger database
+
+        Args:
+            path (str): SQLite database file
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            # WAL keeps readers from blocking the writer between stages
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+
+    def content_hash(self, audio_path):
+        """
+        Get the content hash for an audio file
+
+        Files seen before with the same path, size and mtime are looked up
+        in the index instead of being read and hashed again.
+
+        Args:
+            audio_path (str): Path to audio file
+
+        Returns:
+            str: SHA-256 of the file contents
+        """
+        stat = os.stat(audio_path)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content_hash FROM memos WHERE path = ? AND size = ? AND mtime_ns = ?",
+                (str(audio_path), stat.st_size, stat.st_mtime_ns)
+            ).fetchone()
+        if row:
+            return row['content_hash']
+        return hash_audio_file(audio_path)
+
+    def get(self, content_hash):
+        """
+        Look up a memo's progress
+
+        Args:
+            content_hash (str): Memo content hash
+
+        Returns:
+            dict: Stored fields (categorized_tasks decoded), or None if unseen
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM memos WHERE content_hash = ?", (content_hash,)
+            ).fetchone()
+        if row is None:
+            return None
+
+        entry = dict(row)
+        if entry['categorized_tasks'] is not None:
+            entry['categorized_tasks'] = json.loads(entry['categorized_tasks'])
+        return entry
+
+    def record(self, content_hash, stage, audio_path=None, **fields):
+        """
+        Record that a memo finished a stage
+
+        Args:
+            content_hash (str): Memo content hash
+            stage (str): One of STAGES
+            audio_path (str): Current path of the audio file
+            **fields: Stage output to store (transcription, categorized_tasks,
+                formatted_results, output_path)
+        """
+        if stage not in STAGES:
+            raise ValueError(f"Unknown stage: {stage}")
+
+        values = {'stage': stage, f'{stage}_at': time.time()}
+        if audio_path is not None:
+            stat = os.stat(audio_path)
+            values.update(path=str(audio_path), size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+        for name, value in fields.items():
+            if name == 'categorized_tasks':
+                value = json.dumps(value)
+            values[name] = value
+
+        columns = ', '.join(values)
+        placeholders = ', '.join('?' for _ in values)
+        updates = ', '.join(f"{name} = excluded.{name}" for name in values)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT INTO memos (content_hash, {columns}) VALUES (?, {placeholders}) "
+                f"ON CONFLICT(content_hash) DO UPDATE SET {updates}",
+                (content_hash, *values.values())
+            )
+
+    def is_finished(self, audio_path):
+        """
+        Check whether an audio file already made it through every stage
+
+        Args:
+            audio_path (str): Path to audio file
+
+        Returns:
+            bool: True if the memo's output was written
+        """
+        try:
+            content_hash = self.content_hash(audio_path)
+        except OSError:
+            return False
+        entry = self.get(content_hash)
+        return entry is not None and entry['stage'] == STAGES[-1]
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,471 @@
+"""
+Metrics - Counters, latency histograms and per-memo trace spans for the pipeline
+Exposed as Prometheus text over HTTP and/or a periodically flushed JSON stats file.
+Disabled by default; the no-op recorder keeps instrumented code paths near free
+"""
+from bisect import bisect_left
+from functools import lru_cache
+import json
+import os
+import tempfile
+import threading
+import time
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+DEFAULT_FLUSH_INTERVAL = 10
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{k}="{str(v)}"' for k, v in labels) + '}'
+
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        """Fixed-bucket histogram (not thread-safe; Metrics holds the lock)"""
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q):
+        """Estimate a quantile by interpolating inside its bucket"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if seen + count >= target and count:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (target - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+
+class _Span:
+    """Context manager that times one step of one memo"""
+
+    __slots__ = ('metrics', 'name', 'trace_id', 'attributes', 'started')
+
+    def __init__(self, metrics, name, trace_id, attributes):
+        self.metrics = metrics
+        self.name = name
+        self.trace_id = trace_id
+        self.attributes = attributes
+
+    def __enter__(self):
+        self.started = time.time()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.time() - self.started
+        self.metrics.observe('stage_seconds', duration, stage=self.name)
+        self.metrics.inc('stage_runs_total', stage=self.name, outcome='error' if exc_type else 'ok')
+        if self.metrics.trace_path and self.trace_id is not None:
+            self.metrics.record_span({
+                'trace_id': self.trace_id,
+                'name': self.name,
+                'start': self.started,
+                'duration': duration,
+                'status': 'error' if exc_type else 'ok',
+                'attributes': self.attributes,
+            })
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class NullMetrics:
+    """Recorder used when metrics are off - every call does nothing"""
+
+    enabled = False
+    trace_path = None
+
+    def inc(self, name, amount=1, **labels):
+        pass
+
+    def observe(self, name, value, **labels):
+        pass
+
+    def set_gauge(self, name, value, **labels):
+        pass
+
+    def span(self, name, trace_id=None, **attributes):
+        return _NULL_SPAN
+
+    def add_collector(self, collector):
+        pass
+
+    def remove_collector(self, collector):
+        pass
+
+    def merge(self, delta):
+        pass
+
+
+class Metrics:
+    def __init__(self, trace_path=None):
+        """
+        Thread-safe metrics registry
+
+        Args:
+            trace_path (str): JSONL file that receives one line per trace
+                span (None to keep spans off)
+        """
+        self.enabled = True
+        self.trace_path = trace_path
+        self._counters = {}
+        self._gauges = {}
+        self._histograms = {}
+        self._collectors = []
+        self._collected_sent = {}
+        self._lock = threading.Lock()
+        self._trace_lock = threading.Lock()
+
+    def inc(self, name, amount=1, **labels):
+        """Add to a counter"""
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name, value, **labels):
+        """Record a value (seconds, for latencies) in a histogram"""
+        key = _key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def set_gauge(self, name, value, **labels):
+        """Set a gauge to its current value"""
+        with self._lock:
+            self._gauges[_key(name, labels)] = value
+
+    def span(self, name, trace_id=None, **attributes):
+        """
+        Time one pipeline step, optionally as a span of a memo's trace
+
+        Args:
+            name (str): Stage name (transcribe, categorize, format, schedule, write)
+            trace_id (str): Identifies the memo; spans sharing it form one trace
+            **attributes: Extra fields stored with the span
+
+        Returns:
+            Context manager recording stage_seconds and stage_runs_total
+        """
+        return _Span(self, name, trace_id, attributes)
+
+    def record_span(self, span):
+        """Append a finished span to the trace file"""
+        line = json.dumps(span) + '\n'
+        with self._trace_lock:
+            with open(self.trace_path, 'a', encoding='utf-8') as f:
+                f.write(line)
+
+    def add_collector(self, collector):
+        """
+        Register a callable polled at export time
+
+        Lets components that already keep counts (caches, usage tracker)
+        be exported without touching their hot paths.
+
+        Args:
+            collector (callable): Returns (name, kind, labels dict, value)
+                tuples, where kind is 'counter' or 'gauge'
+        """
+        with self._lock:
+            self._collectors.append(collector)
+
+    def remove_collector(self, collector):
+        """
+        Stop polling a collector, keeping the counts it reported
+
+        Its final counter values move into the recorded counters, so
+        exported totals never go backwards when a component is closed.
+
+        Args:
+            collector (callable): A callable passed to add_collector()
+        """
+        with self._lock:
+            if collector not in self._collectors:
+                return
+        samples = collector()
+        with self._lock:
+            self._collectors.remove(collector)
+            for name, kind, labels, value in samples:
+                if kind == 'counter':
+                    key = _key(name, labels)
+                    self._counters[key] = self._counters.get(key, 0) + value
+
+    def _collected(self):
+        counters, gauges = {}, {}
+        with self._lock:
+            collectors = list(self._collectors)
+        for collector in collectors:
+            for name, kind, labels, value in collector():
+                key = _key(name, labels)
+                if kind == 'counter':
+                    # Several components (e.g. two contexts) may report the same counter
+                    counters[key] = counters.get(key, 0) + value
+                else:
+                    gauges[key] = value
+        return counters, gauges
+
+    @staticmethod
+    def _merged_counters(counters, collected):
+        # Collected counters add to recorded ones, which may hold merged worker deltas
+        merged = dict(counters)
+        for key, value in collected.items():
+            merged[key] = merged.get(key, 0) + value
+        return merged
+
+    def take_delta(self):
+        """
+        Counters and histograms recorded since the previous call
+
+        Recorded values are handed over and reset; collected counters are
+        cumulative, so only their change since the last call is included.
+        Gauges are left out. Used by worker processes to ship their metrics
+        to the parent, which applies them with merge().
+
+        Returns:
+            dict: JSON-serializable counters and histograms
+        """
+        collected, _ = self._collected()
+        with self._lock:
+            counters, self._counters = self._counters, {}
+            histograms, self._histograms = self._histograms, {}
+            # A removed collector's counts were moved into the recorded counters,
+            # so its key now reads as zero here
+            for key in set(collected) | set(self._collected_sent):
+                value = collected.get(key, 0)
+                change = value - self._collected_sent.get(key, 0)
+                self._collected_sent[key] = value
+                if change:
+                    counters[key] = counters.get(key, 0) + change
+        return {
+            'counters': [[name, dict(labels), value] for (name, labels), value in counters.items()],
+            'histograms': [[name, dict(labels), h.counts, h.count, h.sum]
+                           for (name, labels), h in histograms.items()],
+        }
+
+    def merge(self, delta):
+        """
+        Add a delta from another registry's take_delta()
+
+        Args:
+            delta (dict): Counters and histograms to add
+        """
+        with self._lock:
+            for name, labels, value in delta['counters']:
+                key = _key(name, labels)
+                self._counters[key] = self._counters.get(key, 0) + value
+            for name, labels, counts, count, total in delta['histograms']:
+                key = _key(name, labels)
+                histogram = self._histograms.get(key)
+                if histogram is None:
+                    histogram = self._histograms[key] = Histogram()
+                histogram.counts = [a + b for a, b in zip(histogram.counts, counts)]
+                histogram.count += count
+                histogram.sum += total
+
+    def snapshot(self):
+        """
+        Current values of every metric
+
+        Returns:
+            dict: counters, gauges and histograms (count, sum, p50, p95, p99)
+        """
+        collected_counters, collected_gauges = self._collected()
+        with self._lock:
+            counters = self._merged_counters(self._counters, collected_counters)
+            gauges = dict(self._gauges)
+            gauges.update(collected_gauges)
+            histograms = {
+                key: {
+                    'count': h.count,
+                    'sum': h.sum,
+                    'p50': h.quantile(0.5),
+                    'p95': h.quantile(0.95),
+                    'p99': h.quantile(0.99),
+                }
+                for key, h in self._histograms.items()
+            }
+
+        def flatten(values):
+            return [{'name': name, 'labels': dict(labels), 'value': value}
+                    for (name, labels), value in sorted(values.items())]
+
+        return {
+            'timestamp': time.time(),
+            'counters': flatten(counters),
+            'gauges': flatten(gauges),
+            'histograms': flatten(histograms),
+        }
+
+    def prometheus_text(self):
+        """Render every metric in the Prometheus text exposition format"""
+        collected_counters, collected_gauges = self._collected()
+        with self._lock:
+            counters = self._merged_counters(self._counters, collected_counters)
+            gauges = dict(self._gauges)
+            gauges.update(collected_gauges)
+            histograms = {key: (list(h.counts), h.count, h.sum, h.buckets)
+                          for key, h in self._histograms.items()}
+
+        lines = []
+        typed = set()
+
+        def declare(name, kind):
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), value in sorted(counters.items()):
+            declare(name, 'counter')
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+        for (name, labels), value in sorted(gauges.items()):
+            declare(name, 'gauge')
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+        for (name, labels), (counts, count, total, buckets) in sorted(histograms.items()):
+            declare(name, 'histogram')
+            cumulative = 0
+            for bound, bucket_count in zip(list(buckets) + ['+Inf'], counts):
+                cumulative += bucket_count
+                bucket_labels = labels + (('le', bound),)
+                lines.append(f"{name}_bucket{_format_labels(bucket_labels)} {cumulative}")
+            lines.append(f"{name}_count{_format_labels(labels)} {count}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {total}")
+        return '\n'.join(lines) + '\n'
+
+    def write_json(self, path):
+        """Write a snapshot to path atomically"""
+        directory = os.path.dirname(path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, indent=2)
+        os.replace(temp_path, path)
+
+
+@lru_cache(maxsize=None)
+def _metrics_handler():
+    """Request handler class, built on first use so http.server loads only when needed"""
+    from http.server import BaseHTTPRequestHandler
+
+    class _MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            metrics = self.server.metrics
+            path = self.path.split('?', 1)[0]
+            if path == '/metrics':
+                body = metrics.prometheus_text().encode('utf-8')
+                content_type = 'text/plain; version=0.0.4'
+            elif path == '/stats.json':
+                body = json.dumps(metrics.snapshot()).encode('utf-8')
+                content_type = 'application/json'
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return _MetricsHandler
+
+
+class MetricsExporter:
+    def __init__(self, metrics, port=None, stats_path=None, flush_interval=DEFAULT_FLUSH_INTERVAL,
+                 host='127.0.0.1'):
+        """
+        Publish metrics in the background
+
+        Args:
+            metrics (Metrics): Registry to export
+            port (int): Serve /metrics (Prometheus) and /stats.json here
+            stats_path (str): JSON file rewritten every flush_interval seconds
+            flush_interval (float): Seconds between JSON flushes
+            host (str): Interface for the HTTP endpoint
+        """
+        self.metrics = metrics
+        self.stats_path = stats_path
+        self.flush_interval = flush_interval
+        self._stop = threading.Event()
+        self._httpd = None
+        self._flusher = None
+
+        if port is not None:
+            from http.server import ThreadingHTTPServer
+            self._httpd = ThreadingHTTPServer((host, port), _metrics_handler())
+            self._httpd.daemon_threads = True
+            self._httpd.metrics = metrics
+            threading.Thread(target=self._httpd.serve_forever, name="metrics-http", daemon=True).start()
+        if stats_path:
+            self._flusher = threading.Thread(target=self._flush_loop, name="metrics-flush", daemon=True)
+            self._flusher.start()
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            self.metrics.write_json(self.stats_path)
+
+    def close(self):
+        """Stop exporting, writing the stats file one last time"""
+        self._stop.set()
+        if self._flusher is not None:
+            self._flusher.join(timeout=1)
+            self.metrics.write_json(self.stats_path)
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+
+
+_metrics = NullMetrics()
+
+
+def get_metrics():
+    """The process-wide recorder (a NullMetrics until enable_metrics() is called)"""
+    return _metrics
+
+
+def enable_metrics(trace_path=None):
+    """
+    Switch the process to a real Metrics registry
+
+    Args:
+        trace_path (str): JSONL file for per-memo trace spans (None for no tracing)
+
+    Returns:
+        Metrics: The new registry
+    """
+    global _metrics
+    _metrics = Metrics(trace_path=trace_path)
+    return _metrics
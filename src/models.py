@@ -0,0 +1,252 @@
+"""
+Models - Typed Task and Reminder objects passed between pipeline stages
+Validated once when built from Claude's output and serialized only at the edges
+(output files, caches, the ledger and API request bodies)
+"""
+import json
+import re
+
+PRIORITIES = ('urgent', 'high', 'medium', 'low')
+_PRIORITY_SET = frozenset(PRIORITIES)
+DEFAULT_PRIORITY = 'medium'
+DEFAULT_CATEGORY = 'general'
+DEFAULT_TITLE = 'Untitled task'
+
+_NOTES = re.compile(r'Category:\s*(?P<category>[^\n]*)(?:\nPriority:\s*(?P<priority>[^\n]*))?')
+
+
+def _text(value):
+    """Stripped string, None for empty values; numbers and the like become text"""
+    if value.__class__ is not str:
+        if value is None:
+            return None
+        value = str(value)
+    return value.strip() or None
+
+
+def _priority(value):
+    """One of PRIORITIES, defaulting to medium"""
+    if value in _PRIORITY_SET:
+        return value
+    value = (_text(value) or '').lower()
+    return value if value in _PRIORITY_SET else DEFAULT_PRIORITY
+
+
+class Task:
+    """One task extracted from a memo"""
+
+    __slots__ = ('description', 'priority', 'category', 'due_date')
+
+    def __init__(self, description, priority=DEFAULT_PRIORITY, category=DEFAULT_CATEGORY, due_date=None):
+        self.description = description
+        self.priority = priority
+        self.category = category
+        self.due_date = due_date
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Validate one task dict from Claude, the fast path or a cache
+
+        Missing or unknown values fall back to defaults: the title becomes
+        'Untitled task', priorities outside PRIORITIES become 'medium' and a
+        missing category becomes 'general'.
+
+        Args:
+            data (dict): Task with description, priority, category and due_date
+
+        Returns:
+            Task: Normalized task
+        """
+        return cls(
+            _text(data.get('description')) or DEFAULT_TITLE,
+            _priority(data.get('priority')),
+            (_text(data.get('category')) or DEFAULT_CATEGORY).lower(),
+            _text(data.get('due_date')),
+        )
+
+    def to_dict(self):
+        """Task in VoiceProcessor's {"tasks": [...]} schema"""
+        return {
+            "description": self.description,
+            "priority": self.priority,
+            "category": self.category,
+            "due_date": self.due_date,
+        }
+
+    def __eq__(self, other):
+        return isinstance(other, Task) and all(
+            getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self):
+        return (f"Task({self.description!r}, priority={self.priority!r}, "
+                f"category={self.category!r}, due_date={self.due_date!r})")
+
+
+class Reminder:
+    """A task ready for the calendar and the iOS Shortcuts output"""
+
+    __slots__ = ('title', 'due_date', 'category', 'priority')
+
+    def __init__(self, title, due_date=None, category=DEFAULT_CATEGORY, priority=DEFAULT_PRIORITY):
+        self.title = title
+        self.due_date = due_date
+        self.category = category
+        self.priority = priority
+
+    @classmethod
+    def from_task(cls, task):
+        """Reminder for an already validated Task"""
+        return cls(task.description, task.due_date, task.category, task.priority)
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Read a reminder back from the output format
+
+        Category and priority are recovered from the notes text, falling
+        back to the list name.
+
+        Args:
+            data (dict): Reminder with title, notes, dueDate and list
+
+        Returns:
+            Reminder: Parsed reminder
+        """
+        match = _NOTES.search(data.get('notes') or '')
+        category = _text(data.get('category')) or (match and _text(match['category'])) \
+            or _text(data.get('list')) or DEFAULT_CATEGORY
+        priority = _text(data.get('priority')) or (match and _text(match['priority']))
+        return cls(
+            title=_text(data.get('title')) or DEFAULT_TITLE,
+            due_date=_text(data.get('dueDate')),
+            category=category.lower(),
+            priority=_priority(priority),
+        )
+
+    @property
+    def notes(self):
+        """Free-text notes shown in Reminders and on the calendar event"""
+        return f"Category: {self.category}\nPriority: {self.priority}"
+
+    @property
+    def list_name(self):
+        """Reminders list the task belongs in"""
+        return self.category.capitalize()
+
+    def to_dict(self):
+        """Reminder in the iOS Shortcuts output schema"""
+        return {
+            "title": self.title,
+            "notes": self.notes,
+            "dueDate": self.due_date,
+            "list": self.list_name,
+        }
+
+    def __eq__(self, other):
+        return isinstance(other, Reminder) and all(
+            getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self):
+        return (f"Reminder({self.title!r}, due_date={self.due_date!r}, "
+                f"category={self.category!r}, priority={self.priority!r})")
+
+
+def parse_tasks(result):
+    """
+    Validate a {"tasks": [...]} result into Task objects
+
+    Args:
+        result (dict): Output of VoiceProcessor (None or malformed gives no tasks)
+
+    Returns:
+        list: Task objects, skipping entries that are not dicts
+    """
+    if not isinstance(result, dict) or not isinstance(result.get('tasks'), list):
+        return []
+    return [Task.from_dict(task) for task in result['tasks'] if isinstance(task, dict)]
+
+
+def tasks_to_result(tasks):
+    """Tasks back in the {"tasks": [...]} schema, for caches and the ledger"""
+    return {"tasks": [task.to_dict() for task in tasks]}
+
+
+def render_reminders(reminders):
+    """
+    Serialize reminders for the output file
+
+    Returns:
+        str: Indented JSON {"reminders": [...]} for iOS Shortcuts
+    """
+    return json.dumps({"reminders": [reminder.to_dict() for reminder in reminders]}, indent=2)
+
+
+def coerce_reminder(reminder):
+    """Accept a Reminder or a reminder dict from older callers"""
+    return reminder if isinstance(reminder, Reminder) else Reminder.from_dict(reminder)
+
+
+if __name__ == "__main__":
+    # Benchmark the old dict -> JSON string -> dict hand-off against passing objects
+    import random
+    import time
+    import tracemalloc
+
+    def legacy_format_reminders(categorized_tasks):
+        reminders = [{
+            "title": task.get('description', 'Untitled task'),
+            "notes": f"Category: {task.get('category', 'general')}\nPriority: {task.get('priority', 'medium')}",
+            "dueDate": task.get('due_date'),
+            "list": task.get('category', 'general').capitalize()
+        } for task in categorized_tasks.get('tasks', [])]
+        return json.dumps({"reminders": reminders}, indent=2)
+
+    def legacy_handoff(categorized_tasks):
+        # Schedule stage: format to a string, then the calendar re-parses it
+        formatted = legacy_format_reminders(categorized_tasks)
+        reminders = json.loads(formatted)['reminders']
+        for reminder in reminders:
+            reminder.get('title'), reminder.get('dueDate'), reminder.get('notes')
+        return formatted
+
+    def typed_handoff(categorized_tasks):
+        # Validate once, hand objects to the calendar, serialize once for output
+        reminders = [Reminder.from_task(task) for task in parse_tasks(categorized_tasks)]
+        for reminder in reminders:
+            reminder.title, reminder.due_date, reminder.priority
+        return render_reminders(reminders)
+
+    rng = random.Random(0)
+    words = ["buy", "call", "email", "fix", "book", "pay", "read", "plan", "review", "clean"]
+    for size in (100, 1000, 10000):
+        result = {"tasks": [{
+            "description": f"{rng.choice(words).capitalize()} item {i}",
+            "priority": rng.choice(PRIORITIES),
+            "category": rng.choice(["work", "home", "shopping", "health"]),
+            "due_date": rng.choice([None, "tomorrow", "Friday at 2pm"]),
+        } for i in range(size)]}
+        assert legacy_handoff(result) == typed_handoff(result)
+
+        timings = {}
+        for name, handoff in (('legacy', legacy_handoff), ('typed', typed_handoff)):
+            rounds = max(1, 20000 // size)
+            started = time.perf_counter()
+            for _ in range(rounds):
+                handoff(result)
+            timings[name] = (time.perf_counter() - started) / rounds
+
+        tracemalloc.start()
+        dicts = json.loads(legacy_format_reminders(result))['reminders']
+        dict_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del dicts
+        tracemalloc.start()
+        objects = [Reminder.from_task(task) for task in parse_tasks(result)]
+        object_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del objects
+
+        print(f"{size:>6} tasks: legacy {timings['legacy'] * 1000:7.2f} ms, "
+              f"typed {timings['typed'] * 1000:7.2f} ms ({timings['legacy'] / timings['typed']:.1f}x); "
+              f"reminders in memory {dict_bytes / size:.0f} -> {object_bytes / size:.0f} bytes each")
@@ -0,0 +1,168 @@
+"""
+Pipeline - Runs voice memos through concurrent processing stages joined by bounded queues
+"""
+from src.metrics import get_metrics
+import heapq
+import queue
+import threading
+import traceback
+
+# Marks the end of the input for a stage's workers
+_SENTINEL = object()
+
+
+class Stage:
+    def __init__(self, name, func, workers=1, ordered=False):
+        """
+        Describe one pipeline stage
+
+        Args:
+            name (str): Stage name used in log messages
+            func (callable): Takes a job and returns the job for the next stage,
+                or None if the job failed and should not continue
+            workers (int): Maximum number of jobs this stage runs at once
+            ordered (bool): Release jobs to this stage in input order
+        """
+        if workers < 1:
+            raise ValueError(f"Stage '{name}' needs at least one worker")
+        self.name = name
+        self.func = func
+        self.workers = workers
+        self.ordered = ordered
+
+
+class _ReorderQueue:
+    """Queue that hands out (index, job) pairs strictly in index order"""
+
+    def __init__(self):
+        self._heap = []
+        self._next_index = 0
+        self._closed = 0
+        self._condition = threading.Condition()
+
+    def put(self, item):
+        with self._condition:
+            if item is _SENTINEL:
+                self._closed += 1
+            else:
+                heapq.heappush(self._heap, item)
+            self._condition.notify_all()
+
+    def qsize(self):
+        with self._condition:
+            return len(self._heap)
+
+    def get(self):
+        with self._condition:
+            while True:
+                if self._heap and self._heap[0][0] == self._next_index:
+                    self._next_index += 1
+                    return heapq.heappop(self._heap)
+                if self._closed:
+                    self._closed -= 1
+                    return _SENTINEL
+                self._condition.wait()
+
+
+class StagedPipeline:
+    def __init__(self, stages, queue_size=8):
+        """
+        Build a pipeline from a list of stages
+
+        Args:
+            stages (list): Stage objects, in processing order
+            queue_size (int): Maximum jobs waiting between two stages
+        """
+        if not stages:
+            raise ValueError("Pipeline needs at least one stage")
+        self.stages = stages
+        self.queue_size = queue_size
+
+    def _make_queue(self, stage):
+        if stage.ordered:
+            # Bounding a reorder buffer could deadlock while it waits for the
+            # next index; upstream queues still bound the work in flight.
+            return _ReorderQueue()
+        return queue.Queue(maxsize=self.queue_size)
+
+    def _run_worker(self, stage, in_queue, out_queue):
+        metrics = get_metrics()
+        while True:
+            item = in_queue.get()
+            if item is _SENTINEL:
+                return
+            if metrics.enabled:
+                metrics.set_gauge('pipeline_queue_depth', in_queue.qsize(), stage=stage.name)
+
+            index, job = item
+            if job is not None:
+                try:
+                    job = stage.func(job)
+                except Exception as e:
+                    print(f"❌ {stage.name} stage failed: {e}")
+                    traceback.print_exc()
+                    job = None
+                metrics.inc('pipeline_jobs_total', stage=stage.name,
+                            outcome='ok' if job is not None else 'failed')
+
+            # Failed jobs still travel downstream so ordered stages never stall
+            out_queue.put((index, job))
+
+    def run(self, jobs):
+        """
+        Push jobs through every stage
+
+        Args:
+            jobs (iterable): Jobs to process
+
+        Returns:
+            list: Final result for each job in input order (None if it failed)
+        """
+        queues = [self._make_queue(stage) for stage in self.stages]
+        results = {}
+        results_lock = threading.Lock()
+
+        class _Collector:
+            @staticmethod
+            def put(item):
+                with results_lock:
+                    results[item[0]] = item[1]
+
+        outputs = queues[1:] + [_Collector]
+        count = [0]
+
+        def feed():
+            for index, job in enumerate(jobs):
+                queues[0].put((index, job))
+                count[0] += 1
+            for _ in range(self.stages[0].workers):
+                queues[0].put(_SENTINEL)
+
+        feeder = threading.Thread(target=feed, name="pipeline-feed", daemon=True)
+        feeder.start()
+
+        stage_threads = []
+        for i, stage in enumerate(self.stages):
+            workers = [
+                threading.Thread(
+                    target=self._run_worker,
+                    args=(stage, queues[i], outputs[i]),
+                    name=f"pipeline-{stage.name}-{n}",
+                    daemon=True,
+                )
+                for n in range(stage.workers)
+            ]
+            for worker in workers:
+                worker.start()
+            stage_threads.append(workers)
+
+        # Shut stages down front to back once each one has drained
+        feeder.join()
+        for i, stage in enumerate(self.stages):
+            for worker in stage_threads[i]:
+                worker.join()
+            if i + 1 < len(self.stages):
+                for _ in range(self.stages[i + 1].workers):
+                    queues[i + 1].put(_SENTINEL)
+
+        return [results.get(index) for index in range(count[0])]
@@ -0,0 +1,322 @@
+"""
+Rate Limiter - Shared per-provider throttling and retry with backoff
+One limiter per API (whisper, claude, calendar) is shared by every thread,
+so a burst of memos queues locally instead of tripping 429s
+"""
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from src.metrics import get_metrics
+import os
+import random
+import threading
+import time
+
+# Per-minute limits by provider; override with RATE_LIMIT_<PROVIDER>_RPM / _TPM
+# (0 disables that limit)
+PROVIDER_LIMITS = {
+    'whisper': {'requests_per_minute': 50},
+    'claude': {'requests_per_minute': 50, 'tokens_per_minute': 40000},
+    'calendar': {'requests_per_minute': 600},
+}
+
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_BASE_DELAY = 1.0   # Seconds; the backoff ceiling doubles each attempt
+DEFAULT_MAX_DELAY = 60.0
+
+RETRIABLE_STATUSES = {408, 429, 500, 502, 503, 504, 529}
+
+
+class TokenBucket:
+    def __init__(self, per_minute, capacity=None):
+        """
+        Thread-safe token bucket refilled continuously
+
+        Callers reserve what they need up front and may go into debt; each
+        then sleeps off its own share, so waiting threads are served in order.
+
+        Args:
+            per_minute (float): Refill rate
+            capacity (float): Burst size (defaults to one minute's worth)
+        """
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or per_minute
+        self._available = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount):
+        """
+        Take amount from the bucket
+
+        Returns:
+            float: Seconds the caller must wait before using it
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._available = min(self.capacity, self._available + (now - self._updated) * self.rate)
+            self._updated = now
+            self._available -= amount
+            return max(0.0, -self._available / self.rate)
+
+    def adjust(self, amount):
+        """Give back (positive) or take extra (negative) once real usage is known"""
+        with self._lock:
+            self._available = min(self.capacity, self._available + amount)
+
+
+class RateLimiter:
+    def __init__(self, requests_per_minute=None, tokens_per_minute=None, name=None):
+        """
+        Requests-per-minute and tokens-per-minute limits for one provider
+
+        Args:
+            requests_per_minute (float): Request limit (None for unlimited)
+            tokens_per_minute (float): Token limit (None for unlimited)
+            name (str): Provider name used in metrics
+        """
+        self.name = name
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+        self.waits = 0
+        self.wait_seconds = 0.0
+
+    def acquire(self, tokens=0, requests=1):
+        """
+        Block until the call fits under the limits
+
+        Args:
+            tokens (int): Estimated tokens the call will use
+            requests (int): Number of API requests (e.g., calls in a batch)
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        with self._lock:
+            wait = max(0.0, self._paused_until - time.monotonic())
+        if self.requests is not None:
+            wait = max(wait, self.requests.reserve(requests))
+        if self.tokens is not None and tokens:
+            wait = max(wait, self.tokens.reserve(tokens))
+
+        if wait > 0:
+            with self._lock:
+                self.waits += 1
+                self.wait_seconds += wait
+            get_metrics().observe('rate_limit_wait_seconds', wait, provider=self.name or 'unknown')
+            time.sleep(wait)
+        return wait
+
+    def record_tokens(self, estimated, actual):
+        """Correct the token bucket once a call reports its real usage"""
+        if self.tokens is not None:
+            self.tokens.adjust(estimated - actual)
+
+    def pause(self, seconds):
+        """Hold every caller back, e.g. after the server sent Retry-After"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+def _status_of(error):
+    """HTTP status of an SDK or googleapiclient error, if it has one"""
+    status = getattr(error, 'status_code', None)
+    if status is None:
+        status = getattr(getattr(error, 'resp', None), 'status', None)
+    return status
+
+
+def is_retriable_error(error):
+    """
+    Decide whether an API error is worth retrying
+
+    Works with the OpenAI and Anthropic SDK errors (status_code), Google
+    HttpError (resp.status) and plain connection failures.
+    """
+    status = _status_of(error)
+    if status is not None:
+        status = int(status)
+        if status in RETRIABLE_STATUSES:
+            return True
+        # Google reports per-user rate limits as 403
+        return status == 403 and 'rateLimitExceeded' in str(error)
+
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    # SDK connection and timeout errors carry no status
+    return type(error).__name__ in ('APIConnectionError', 'APITimeoutError')
+
+
+def retry_after(error):
+    """
+    Seconds the server asked us to wait, from a Retry-After header
+
+    Returns:
+        float: Delay in seconds, or None if the error has no such header
+    """
+    headers = getattr(getattr(error, 'response', None), 'headers', None)
+    if headers is None:
+        # httplib2 responses are dicts with lowercase header names
+        headers = getattr(error, 'resp', None)
+    if not hasattr(headers, 'get'):
+        return None
+
+    value = headers.get('retry-after') or headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryPolicy:
+    def __init__(self, limiter=None, max_retries=DEFAULT_MAX_RETRIES, base_delay=DEFAULT_BASE_DELAY,
+                 max_delay=DEFAULT_MAX_DELAY, is_retriable=is_retriable_error):
+        """
+        Jittered exponential backoff around calls to one provider
+
+        Args:
+            limiter (RateLimiter): Shared limiter to acquire before each attempt
+            max_retries (int): Attempts after the first one
+            base_delay (float): Backoff ceiling for the first retry, in seconds
+            max_delay (float): Largest backoff ceiling
+            is_retriable (callable): Decides whether an exception is retried
+        """
+        self.limiter = limiter
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.is_retriable = is_retriable
+        self.retries = 0
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens=0, requests=1):
+        """Wait for the limiter, if there is one"""
+        if self.limiter is not None:
+            return self.limiter.acquire(tokens, requests)
+        return 0.0
+
+    def should_retry(self, error, attempt):
+        """True if attempt (0-based) failed with an error worth another try"""
+        return attempt < self.max_retries and self.is_retriable(error)
+
+    def backoff(self, attempt, error=None):
+        """
+        Sleep before the next attempt
+
+        Uses "full jitter" (a random delay up to an exponentially growing
+        ceiling) so threads that failed together do not retry together.
+        A Retry-After header sets the minimum and pauses the shared limiter.
+
+        Args:
+            attempt (int): 0-based number of the attempt that failed
+            error (Exception): The failure, checked for Retry-After
+
+        Returns:
+            float: Seconds slept
+        """
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        server_delay = retry_after(error) if error is not None else None
+        if server_delay is not None:
+            delay = max(delay, server_delay)
+            if self.limiter is not None:
+                self.limiter.pause(server_delay)
+
+        with self._lock:
+            self.retries += 1
+        provider = getattr(self.limiter, 'name', None) or 'unknown'
+        get_metrics().inc('api_retries_total', provider=provider)
+        time.sleep(delay)
+        return delay
+
+    def call(self, func, tokens=0, requests=1):
+        """
+        Run func() under the limiter, retrying retriable failures
+
+        Args:
+            func (callable): Zero-argument function making one API call
+            tokens (int): Estimated tokens the call will use
+            requests (int): Number of API requests the call makes
+
+        Returns:
+            Whatever func returns
+
+        Raises:
+            Exception: The last error once retries run out, or any
+                non-retriable error immediately
+        """
+        attempt = 0
+        while True:
+            self.acquire(tokens, requests)
+            try:
+                return func()
+            except Exception as error:
+                if not self.should_retry(error, attempt):
+                    raise
+                self.backoff(attempt, error)
+                attempt += 1
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+# Fraction of each provider limit this process may use
+_limit_share = 1.0
+
+
+def set_limit_share(share):
+    """
+    Give this process a fraction of every provider limit
+
+    Each daemon worker process builds its own limiters, so a pool of N
+    processes calls set_limit_share(1 / N) in every worker to stay within
+    the configured limits together. Limiters created earlier are dropped.
+
+    Args:
+        share (float): Fraction of the configured per-minute limits (0 to 1]
+    """
+    global _limit_share
+    with _limiters_lock:
+        _limit_share = share
+        _limiters.clear()
+
+
+def get_limiter(provider):
+    """
+    Shared RateLimiter for a provider, created on first use
+
+    Args:
+        provider (str): 'whisper', 'claude', 'calendar' or any other name
+
+    Returns:
+        RateLimiter: The same instance for every caller in the process
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(provider)
+        if limiter is None:
+            limits = dict(PROVIDER_LIMITS.get(provider, {}))
+            for suffix, key in (('RPM', 'requests_per_minute'), ('TPM', 'tokens_per_minute')):
+                value = os.getenv(f"RATE_LIMIT_{provider.upper()}_{suffix}")
+                if value is not None:
+                    limits[key] = float(value) or None
+            limits = {key: value * _limit_share if value else None for key, value in limits.items()}
+            limiter = RateLimiter(name=provider, **limits)
+            _limiters[provider] = limiter
+        return limiter
+
+
+def get_retry_policy(provider, **kwargs):
+    """
+    RetryPolicy that throttles through the provider's shared limiter
+
+    Args:
+        provider (str): Provider name passed to get_limiter()
+        **kwargs: RetryPolicy options (max_retries, base_delay, ...)
+    """
+    return RetryPolicy(limiter=get_limiter(provider), **kwargs)
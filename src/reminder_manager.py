@@ -1,6 +1,7 @@
 """
 Reminder Manager - Formats categorized tasks for iOS Shortcuts
 """
+from src.models import Task, Reminder, parse_tasks, render_reminders
 import json
 
 class ReminderManager:
@@ -21,18 +22,43 @@ class ReminderManager:
         if not categorized_tasks or 'tasks' not in categorized_tasks:
             return json.dumps({"reminders": []})
         
-        reminders = []
+        return self.render(self.to_reminders(parse_tasks(categorized_tasks)))
+    
+    def to_reminders(self, tasks):
+        """
+        Turn validated tasks into reminders
         
-        for task in categorized_tasks.get('tasks', []):
-            reminder = {
-                "title": task.get('description', 'Untitled task'),
-                "notes": f"Category: {task.get('category', 'general')}\nPriority: {task.get('priority', 'medium')}",
-                "dueDate": task.get('due_date'),
-                "list": task.get('category', 'general').capitalize()
-            }
-            reminders.append(reminder)
+        Args:
+            tasks (list): Task objects
+            
+        Returns:
+            list: Reminder objects, in the same order
+        """
+        return [Reminder.from_task(task) for task in tasks]
+    
+    def render(self, reminders):
+        """
+        Serialize reminders for the output file
+        
+        Args:
+            reminders (list): Reminder objects
+            
+        Returns:
+            str: JSON string formatted for iOS Shortcuts
+        """
+        return render_reminders(reminders)
+    
+    def format_reminder(self, task):
+        """
+        Format a single categorized task as a reminder
         
-        return json.dumps({"reminders": reminders}, indent=2)
+        Args:
+            task (dict): One task from Claude
+            
+        Returns:
+            dict: Reminder with title, notes, dueDate and list
+        """
+        return Reminder.from_task(Task.from_dict(task)).to_dict()
     
     def get_reminder_lists(self, categorized_tasks):
         """
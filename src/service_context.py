@@ -0,0 +1,260 @@
+"""
+Service Context - Long-lived API clients shared across every memo in a run
+"""
+from src.reminder_manager import ReminderManager
+from src.transcription_cache import TranscriptionCache
+from src.categorization_cache import CategorizationCache
+from src.ledger import Ledger
+from src.event_index import EventIndex
+from src.usage_tracker import UsageTracker
+from src.metrics import get_metrics
+from datetime import datetime
+import threading
+
+# Refresh the Google token this many seconds before it expires
+TOKEN_REFRESH_MARGIN = 300
+
+# How long to wait before retrying a failed token refresh
+TOKEN_RETRY_INTERVAL = 60
+
+
+class ServiceContext:
+    def __init__(self, credentials_path='credentials.json', token_path='token.json',
+                 refresh_margin=TOKEN_REFRESH_MARGIN, transcription_cache=True,
+                 categorization_cache=True, ledger_path=None, preprocess_audio=False,
+                 fast_path=True, event_index_path=None, calendar_service_factory=None):
+        """
+        Create a context that builds each API client once and reuses it
+
+        Clients are created on first use, and their provider SDKs are only
+        imported then, so a run with nothing to do starts in milliseconds
+        and one that never reaches the calendar stage never touches Google OAuth.
+
+        Args:
+            credentials_path (str): Path to Google OAuth client secrets
+            token_path (str): Path to cached Google user token
+            refresh_margin (int): Seconds before expiry to refresh the token
+            transcription_cache (bool): Reuse transcripts of audio seen before
+            categorization_cache (bool): Reuse Claude results for repeated transcripts
+            ledger_path (str): SQLite file tracking per-memo progress
+                (defaults to the ledger's standard location)
+            preprocess_audio (bool): Shrink audio with ffmpeg before uploading
+            fast_path (bool): Answer simple memos with local rules instead of Claude
+            event_index_path (str): SQLite file mapping tasks to calendar events
+                (defaults to the index's standard location)
+            calendar_service_factory (callable): Builds a Calendar client for
+                each thread instead of authenticating with Google (used to
+                point runs at a stub server)
+        """
+        self.credentials_path = credentials_path
+        self.token_path = token_path
+        self.refresh_margin = refresh_margin
+        self.transcription_cache = TranscriptionCache() if transcription_cache else None
+        self.categorization_cache = CategorizationCache() if categorization_cache else None
+
+        self._lock = threading.Lock()
+        self._transcriber = None
+        self._voice_processor = None
+        self._reminder_manager = None
+        self._ledger = None
+        self._ledger_path = ledger_path
+        self._event_index = None
+        self._event_index_path = event_index_path
+        self.preprocess_audio = preprocess_audio
+        self.usage = UsageTracker()
+        self._use_fast_path = fast_path
+        # Built with the voice processor; compiling its rules costs ~30 ms
+        self.fast_path = None
+        self._credentials = None
+        self._calendar_local = threading.local()
+        self._calendar_service_factory = calendar_service_factory
+
+        self._stop_refresh = threading.Event()
+        self._refresh_thread = None
+
+        # Cache, token and upload counters are read when metrics are exported
+        self._metrics = get_metrics()
+        self._metrics.add_collector(self.collect_metrics)
+
+    @property
+    def transcriber(self):
+        """Shared AudioTranscriber (the OpenAI client is thread-safe)"""
+        with self._lock:
+            if self._transcriber is None:
+                from src.audio_transcriber import AudioTranscriber
+                self._transcriber = AudioTranscriber(cache=self.transcription_cache,
+                                                     preprocess=self.preprocess_audio)
+            return self._transcriber
+
+    @property
+    def voice_processor(self):
+        """Shared VoiceProcessor (the Anthropic client is thread-safe)"""
+        with self._lock:
+            if self._voice_processor is None:
+                from src.voice_processor import VoiceProcessor
+                if self._use_fast_path:
+                    from src.fast_path import RuleBasedExtractor
+                    self.fast_path = RuleBasedExtractor()
+                self._voice_processor = VoiceProcessor(cache=self.categorization_cache,
+                                                       usage=self.usage,
+                                                       fast_path=self.fast_path)
+            return self._voice_processor
+
+    @property
+    def reminder_manager(self):
+        """Shared ReminderManager"""
+        with self._lock:
+            if self._reminder_manager is None:
+                self._reminder_manager = ReminderManager()
+            return self._reminder_manager
+
+    @property
+    def ledger(self):
+        """Shared Ledger recording how far each memo got"""
+        with self._lock:
+            if self._ledger is None:
+                if self._ledger_path:
+                    self._ledger = Ledger(self._ledger_path)
+                else:
+                    self._ledger = Ledger()
+            return self._ledger
+
+    @property
+    def event_index(self):
+        """Shared EventIndex so repeated tasks are not created twice"""
+        with self._lock:
+            if self._event_index is None:
+                if self._event_index_path:
+                    self._event_index = EventIndex(self._event_index_path)
+                else:
+                    self._event_index = EventIndex()
+            return self._event_index
+
+    @property
+    def credentials(self):
+        """Google credentials, loaded once and kept fresh in the background"""
+        with self._lock:
+            if self._credentials is None:
+                from src.calendar_manager import load_credentials
+                self._credentials = load_credentials(self.credentials_path, self.token_path)
+                self._start_token_refresh()
+            return self._credentials
+
+    @property
+    def calendar_manager(self):
+        """
+        CalendarManager for the calling thread
+
+        The discovery-built service uses httplib2, which is not thread-safe,
+        so each thread gets its own service built once from the shared
+        credentials.
+        """
+        manager = getattr(self._calendar_local, 'manager', None)
+        if manager is None:
+            from src.calendar_manager import CalendarManager
+            if self._calendar_service_factory is not None:
+                manager = CalendarManager(self.credentials_path, event_index=self.event_index,
+                                          service=self._calendar_service_factory())
+            else:
+                manager = CalendarManager(self.credentials_path, credentials=self.credentials,
+                                          event_index=self.event_index)
+            self._calendar_local.manager = manager
+        return manager
+
+    def _start_token_refresh(self):
+        """Start the background token refresher (caller holds the lock)"""
+        if self._refresh_thread is not None or not self._credentials.refresh_token:
+            return
+        self._refresh_thread = threading.Thread(
+            target=self._refresh_loop, name="google-token-refresh", daemon=True)
+        self._refresh_thread.start()
+
+    def _seconds_until_refresh(self):
+        expiry = self._credentials.expiry
+        if expiry is None:
+            return None
+        # google-auth stores expiry as naive UTC
+        remaining = (expiry - datetime.utcnow()).total_seconds()
+        return max(0, remaining - self.refresh_margin)
+
+    def _refresh_loop(self):
+        from google.auth.transport.requests import Request
+        from src.calendar_manager import save_credentials
+
+        while True:
+            wait = self._seconds_until_refresh()
+            if wait is None:
+                return
+            if self._stop_refresh.wait(wait):
+                return
+
+            try:
+                self._credentials.refresh(Request())
+                save_credentials(self._credentials, self.token_path)
+            except Exception as e:
+                print(f"⚠️  Google token refresh failed: {e}")
+                if self._stop_refresh.wait(TOKEN_RETRY_INTERVAL):
+                    return
+
+    @property
+    def upload_bytes_saved(self):
+        """Bytes preprocessing has kept off the network so far"""
+        return self._transcriber.bytes_saved if self._transcriber else 0
+
+    def cache_report(self):
+        """
+        Summarize cache and fast-path hits and misses for this run
+
+        Returns:
+            dict: Report per cache name
+        """
+        report = {}
+        if self.transcription_cache is not None:
+            report['transcription'] = self.transcription_cache.report()
+        if self.categorization_cache is not None:
+            report['categorization'] = self.categorization_cache.report()
+        if self.fast_path is not None:
+            report['fast path'] = self.fast_path.report()
+        return report
+
+    def collect_metrics(self):
+        """
+        Counters this context already keeps, in the metrics collector format
+
+        Returns:
+            list: (name, kind, labels, value) tuples
+        """
+        samples = []
+        for cache, stats in self.cache_report().items():
+            samples.append(('cache_lookups_total', 'counter', {'cache': cache, 'result': 'hit'}, stats['hits']))
+            samples.append(('cache_lookups_total', 'counter', {'cache': cache, 'result': 'miss'}, stats['misses']))
+
+        usage = self.usage.summary()
+        for kind in ('input_tokens', 'cache_creation_input_tokens', 'cache_read_input_tokens', 'output_tokens'):
+            samples.append(('claude_tokens_total', 'counter', {'type': kind}, usage[kind]))
+        samples.append(('claude_calls_total', 'counter', {}, usage['calls']))
+        samples.append(('upload_bytes_saved_total', 'counter', {'provider': 'whisper'}, self.upload_bytes_saved))
+        return samples
+
+    def close(self):
+        """Stop the background refresher and close the ledger, event index and caches"""
+        # Unregistered first: the collector reads the caches closed below
+        self._metrics.remove_collector(self.collect_metrics)
+        self._stop_refresh.set()
+        if self._refresh_thread is not None:
+            self._refresh_thread.join(timeout=1)
+        if self.categorization_cache is not None:
+            self.categorization_cache.close()
+            self.categorization_cache = None
+        if self._ledger is not None:
+            self._ledger.close()
+            self._ledger = None
+        if self._event_index is not None:
+            self._event_index.close()
+            self._event_index = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,97 @@
+"""
+Streaming JSON - Pulls task objects out of a partially received Claude response
+"""
+import json
+import re
+
+
+class TaskStreamParser:
+    def __init__(self, array_key='tasks'):
+        """
+        Incremental parser for responses shaped like {"tasks": [{...}, {...}]}
+
+        Text is fed in as it arrives; each task object is returned as soon
+        as its closing brace is seen. Any explanation text Claude puts
+        around the JSON is ignored.
+
+        Args:
+            array_key (str): Name of the array whose items should be emitted
+        """
+        self._array_start = re.compile(r'"%s"\s*:\s*\[' % re.escape(array_key))
+        self._buffer = ''
+        self._pos = 0
+        self._in_array = False
+        self._done = False
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._object_start = None
+        self.items = []
+
+    @property
+    def done(self):
+        """True once the array's closing bracket has been seen"""
+        return self._done
+
+    def feed(self, text):
+        """
+        Add newly received text
+
+        Args:
+            text (str): Next chunk of the response
+
+        Returns:
+            list: Task dicts completed by this chunk
+        """
+        if self._done:
+            return []
+        self._buffer += text
+
+        if not self._in_array:
+            match = self._array_start.search(self._buffer)
+            if not match:
+                return []
+            self._in_array = True
+            self._pos = match.end()
+
+        completed = []
+        buffer = self._buffer
+        for i in range(self._pos, len(buffer)):
+            char = buffer[i]
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == '\\':
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == '{':
+                if self._depth == 0:
+                    self._object_start = i
+                self._depth += 1
+            elif char == '}':
+                self._depth -= 1
+                if self._depth == 0:
+                    item = json.loads(buffer[self._object_start:i + 1])
+                    self.items.append(item)
+                    completed.append(item)
+                    self._object_start = None
+            elif char == ']' and self._depth == 0:
+                self._done = True
+                break
+
+        self._pos = len(buffer)
+
+        # Drop text that can no longer be part of an unfinished object
+        if self._object_start is None:
+            self._buffer = ''
+            self._pos = 0
+        elif self._object_start > 0:
+            self._buffer = self._buffer[self._object_start:]
+            self._pos -= self._object_start
+            self._object_start = 0
+
+        return completed
@@ -0,0 +1,452 @@
+"""
+Stub Servers - Local HTTP stand-ins for paid APIs
+Used for load tests and offline runs; latency, jitter and error rates are configurable
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from http import HTTPStatus
+from email.parser import BytesFeedParser
+from urllib.parse import parse_qs, unquote
+import json
+import random
+import re
+import threading
+import time
+import uuid
+
+# Shortest system prompt the Messages API caches (Sonnet)
+MIN_CACHEABLE_PROMPT_TOKENS = 1024
+
+# Uploads containing this tag followed by text and a NUL byte are
+# transcribed as that text, so synthetic audio can carry its own transcript
+TRANSCRIPT_TAG = b'stub-transcript:'
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """Routes requests to the owning stub server's handle() method"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def _dispatch(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        status, headers, payload = self.server.stub.respond(self.command, self.path, self.headers, body)
+
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    do_GET = _dispatch
+    do_POST = _dispatch
+    do_PUT = _dispatch
+    do_PATCH = _dispatch
+    do_DELETE = _dispatch
+
+    def log_message(self, format, *args):
+        # Keep load tests quiet
+        pass
+
+
+class StubServer:
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, host='127.0.0.1', port=0):
+        """
+        Base class for a threaded local HTTP stub
+
+        Args:
+            latency (float): Seconds added to every response
+            jitter (float): Extra random delay of up to this many seconds
+            error_rate (float): Fraction of requests (0-1) that fail with a retriable error
+            host (str): Interface to bind
+            port (int): Port to bind (0 picks a free one)
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.host = host
+        self.port = port
+        self.requests = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+        self._httpd = None
+        self._thread = None
+
+    @property
+    def url(self):
+        """Base URL of the running server"""
+        return f"http://{self.host}:{self.port}"
+
+    def start(self):
+        """Start serving on a background thread"""
+        self._httpd = ThreadingHTTPServer((self.host, self.port), _StubHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.stub = self
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(target=self._httpd.serve_forever,
+                                        name=type(self).__name__, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving"""
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def respond(self, method, path, headers, body):
+        """
+        Apply latency and error injection, then delegate to handle()
+
+        Returns:
+            tuple: (status, headers dict, body bytes)
+        """
+        with self._lock:
+            self.requests += 1
+        fail = self._roll_failure()
+
+        self._delay()
+        if fail:
+            return self.error_response()
+        return self.handle(method, path, headers, body)
+
+    def _roll_failure(self):
+        """Decide whether to inject a failure, counting it if so"""
+        fail = random.random() < self.error_rate
+        if fail:
+            with self._lock:
+                self.errors += 1
+        return fail
+
+    def _delay(self):
+        time.sleep(self.latency + random.uniform(0, self.jitter))
+
+    def error_response(self):
+        """Response sent for an injected failure (rate limited, retry shortly)"""
+        return json_response({'error': {'message': 'Injected stub failure', 'type': 'rate_limit_error'}},
+                             status=429, headers={'Retry-After': '1'})
+
+    def handle(self, method, path, headers, body):
+        """Build the real response; implemented by each stub"""
+        raise NotImplementedError
+
+
+def json_response(data, status=200, headers=None):
+    """Build a (status, headers, body) tuple for a JSON payload"""
+    all_headers = {'Content-Type': 'application/json'}
+    all_headers.update(headers or {})
+    return status, all_headers, json.dumps(data).encode('utf-8')
+
+
+class StubWhisperServer(StubServer):
+    """Mimics POST /v1/audio/transcriptions from the OpenAI API"""
+
+    def __init__(self, transcript="Buy milk tomorrow and call the dentist on Monday.", **kwargs):
+        """
+        Args:
+            transcript (str): Text returned for uploads that do not carry
+                their own (see TRANSCRIPT_TAG)
+            **kwargs: Latency, jitter and error settings for StubServer
+        """
+        super().__init__(**kwargs)
+        self.transcript = transcript
+        self.bytes_received = 0
+
+    def _transcript_for(self, body):
+        start = body.find(TRANSCRIPT_TAG)
+        if start < 0:
+            return self.transcript
+        start += len(TRANSCRIPT_TAG)
+        end = body.find(b'\0', start)
+        return body[start:end if end >= 0 else None].decode('utf-8', 'replace')
+
+    def handle(self, method, path, headers, body):
+        if method != 'POST' or not path.rstrip('/').endswith('/audio/transcriptions'):
+            return json_response({'error': {'message': 'Not found'}}, status=404)
+
+        with self._lock:
+            self.bytes_received += len(body)
+
+        transcript = self._transcript_for(body)
+        if b'name="response_format"\r\n\r\ntext' in body:
+            return 200, {'Content-Type': 'text/plain'}, transcript.encode('utf-8')
+        return json_response({'text': transcript})
+
+
+class StubClaudeServer(StubServer):
+    """
+    Mimics POST /v1/messages from the Anthropic API, streamed or not
+
+    Tasks are extracted from each transcript with the local fast-path
+    rules, so responses follow the single and batch prompt schemas. Point
+    the SDK at it with Anthropic(base_url=server.url) or ANTHROPIC_BASE_URL.
+    """
+
+    _MEMO = re.compile(r'<memo id="([^"]+)">\n(.*?)\n</memo>', re.S)
+
+    def __init__(self, chunk_chars=40, **kwargs):
+        """
+        Args:
+            chunk_chars (int): Characters per streamed text delta
+            **kwargs: Latency, jitter and error settings for StubServer
+        """
+        super().__init__(**kwargs)
+        # Imported here so the SDK-facing stubs stay importable on their own
+        from src.fast_path import RuleBasedExtractor
+
+        self.extractor = RuleBasedExtractor()
+        self.chunk_chars = chunk_chars
+        self.messages = 0
+        self._cached_prefixes = set()
+
+    def _answer(self, prompt):
+        """Response text for one user prompt"""
+        if prompt.startswith('Transcriptions:'):
+            memos = [{'id': memo_id, 'tasks': self.extractor.extract(text)[0]['tasks']}
+                     for memo_id, text in self._MEMO.findall(prompt)]
+            return json.dumps({'memos': memos}, indent=2)
+        text = prompt.split('\n', 1)[1] if prompt.startswith('Transcription:') else prompt
+        return json.dumps(self.extractor.extract(text)[0], indent=2)
+
+    @staticmethod
+    def _text_of(content):
+        if isinstance(content, str):
+            return content
+        return ''.join(block.get('text', '') for block in content)
+
+    def _usage(self, system, prompt, answer):
+        """Token counts at roughly 4 characters per token, with prompt caching"""
+        system_tokens = len(system) // 4
+        if system_tokens < MIN_CACHEABLE_PROMPT_TOKENS:
+            # Like the real API, short prefixes are never cached
+            with self._lock:
+                self.messages += 1
+            return {
+                'input_tokens': system_tokens + len(prompt) // 4 + 1,
+                'cache_creation_input_tokens': 0,
+                'cache_read_input_tokens': 0,
+                'output_tokens': len(answer) // 4 + 1,
+            }
+        with self._lock:
+            self.messages += 1
+            cached = system in self._cached_prefixes
+            self._cached_prefixes.add(system)
+        return {
+            'input_tokens': len(prompt) // 4 + 1,
+            'cache_creation_input_tokens': 0 if cached else system_tokens,
+            'cache_read_input_tokens': system_tokens if cached else 0,
+            'output_tokens': len(answer) // 4 + 1,
+        }
+
+    def handle(self, method, path, headers, body):
+        if method != 'POST' or not path.split('?', 1)[0].rstrip('/').endswith('/messages'):
+            return json_response({'type': 'error', 'error': {'type': 'not_found_error',
+                                                             'message': 'Not found'}}, status=404)
+
+        request = json.loads(body or b'{}')
+        system = self._text_of(request.get('system') or '')
+        prompt = self._text_of(request['messages'][-1]['content'])
+        answer = self._answer(prompt)
+        usage = self._usage(system, prompt, answer)
+        message = {
+            'id': f"msg_stub{uuid.uuid4().hex[:20]}",
+            'type': 'message',
+            'role': 'assistant',
+            'model': request.get('model', 'stub'),
+            'content': [{'type': 'text', 'text': answer}],
+            'stop_reason': 'end_turn',
+            'stop_sequence': None,
+            'usage': usage,
+        }
+        if not request.get('stream'):
+            return json_response(message)
+        return 200, {'Content-Type': 'text/event-stream'}, self._event_stream(message)
+
+    def _event_stream(self, message):
+        """Server-sent events for a message, split into text deltas"""
+        answer = message['content'][0]['text']
+        start = dict(message, content=[], stop_reason=None,
+                     usage=dict(message['usage'], output_tokens=1))
+        events = [
+            ('message_start', {'type': 'message_start', 'message': start}),
+            ('content_block_start', {'type': 'content_block_start', 'index': 0,
+                                     'content_block': {'type': 'text', 'text': ''}}),
+        ]
+        for offset in range(0, len(answer), self.chunk_chars):
+            events.append(('content_block_delta', {
+                'type': 'content_block_delta', 'index': 0,
+                'delta': {'type': 'text_delta', 'text': answer[offset:offset + self.chunk_chars]},
+            }))
+        events += [
+            ('content_block_stop', {'type': 'content_block_stop', 'index': 0}),
+            ('message_delta', {'type': 'message_delta',
+                               'delta': {'stop_reason': 'end_turn', 'stop_sequence': None},
+                               'usage': {'output_tokens': message['usage']['output_tokens']}}),
+            ('message_stop', {'type': 'message_stop'}),
+        ]
+        return ''.join(f"event: {name}\ndata: {json.dumps(data)}\n\n"
+                       for name, data in events).encode('utf-8')
+
+
+class StubCalendarServer(StubServer):
+    """
+    Mimics the Google Calendar v3 freeBusy and events endpoints
+
+    Supports insert (with client-supplied IDs and 409 on duplicates),
+    update, delete, list with incremental syncToken paging and batch
+    requests. build_service() returns a client pointed at it.
+    """
+
+    BATCH_PATH = '/batch/calendar/v3'
+
+    def __init__(self, busy=(), **kwargs):
+        """
+        Args:
+            busy (iterable): (start, end) RFC 3339 strings already on the calendar
+            **kwargs: Latency, jitter and error settings for StubServer
+        """
+        super().__init__(**kwargs)
+        self.busy = list(busy)
+        self.events = {}
+        self.freebusy_queries = 0
+        self._sequence = 0
+        self._changed_at = {}
+
+    def build_service(self):
+        """
+        Calendar client whose normal and batch requests both reach this server
+
+        Returns:
+            Resource: googleapiclient service built from the cached
+                discovery document with its root URL replaced
+        """
+        import httplib2
+        from googleapiclient.discovery import build_from_document
+        from src.calendar_manager import load_discovery_document
+
+        document = dict(load_discovery_document(), rootUrl=self.url + '/')
+        return build_from_document(document, http=httplib2.Http())
+
+    def respond(self, method, path, headers, body):
+        if not path.startswith(self.BATCH_PATH):
+            return super().respond(method, path, headers, body)
+        # Like Google, fail individual calls of a batch rather than the whole batch
+        with self._lock:
+            self.requests += 1
+        self._delay()
+        return self._batch(headers, body)
+
+    def _batch(self, headers, body):
+        """Run each application/http part of a multipart/mixed batch"""
+        parser = BytesFeedParser()
+        parser.feed(f"Content-Type: {headers['Content-Type']}\r\n\r\n".encode('utf-8') + body)
+        message = parser.close()
+
+        boundary = f"batch_{uuid.uuid4().hex}"
+        parts = []
+        for part in message.get_payload():
+            request = part.get_payload(decode=True)
+            head, separator, part_body = request.partition(b'\r\n\r\n')
+            if not separator:
+                head, separator, part_body = request.partition(b'\n\n')
+            request_line = head.decode('utf-8').splitlines()[0]
+            part_method, part_path = request_line.split(' ')[:2]
+
+            if self._roll_failure():
+                status, part_headers, payload = self.error_response()
+            else:
+                status, part_headers, payload = self.handle(part_method, part_path, {}, part_body)
+
+            header_lines = ''.join(f"{name}: {value}\r\n" for name, value in part_headers.items())
+            parts.append(
+                f"--{boundary}\r\n"
+                f"Content-Type: application/http\r\n"
+                f"Content-ID: <response-{part['Content-ID'][1:-1]}>\r\n\r\n"
+                f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+                f"{header_lines}Content-Length: {len(payload)}\r\n\r\n"
+                f"{payload.decode('utf-8')}\r\n"
+            )
+        parts.append(f"--{boundary}--\r\n")
+        return (200, {'Content-Type': f'multipart/mixed; boundary={boundary}'},
+                ''.join(parts).encode('utf-8'))
+
+    def _touch(self, event):
+        """Record a change so incremental syncs pick it up (caller holds the lock)"""
+        self._sequence += 1
+        self.events[event['id']] = event
+        self._changed_at[event['id']] = self._sequence
+
+    def _freebusy(self, query):
+        with self._lock:
+            self.freebusy_queries += 1
+            busy = [{'start': start, 'end': end} for start, end in self.busy
+                    if end > query['timeMin'] and start < query['timeMax']]
+        calendars = {item['id']: {'busy': busy} for item in query.get('items', [])}
+        return json_response({
+            'kind': 'calendar#freeBusy',
+            'timeMin': query['timeMin'],
+            'timeMax': query['timeMax'],
+            'calendars': calendars,
+        })
+
+    def _list(self, params):
+        with self._lock:
+            since = int(params.get('syncToken', ['0'])[0])
+            if since > self._sequence:
+                return json_response({'error': {'code': 410, 'message': 'Sync token is no longer valid'}},
+                                     status=410)
+            show_deleted = params.get('showDeleted', ['false'])[0] == 'true'
+            items = [event for event_id, event in self.events.items()
+                     if self._changed_at[event_id] > since
+                     and (show_deleted or event.get('status') != 'cancelled')]
+            sync_token = str(self._sequence)
+        return json_response({'kind': 'calendar#events', 'items': items, 'nextSyncToken': sync_token})
+
+    def handle(self, method, path, headers, body):
+        path, _, query = path.partition('?')
+        path = path.rstrip('/')
+
+        if method == 'POST' and path.endswith('/freeBusy'):
+            return self._freebusy(json.loads(body or b'{}'))
+
+        if path.endswith('/events'):
+            if method == 'GET':
+                return self._list(parse_qs(query))
+            if method == 'POST':
+                event = json.loads(body or b'{}')
+                with self._lock:
+                    event_id = event.setdefault('id', f"stub{len(self.events):06d}")
+                    if event_id in self.events:
+                        return json_response({'error': {'code': 409,
+                                                        'message': 'The requested identifier already exists.'}},
+                                             status=409)
+                    event['status'] = 'confirmed'
+                    self._touch(event)
+                return json_response(event)
+
+        if '/events/' in path:
+            event_id = unquote(path.rsplit('/', 1)[1])
+            with self._lock:
+                existing = self.events.get(event_id)
+                if existing is None:
+                    return json_response({'error': {'code': 404, 'message': 'Not Found'}}, status=404)
+                if method == 'GET':
+                    return json_response(existing)
+                if method in ('PUT', 'PATCH'):
+                    event = dict(existing) if method == 'PATCH' else {}
+                    event.update(json.loads(body or b'{}'))
+                    event.update(id=event_id, status=event.get('status', 'confirmed'))
+                    self._touch(event)
+                    return json_response(event)
+                if method == 'DELETE':
+                    self._touch({'id': event_id, 'status': 'cancelled'})
+                    return 204, {}, b''
+
+        return json_response({'error': {'code': 404, 'message': 'Not found'}}, status=404)
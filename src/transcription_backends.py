@@ -0,0 +1,189 @@
+"""
+Transcription Backends - Interchangeable speech-to-text engines for AudioTranscriber
+Pick one with the TRANSCRIPTION_BACKEND environment variable
+"""
+from dotenv import load_dotenv
+import os
+
+# Load environment variables
+load_dotenv()
+
+DEFAULT_BACKEND = 'openai'
+
+
+class TranscriptionBackend:
+    """Interface every transcription engine implements"""
+
+    name = 'base'
+
+    @property
+    def cache_identity(self):
+        """Which engine produced a transcript, for the transcription cache key"""
+        return self.name
+
+    def transcribe(self, audio_file_path, model, language):
+        """
+        Transcribe one audio file
+
+        Args:
+            audio_file_path (str): Path to audio file
+            model (str): Model name understood by the engine
+            language (str): Language of the recording
+
+        Returns:
+            str: Transcribed text
+
+        Raises:
+            Exception: On any engine or network failure
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """Release anything the backend holds (servers, connections)"""
+        pass
+
+
+class OpenAIBackend(TranscriptionBackend):
+    """OpenAI Whisper, or any server that speaks the same API"""
+
+    name = 'openai'
+
+    def __init__(self, api_key=None, base_url=None):
+        """
+        Args:
+            api_key (str): API key (defaults to OPENAI_API_KEY)
+            base_url (str): Alternative endpoint, e.g. a self-hosted Whisper server
+        """
+        api_key = api_key or os.getenv('OPENAI_API_KEY')
+        if not api_key:
+            raise ValueError("OPENAI_API_KEY not found in environment variables")
+        # Imported on first use so runs that never upload skip loading the SDK
+        from openai import OpenAI
+
+        # Retries happen in AudioTranscriber's shared retry policy, not in the SDK
+        self.client = OpenAI(api_key=api_key, base_url=base_url, max_retries=0)
+        self.base_url = base_url
+
+    @property
+    def cache_identity(self):
+        # A self-hosted server may run a different model under the same name
+        return f"{self.name}:{self.base_url}" if self.base_url else self.name
+
+    def transcribe(self, audio_file_path, model, language):
+        # Open audio file
+        with open(audio_file_path, 'rb') as audio_file:
+            # Call Whisper API
+            transcript = self.client.audio.transcriptions.create(
+                model=model,
+                file=audio_file,
+                response_format="text",
+                language=language
+            )
+        return transcript.strip()
+
+
+class StubBackend(OpenAIBackend):
+    """Local stand-in server with configurable latency and errors - costs nothing"""
+
+    name = 'stub'
+
+    def __init__(self, latency=0.5, jitter=0.0, error_rate=0.0, transcript=None):
+        """
+        Start a StubWhisperServer and talk to it through the OpenAI client
+
+        Args:
+            latency (float): Seconds per request
+            jitter (float): Extra random delay of up to this many seconds
+            error_rate (float): Fraction of requests that fail with a 429
+            transcript (str): Text returned for every upload
+        """
+        # Imported here so normal runs never load the stub server code
+        from src.stub_servers import StubWhisperServer
+
+        options = {'latency': latency, 'jitter': jitter, 'error_rate': error_rate}
+        if transcript:
+            options['transcript'] = transcript
+        self.server = StubWhisperServer(**options).start()
+        super().__init__(api_key='stub', base_url=f"{self.server.url}/v1")
+
+    @property
+    def cache_identity(self):
+        # The stub listens on a new port every run; its output is never real
+        return self.name
+
+    def close(self):
+        self.server.stop()
+
+
+def get_backend(name=None):
+    """
+    Create the configured transcription backend
+
+    Environment variables:
+        TRANSCRIPTION_BACKEND: 'openai' (default), 'http' or 'stub'
+        TRANSCRIPTION_URL: Base URL of an OpenAI-compatible server for 'http'
+        TRANSCRIPTION_STUB_LATENCY / _JITTER / _ERROR_RATE: Settings for 'stub'
+
+    Args:
+        name (str): Backend name, overriding TRANSCRIPTION_BACKEND
+
+    Returns:
+        TranscriptionBackend: Ready-to-use backend
+    """
+    name = (name or os.getenv('TRANSCRIPTION_BACKEND') or DEFAULT_BACKEND).lower()
+
+    if name == 'openai':
+        return OpenAIBackend()
+    if name == 'http':
+        url = os.getenv('TRANSCRIPTION_URL')
+        if not url:
+            raise ValueError("TRANSCRIPTION_URL not found in environment variables")
+        # Self-hosted servers usually ignore the key, but the client requires one
+        return OpenAIBackend(api_key=os.getenv('TRANSCRIPTION_API_KEY') or 'local', base_url=url)
+    if name == 'stub':
+        return StubBackend(
+            latency=float(os.getenv('TRANSCRIPTION_STUB_LATENCY', '0.5')),
+            jitter=float(os.getenv('TRANSCRIPTION_STUB_JITTER', '0')),
+            error_rate=float(os.getenv('TRANSCRIPTION_STUB_ERROR_RATE', '0')),
+        )
+    raise ValueError(f"Unknown transcription backend: {name}")
+
+
+if __name__ == "__main__":
+    # Compare throughput of backends on the same files
+    from concurrent.futures import ThreadPoolExecutor
+    import sys
+    import time
+
+    if len(sys.argv) < 3:
+        print("Usage: python -m src.transcription_backends <backend[,backend...]> <audio_file>... [--workers N]")
+        sys.exit(1)
+
+    args = sys.argv[1:]
+    workers = 4
+    if '--workers' in args:
+        index = args.index('--workers')
+        workers = int(args[index + 1])
+        del args[index:index + 2]
+    names, files = args[0].split(','), args[1:]
+
+    for name in names:
+        backend = get_backend(name)
+        failures = 0
+
+        def run(path):
+            try:
+                backend.transcribe(path, "whisper-1", "en")
+                return True
+            except Exception as e:
+                print(f"   {name}: {e}")
+                return False
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            failures = sum(1 for ok in pool.map(run, files) if not ok)
+        elapsed = time.perf_counter() - started
+        backend.close()
+
+        print(f"{name:>8}: {len(files)} file(s) in {elapsed:.2f}s "
+              f"({len(files) / elapsed:.1f} files/s, {failures} failed, {workers} workers)")
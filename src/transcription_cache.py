@@ -0,0 +1,179 @@
+"""
+Transcription Cache - Content-addressed on-disk cache of Whisper transcripts
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+DEFAULT_CACHE_DIR = os.path.join('.cache', 'transcriptions')
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024      # 50 MB of transcripts
+DEFAULT_MAX_AGE = 30 * 24 * 60 * 60       # 30 days
+
+# Read audio in 1 MB blocks so large recordings never sit in memory
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def hash_audio_file(audio_file_path):
+    """
+    Compute a SHA-256 digest of an audio file's bytes
+
+    Args:
+        audio_file_path (str): Path to audio file
+
+    Returns:
+        str: Hex digest of the file contents
+    """
+    digest = hashlib.sha256()
+    with open(audio_file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class TranscriptionCache:
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES,
+                 max_age=DEFAULT_MAX_AGE):
+        """
+        Initialize the cache
+
+        Entries are keyed by the audio content plus model and language, so a
+        renamed copy of the same recording still hits.
+
+        Args:
+            cache_dir (str): Directory holding one JSON file per transcript
+            max_bytes (int): Evict least recently used entries above this size
+            max_age (int): Evict entries unused for this many seconds
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def make_key(self, audio_file_path, model, language, backend=''):
+        """
+        Build the cache key for an audio file
+
+        Args:
+            audio_file_path (str): Path to audio file
+            model (str): Transcription model name
+            language (str): Transcription language
+            backend (str): Backend name and endpoint, so stub or self-hosted
+                transcripts are never returned for real Whisper runs
+
+        Returns:
+            str: Cache key
+        """
+        content_hash = hash_audio_file(audio_file_path)
+        return hashlib.sha256(f"{content_hash}:{model}:{language}:{backend}".encode()).hexdigest()
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key):
+        """
+        Look up a transcript
+
+        Args:
+            key (str): Cache key from make_key()
+
+        Returns:
+            str: Cached transcript, or None on a miss
+        """
+        path = self._entry_path(key)
+        try:
+            expired = time.time() - os.stat(path).st_mtime > self.max_age
+            if not expired:
+                with open(path, 'r', encoding='utf-8') as f:
+                    entry = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        if expired:
+            self._remove(path)
+            with self._lock:
+                self.misses += 1
+            return None
+
+        # Touch the entry so size-based eviction drops the least recently used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        with self._lock:
+            self.hits += 1
+        return entry['text']
+
+    def put(self, key, text, source=None):
+        """
+        Store a transcript
+
+        Args:
+            key (str): Cache key from make_key()
+            text (str): Transcript text
+            source (str): Original file name, kept for debugging
+        """
+        entry = {'text': text, 'created': time.time(), 'source': source}
+
+        # Write to a temp file first so a crash never leaves a half entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, self._entry_path(key))
+
+        self.evict()
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            return
+        with self._lock:
+            self.evictions += 1
+
+    def evict(self):
+        """Drop expired entries, then the least recently used until under max_bytes"""
+        now = time.time()
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if not entry.name.endswith('.json'):
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            if now - stat.st_mtime > self.max_age:
+                self._remove(entry.path)
+            else:
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    def report(self):
+        """
+        Summarize cache effectiveness
+
+        Returns:
+            dict: Hit, miss and eviction counts plus hit rate
+        """
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
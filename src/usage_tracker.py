@@ -0,0 +1,94 @@
+"""
+Usage Tracker - Records token usage and latency of every Claude call
+"""
+from collections import deque
+import json
+import threading
+import time
+
+# Calls kept individually; older ones only count towards the running totals
+RECENT_CALLS = 1000
+
+_TOKEN_FIELDS = ('input_tokens', 'cache_creation_input_tokens', 'cache_read_input_tokens', 'output_tokens')
+
+
+class UsageTracker:
+    def __init__(self, log_path=None, recent=RECENT_CALLS):
+        """
+        Initialize the tracker
+
+        Totals are kept as running sums, so memory and summary() cost stay
+        flat in long-running watch and daemon modes.
+
+        Args:
+            log_path (str): Optional JSONL file that gets one line per call
+            recent (int): Most recent calls kept in self.calls
+        """
+        self.log_path = log_path
+        self.calls = deque(maxlen=recent)
+        self._totals = dict.fromkeys(('calls',) + _TOKEN_FIELDS, 0)
+        self._latency_total = 0.0
+        self._first_token_total = 0.0
+        self._first_token_calls = 0
+        self._lock = threading.Lock()
+
+    def record(self, model, usage, latency, time_to_first_token=None, kind='single'):
+        """
+        Record one API call
+
+        Args:
+            model (str): Model name
+            usage: Usage object from the Anthropic response
+            latency (float): Seconds from request to final token
+            time_to_first_token (float): Seconds until the first text arrived
+            kind (str): Call type, e.g. 'single' or 'batch'
+
+        Returns:
+            dict: The stored record
+        """
+        entry = {
+            'timestamp': time.time(),
+            'model': model,
+            'kind': kind,
+            'input_tokens': getattr(usage, 'input_tokens', 0) or 0,
+            'cache_creation_input_tokens': getattr(usage, 'cache_creation_input_tokens', 0) or 0,
+            'cache_read_input_tokens': getattr(usage, 'cache_read_input_tokens', 0) or 0,
+            'output_tokens': getattr(usage, 'output_tokens', 0) or 0,
+            'latency': latency,
+            'time_to_first_token': time_to_first_token,
+        }
+
+        with self._lock:
+            self.calls.append(entry)
+            self._totals['calls'] += 1
+            for field in _TOKEN_FIELDS:
+                self._totals[field] += entry[field]
+            self._latency_total += latency
+            if time_to_first_token is not None:
+                self._first_token_total += time_to_first_token
+                self._first_token_calls += 1
+            if self.log_path:
+                with open(self.log_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(entry) + '\n')
+        return entry
+
+    def summary(self):
+        """
+        Totals and averages across all recorded calls
+
+        Returns:
+            dict: Call count, token totals, cache share of input and mean latencies
+        """
+        with self._lock:
+            totals = dict(self._totals)
+            latency_total = self._latency_total
+            first_token_total, first_token_calls = self._first_token_total, self._first_token_calls
+
+        # input_tokens excludes cached tokens, so the prompt total is the sum of all three
+        prompt_tokens = (totals['input_tokens'] + totals['cache_creation_input_tokens']
+                         + totals['cache_read_input_tokens'])
+        totals['cached_share'] = totals['cache_read_input_tokens'] / prompt_tokens if prompt_tokens else 0.0
+
+        totals['mean_latency'] = latency_total / totals['calls'] if totals['calls'] else 0.0
+        totals['mean_time_to_first_token'] = first_token_total / first_token_calls if first_token_calls else 0.0
+        return totals
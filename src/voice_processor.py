@@ -1,34 +1,23 @@
 """
 Voice Processor - Handles Claude API interaction for transcription categorization
 """
-from anthropic import Anthropic
 from dotenv import load_dotenv
+from src.usage_tracker import UsageTracker
+from src.streaming_json import TaskStreamParser
+from src.rate_limiter import get_retry_policy
+from src.models import Task, parse_tasks
+import hashlib
 import os
 import json
+import time
 
 # Load environment variables
 load_dotenv()
 
-class VoiceProcessor:
-    def __init__(self):
-        """Initialize Claude API client"""
-        api_key = os.getenv('CLAUDE_API_KEY')
-        if not api_key:
-            raise ValueError("CLAUDE_API_KEY not found in environment variables")
-        self.client = Anthropic(api_key=api_key)
-        
-    def process_transcription(self, transcription_text):
-        """
-        Send transcription to Claude for categorization
-        
-        Args:
-            transcription_text (str): The transcribed voice memo text
-            
-        Returns:
-            dict: Categorized tasks with metadata
-        """
-        prompt = f"""
-        Analyze this voice memo transcription and extract actionable tasks.
+DEFAULT_MODEL = "claude-sonnet-4-20250514"
+
+# Category rules shared by the single and batch prompts
+TASK_GUIDELINES = """
         For each task, identify:
         - The task description (clear, concise)
         - Priority (high, medium, low, urgent)
@@ -57,46 +46,384 @@ class VoiceProcessor:
         - "gym session" → health
         - "quarterly review meeting" → work
         - "read that book" → learning
+"""
 
-        Transcription:
-        {transcription_text}
-
-        Return the results in JSON format like this:
-        {{
+# Static instructions sent as a cacheable system prefix. Only the transcript
+# varies between calls, so the provider can reuse the cached prefix. At roughly
+# 600 tokens it is below the model's caching minimum (1024 tokens for
+# Sonnet), so the API currently ignores cache_control and bills it as normal
+# input; the marker is kept so caching starts if the instructions grow. Do
+# not pad the instructions just to qualify - any wording change alters the
+# categorization of every memo.
+SYSTEM_PROMPT = """
+        Analyze voice memo transcriptions and extract actionable tasks.""" + TASK_GUIDELINES + """
+        When the user sends a single transcription, return the results in JSON format like this:
+        {
             "tasks": [
-                {{
+                {
                     "description": "task description",
                     "priority": "medium",
                     "category": "category_name",
                     "due_date": "tomorrow" or null
-                }}
+                }
             ]
-        }}
+        }
+
+        When the user sends several transcriptions, each wrapped in a <memo> tag with
+        an id, keep every memo's tasks separate and return one entry for every memo id
+        (use an empty tasks list for memos without tasks):
+        {
+            "memos": [
+                {
+                    "id": "m0",
+                    "tasks": [
+                        {
+                            "description": "task description",
+                            "priority": "medium",
+                            "category": "category_name",
+                            "due_date": "tomorrow" or null
+                        }
+                    ]
+                }
+            ]
+        }
+        """
+
+# Variable part of each request
+PROMPT_TEMPLATE = "Transcription:\n{transcription}"
+BATCH_PROMPT_TEMPLATE = "Transcriptions:\n{memos}"
+
+# Batches are sized by a rough token estimate (about 4 characters per token)
+BATCH_TOKEN_BUDGET = 4000
+MAX_BATCH_SIZE = 25
+BATCH_OUTPUT_TOKENS_PER_MEMO = 200
+MAX_OUTPUT_TOKENS = 8192
+
+# Changes whenever the prompts are edited, invalidating cached results
+PROMPT_VERSION = hashlib.sha256(
+    (SYSTEM_PROMPT + PROMPT_TEMPLATE + BATCH_PROMPT_TEMPLATE).encode('utf-8')).hexdigest()[:16]
+
+class VoiceProcessor:
+    def __init__(self, cache=None, model=DEFAULT_MODEL, usage=None, fast_path=None, retry_policy=None):
         """
+        Initialize Claude API client
         
-        # Call Claude API
-        message = self.client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=1024,
-            messages=[
-                {"role": "user", "content": prompt}
-            ]
-        )
+        Args:
+            cache (CategorizationCache): Optional cache of earlier results
+            model (str): Claude model name
+            usage (UsageTracker): Records tokens and latency per call
+                (a fresh tracker is created if omitted)
+            fast_path (RuleBasedExtractor): Answers simple memos locally;
+                only low-confidence memos are sent to Claude
+            retry_policy (RetryPolicy): Throttling and retries for Claude calls
+                (defaults to the shared 'claude' limiter)
+        """
+        api_key = os.getenv('CLAUDE_API_KEY')
+        if not api_key:
+            raise ValueError("CLAUDE_API_KEY not found in environment variables")
+        # Imported on first use; the SDK takes most of a second to load
+        from anthropic import Anthropic
+        
+        # Retries happen in the shared retry policy, not in the SDK
+        self.client = Anthropic(api_key=api_key, max_retries=0)
+        self.retry_policy = retry_policy or get_retry_policy('claude')
+        self.cache = cache
+        self.model = model
+        self.usage = usage or UsageTracker()
+        self.fast_path = fast_path
+    
+    def _stream_claude(self, prompt, max_tokens, kind='single'):
+        """
+        Stream one prompt to Claude, yielding response text as it arrives
+        
+        The static instructions go in a system block marked for prompt
+        caching; only the prompt itself changes between calls. Token usage
+        and time to first token are recorded once the stream finishes.
+        Calls wait on the shared rate limiter, and a request that fails
+        before any text arrived is retried with backoff.
+        
+        Args:
+            prompt (str): Variable user content
+            max_tokens (int): Output token limit
+            kind (str): Call type recorded with the usage
+            
+        Yields:
+            str: Chunks of response text
+        """
+        estimated_tokens = estimate_tokens(SYSTEM_PROMPT) + estimate_tokens(prompt)
+        attempt = 0
+        
+        while True:
+            self.retry_policy.acquire(tokens=estimated_tokens)
+            started = time.perf_counter()
+            first_token = None
+            
+            try:
+                # Call Claude API
+                with self.client.messages.stream(
+                    model=self.model,
+                    max_tokens=max_tokens,
+                    system=[
+                        {"type": "text", "text": SYSTEM_PROMPT, "cache_control": {"type": "ephemeral"}}
+                    ],
+                    messages=[
+                        {"role": "user", "content": prompt}
+                    ]
+                ) as stream:
+                    for event in stream:
+                        if event.type != 'content_block_delta' or event.delta.type != 'text_delta':
+                            continue
+                        if first_token is None:
+                            first_token = time.perf_counter() - started
+                        yield event.delta.text
+                    message = stream.get_final_message()
+                break
+            except Exception as error:
+                # Text already handed to the caller cannot be taken back
+                if first_token is not None or not self.retry_policy.should_retry(error, attempt):
+                    raise
+                self.retry_policy.backoff(attempt, error)
+                attempt += 1
+        
+        if self.retry_policy.limiter is not None:
+            # Cache reads do not count against the input token limit
+            actual_tokens = ((message.usage.input_tokens or 0)
+                             + (getattr(message.usage, 'cache_creation_input_tokens', 0) or 0))
+            self.retry_policy.limiter.record_tokens(estimated_tokens, actual_tokens)
+        self.usage.record(self.model, message.usage, time.perf_counter() - started,
+                          time_to_first_token=first_token, kind=kind)
+    
+    def _call_claude(self, prompt, max_tokens, kind='single'):
+        """Send one prompt to Claude and return the full response text"""
+        return ''.join(self._stream_claude(prompt, max_tokens, kind))
+    
+    def _parse_json(self, response_text):
+        """Pull the JSON object out of a response (Claude might add explanation text)"""
+        start_idx = response_text.find('{')
+        end_idx = response_text.rfind('}') + 1
+        json_str = response_text[start_idx:end_idx]
+        return json.loads(json_str)
         
-        # Extract and parse response
-        response_text = message.content[0].text
+    def process_transcription(self, transcription_text):
+        """
+        Send transcription to Claude for categorization
+        
+        Args:
+            transcription_text (str): The transcribed voice memo text
+            
+        Returns:
+            dict: Categorized tasks with metadata
+        """
+        # Reuse earlier results for the same transcript, model and prompt
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.make_key(transcription_text, self.model, PROMPT_VERSION)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        # Simple memos are answered locally without a round trip
+        if self.fast_path is not None:
+            local_result = self.fast_path.try_extract(transcription_text)
+            if local_result is not None:
+                return local_result
+        
+        return self._categorize_one(transcription_text, cache_key)
+    
+    def _categorize_one(self, transcription_text, cache_key=None):
+        """
+        Categorize one transcription with its own Claude request
+        
+        Args:
+            transcription_text (str): The transcribed voice memo text
+            cache_key (str): Where to cache the result (None to skip caching)
+            
+        Returns:
+            dict: Categorized tasks with metadata
+        """
+        prompt = PROMPT_TEMPLATE.format(transcription=transcription_text)
+        response_text = self._call_claude(prompt, max_tokens=1024)
         
         # Try to parse JSON from response
         try:
-            # Find JSON in the response (Claude might add explanation text)
-            start_idx = response_text.find('{')
-            end_idx = response_text.rfind('}') + 1
-            json_str = response_text[start_idx:end_idx]
-            return json.loads(json_str)
+            result = self._parse_json(response_text)
         except (json.JSONDecodeError, ValueError) as e:
             print(f"Error parsing Claude response: {e}")
             print(f"Raw response: {response_text}")
             return {"tasks": []}
+        
+        # Only successful parses are cached so failures get retried
+        if cache_key is not None:
+            self.cache.put(cache_key, result)
+        return result
+    
+    def extract_tasks(self, transcription_text):
+        """
+        Categorize a transcription and validate the result into Task objects
+        
+        Args:
+            transcription_text (str): The transcribed voice memo text
+            
+        Returns:
+            list: Task objects
+        """
+        return parse_tasks(self.process_transcription(transcription_text))
+
+    def stream_tasks(self, transcription_text):
+        """
+        Yield tasks one by one while Claude is still writing its response
+        
+        Each task is parsed as soon as its JSON object closes, so callers
+        can schedule the first task long before the last one is generated.
+        
+        Args:
+            transcription_text (str): The transcribed voice memo text
+            
+        Yields:
+            Task: One validated task
+        """
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.make_key(transcription_text, self.model, PROMPT_VERSION)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                yield from parse_tasks(cached)
+                return
+        
+        if self.fast_path is not None:
+            local_result = self.fast_path.try_extract(transcription_text)
+            if local_result is not None:
+                yield from parse_tasks(local_result)
+                return
+        
+        prompt = PROMPT_TEMPLATE.format(transcription=transcription_text)
+        parser = TaskStreamParser()
+        try:
+            for chunk in self._stream_claude(prompt, max_tokens=1024, kind='stream'):
+                for item in parser.feed(chunk):
+                    if isinstance(item, dict):
+                        yield Task.from_dict(item)
+        except json.JSONDecodeError as e:
+            print(f"Error parsing streamed Claude response: {e}")
+            return
+        
+        # Only complete responses are cached so failures get retried
+        if parser.done and cache_key is not None:
+            self.cache.put(cache_key, {"tasks": parser.items})
+    
+    def _plan_batches(self, memos, token_budget, max_batch_size):
+        """
+        Group memos so each request stays within the token budget
+        
+        Args:
+            memos (list): (index, text) pairs
+            token_budget (int): Estimated transcript tokens allowed per request
+            max_batch_size (int): Maximum memos per request
+            
+        Returns:
+            list: Lists of (index, text) pairs
+        """
+        batches = []
+        current = []
+        current_tokens = 0
+        for index, text in memos:
+            tokens = estimate_tokens(text)
+            if current and (current_tokens + tokens > token_budget or len(current) >= max_batch_size):
+                batches.append(current)
+                current = []
+                current_tokens = 0
+            current.append((index, text))
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        return batches
+    
+    def _process_batch(self, memos):
+        """
+        Categorize several memos with one Claude request
+        
+        Args:
+            memos (list): (index, text) pairs
+            
+        Returns:
+            dict: Memo index -> {"tasks": [...]} for every memo Claude answered
+                cleanly (empty if the whole response was malformed)
+        """
+        memo_blocks = "\n".join(f'<memo id="m{index}">\n{text}\n</memo>' for index, text in memos)
+        prompt = BATCH_PROMPT_TEMPLATE.format(memos=memo_blocks)
+        max_tokens = min(MAX_OUTPUT_TOKENS, 512 + BATCH_OUTPUT_TOKENS_PER_MEMO * len(memos))
+        response_text = self._call_claude(prompt, max_tokens=max_tokens, kind='batch')
+        
+        try:
+            entries = self._parse_json(response_text)['memos']
+        except (json.JSONDecodeError, ValueError, KeyError, TypeError) as e:
+            print(f"Error parsing batched Claude response: {e}")
+            return {}
+        
+        wanted = {f"m{index}": index for index, _ in memos}
+        results = {}
+        for entry in entries if isinstance(entries, list) else []:
+            if not isinstance(entry, dict) or not isinstance(entry.get('tasks'), list):
+                continue
+            index = wanted.get(str(entry.get('id')))
+            if index is not None:
+                results[index] = {"tasks": entry['tasks']}
+        return results
+    
+    def process_transcriptions(self, batch, token_budget=BATCH_TOKEN_BUDGET,
+                               max_batch_size=MAX_BATCH_SIZE):
+        """
+        Categorize many transcriptions, packing several into each Claude request
+        
+        The category instructions are sent once per request instead of once
+        per memo. Each memo gets a stable id ("m" + its position in batch)
+        and the returned tasks are split back out by id. Memos missing from
+        a malformed response are retried one at a time.
+        
+        Args:
+            batch (list): Transcription strings
+            token_budget (int): Estimated transcript tokens per request
+            max_batch_size (int): Maximum memos per request
+            
+        Returns:
+            list: One {"tasks": [...]} dict per transcription, in input order
+        """
+        results = [None] * len(batch)
+        cache_keys = {}
+        pending = []
+        
+        for index, text in enumerate(batch):
+            if self.cache is not None:
+                cache_keys[index] = self.cache.make_key(text, self.model, PROMPT_VERSION)
+                cached = self.cache.get(cache_keys[index])
+                if cached is not None:
+                    results[index] = cached
+                    continue
+            if self.fast_path is not None:
+                local_result = self.fast_path.try_extract(text)
+                if local_result is not None:
+                    results[index] = local_result
+                    continue
+            pending.append((index, text))
+        
+        for memos in self._plan_batches(pending, token_budget, max_batch_size):
+            answered = self._process_batch(memos) if len(memos) > 1 else {}
+            
+            for index, text in memos:
+                if index not in answered:
+                    # Fall back to a dedicated request for this memo; the
+                    # cache and fast path were already consulted above
+                    results[index] = self._categorize_one(text, cache_keys.get(index))
+                    continue
+                results[index] = answered[index]
+                if self.cache is not None:
+                    self.cache.put(cache_keys[index], answered[index])
+        
+        return results
+
+def estimate_tokens(text):
+    """Rough token count for sizing batches (about 4 characters per token)"""
+    return len(text) // 4 + 1
 
 if __name__ == "__main__":
     # Test the processor
@@ -104,3 +431,10 @@ if __name__ == "__main__":
     test_text = "Remind me to buy milk tomorrow and call John on Monday"
     result = processor.process_transcription(test_text)
     print(json.dumps(result, indent=2))
+    
+    # Test batched categorization
+    batch = [test_text, "Pay the electricity bill by Friday", "Book flights to Denver next week"]
+    for text, result in zip(batch, processor.process_transcriptions(batch)):
+        print(f"{text}\n{json.dumps(result, indent=2)}")
+    
+    print(f"Usage: {json.dumps(processor.usage.summary(), indent=2)}")
@@ -0,0 +1,34 @@
+"""Tests for stitching segment transcripts"""
+from src.audio_chunker import stitch_transcripts
+
+
+def test_overlap_is_kept_once():
+    first = "remind me to book the dentist and then pick up the dry cleaning"
+    second = "pick up the dry cleaning on Friday after work"
+    assert stitch_transcripts([first, second]) == (
+        "remind me to book the dentist and then pick up the dry cleaning on Friday after work")
+
+
+def test_overlap_tolerates_garbled_boundary_words():
+    first = "call the plumber about the leaking kitchen tap tomor-"
+    second = "Leaking kitchen tap tomorrow morning before nine"
+    assert stitch_transcripts([first, second]) == (
+        "call the plumber about the leaking kitchen tap tomorrow morning before nine")
+
+
+def test_common_bigram_inside_window_is_not_spliced():
+    # "and the" appears near both boundaries but is not the shared audio
+    first = "buy milk and the bread then email Sarah about the budget review"
+    second = "I need to call Tom and the landlord about the lease"
+    assert stitch_transcripts([first, second]) == first + " " + second
+
+
+def test_repeated_phrase_away_from_boundary_is_ignored():
+    # "I need to" repeats, but the earlier one is far from the cut
+    first = "I need to renew the passport before the trip and also water the plants"
+    second = "I need to ring the bank on Monday"
+    assert stitch_transcripts([first, second]) == first + " " + second
+
+
+def test_empty_transcripts_are_skipped():
+    assert stitch_transcripts(["", "hello there", ""]) == "hello there"
@@ -0,0 +1,47 @@
+"""Tests for the SQLite categorization cache"""
+import pytest
+
+from src.categorization_cache import CategorizationCache
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'categorizations.sqlite3')
+
+
+def test_least_recently_used_entry_is_evicted(path):
+    cache = CategorizationCache(path, max_entries=2)
+    cache.put('a', {"tasks": ["a"]})
+    cache.put('b', {"tasks": ["b"]})
+    assert cache.get('a') == {"tasks": ["a"]}   # 'b' is now the oldest
+    cache.put('c', {"tasks": ["c"]})
+    assert cache.get('b') is None
+    assert cache.get('a') is not None and cache.get('c') is not None
+    assert cache.evictions == 1
+    cache.close()
+
+
+def test_processes_sharing_the_file_respect_the_limit(path):
+    # Two handles stand in for two daemon workers
+    first = CategorizationCache(path, max_entries=3)
+    second = CategorizationCache(path, max_entries=3)
+    for n in range(3):
+        first.put(f"first-{n}", {"tasks": []})
+    for n in range(3):
+        second.put(f"second-{n}", {"tasks": []})
+    first.put('last', {"tasks": []})
+
+    rows = first._conn.execute("SELECT COUNT(*) FROM categorizations").fetchone()[0]
+    assert rows == 3
+    first.close()
+    second.close()
+
+
+def test_updating_an_entry_does_not_evict(path):
+    cache = CategorizationCache(path, max_entries=2)
+    cache.put('a', {"tasks": []})
+    cache.put('b', {"tasks": []})
+    cache.put('a', {"tasks": ["new"]})
+    assert cache.evictions == 0
+    assert cache.get('a') == {"tasks": ["new"]}
+    cache.close()
@@ -0,0 +1,53 @@
+"""Tests for natural language due dates"""
+from datetime import datetime
+
+import pytest
+
+from src.date_parser import NaturalDateParser
+
+# Saturday afternoon
+REFERENCE = datetime(2026, 10, 17, 15, 0)
+
+
+@pytest.mark.parametrize('phrase, expected, has_time', [
+    # Relative to the clock
+    ("in 2 hours", datetime(2026, 10, 17, 17, 0), True),
+    ("in 30 minutes", datetime(2026, 10, 17, 15, 30), True),
+    ("in an hour", datetime(2026, 10, 17, 16, 0), True),
+    ("in half an hour", datetime(2026, 10, 17, 15, 30), True),
+    # Parts of today
+    ("this afternoon", datetime(2026, 10, 17, 14, 0), True),
+    ("this evening", datetime(2026, 10, 17, 18, 0), True),
+    ("tonight", datetime(2026, 10, 17, 19, 0), True),
+    ("by end of day", datetime(2026, 10, 17, 17, 0), True),
+    ("eod", datetime(2026, 10, 17, 17, 0), True),
+    ("at 3", datetime(2026, 10, 17, 15, 0), True),
+    # Days
+    ("tomorrow", datetime(2026, 10, 18, 9, 0), False),
+    ("in 3 days", datetime(2026, 10, 20, 9, 0), False),
+    ("friday at 2pm", datetime(2026, 10, 23, 14, 0), True),
+    ("next Tuesday 2:30pm", datetime(2026, 10, 20, 14, 30), True),
+    ("Monday morning", datetime(2026, 10, 19, 9, 0), True),
+    # Absolute dates
+    # Dates already past this year mean next year, unless the year is spoken
+    ("by March 3", datetime(2027, 3, 3, 9, 0), False),
+    ("Oct 17", datetime(2026, 10, 17, 9, 0), False),
+    ("Dec 12 at 10am", datetime(2026, 12, 12, 10, 0), True),
+    ("2024-12-01", datetime(2024, 12, 1, 9, 0), False),
+])
+def test_parse_details(phrase, expected, has_time):
+    assert NaturalDateParser().parse_details(phrase, REFERENCE) == (expected, has_time)
+
+
+@pytest.mark.parametrize('phrase', [
+    "sometime soon",
+    # Numbers inside unrelated words are not dates or times
+    "call the bank about loan 42",
+    "whenever room 12 is free",
+])
+def test_unparseable_phrases_default_to_tomorrow(phrase):
+    assert NaturalDateParser().parse_details(phrase, REFERENCE) == (datetime(2026, 10, 18, 9, 0), False)
+
+
+def test_missing_phrase_defaults_to_tomorrow():
+    assert NaturalDateParser().parse_details(None, REFERENCE) == (datetime(2026, 10, 18, 9, 0), False)
@@ -0,0 +1,140 @@
+"""Tests for task fingerprints and the event index"""
+from datetime import date
+
+import httplib2
+from googleapiclient.errors import HttpError
+
+from src.calendar_manager import CalendarManager
+from src.event_index import EventIndex, FINGERPRINT_PROPERTY, task_fingerprint
+from src.models import Reminder
+from src.rate_limiter import RetryPolicy
+
+
+def test_fingerprint_survives_a_rerun_on_a_later_day():
+    # A run that crashed before recording the memo is retried the next day:
+    # "tomorrow" now resolves to a different date but is the same task
+    reminder = Reminder("Call mom", "tomorrow", "family")
+    first = task_fingerprint(reminder, date(2026, 10, 18), memo='abc123')
+    retried = task_fingerprint(reminder, date(2026, 10, 19), memo='abc123')
+    assert first == retried
+
+
+def test_same_words_in_different_memos_are_different_tasks():
+    reminder = Reminder("Call mom", "tomorrow", "family")
+    monday = task_fingerprint(reminder, date(2026, 10, 13), memo='memo-monday')
+    thursday = task_fingerprint(reminder, date(2026, 10, 16), memo='memo-thursday')
+    assert monday != thursday
+
+
+def test_without_a_memo_the_resolved_date_separates_tasks():
+    reminder = Reminder("Call mom", "tomorrow", "family")
+    assert (task_fingerprint(reminder, date(2026, 10, 13))
+            != task_fingerprint(reminder, date(2026, 10, 16)))
+
+
+def test_fingerprint_ignores_case_and_spacing():
+    assert (task_fingerprint(Reminder("Call  Mom", "Tomorrow", "family"), date(2026, 10, 18), memo='m')
+            == task_fingerprint(Reminder("call mom", "tomorrow", "family"), date(2026, 10, 18), memo='m'))
+
+
+def test_index_records_and_cancels_events(tmp_path):
+    index = EventIndex(str(tmp_path / "events.db"))
+    assert index.get('fp') is None
+
+    index.record('fp', 'primary', 'evt1', start='2026-10-18T09:00:00')
+    index.record('fp', 'primary', 'evt2')
+    entry = index.get('fp')
+    assert entry['event_id'] == 'evt2'
+    assert entry['start'] == '2026-10-18T09:00:00'
+    assert entry['status'] == 'confirmed'
+
+    assert index.mark_cancelled('primary', 'evt2')
+    assert not index.mark_cancelled('primary', 'unknown')
+    assert index.get('fp')['status'] == 'cancelled'
+    index.close()
+
+
+class _FakeRequest:
+    def __init__(self, result):
+        self.result = result
+
+    def execute(self):
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+class _FakeEvents:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def list(self, **params):
+        self.calls.append(params)
+        return _FakeRequest(self.responses.pop(0))
+
+
+class _FakeService:
+    def __init__(self, responses):
+        self._events = _FakeEvents(responses)
+
+    def events(self):
+        return self._events
+
+
+def _synced_manager(tmp_path, responses):
+    index = EventIndex(str(tmp_path / "events.db"))
+    service = _FakeService(responses)
+    manager = CalendarManager(event_index=index, service=service,
+                              retry_policy=RetryPolicy(max_retries=0))
+    return manager, index, service._events
+
+
+def test_sync_records_tagged_events_and_cancellations(tmp_path):
+    manager, index, events = _synced_manager(tmp_path, [{
+        'items': [
+            {'id': 'evt1', 'status': 'confirmed', 'start': {'dateTime': '2026-10-18T09:00:00'},
+             'extendedProperties': {'private': {FINGERPRINT_PROPERTY: 'fp1'}}},
+            {'id': 'untagged', 'status': 'confirmed'},
+        ],
+        'nextSyncToken': 'token-1',
+    }])
+    index.record('fp2', 'primary', 'evt2')
+    events.responses.append({'items': [{'id': 'evt2', 'status': 'cancelled'}],
+                             'nextSyncToken': 'token-2'})
+
+    assert manager.sync_event_index() == 1
+    assert index.get('fp1')['event_id'] == 'evt1'
+    assert index.sync_state('primary')[0] == 'token-1'
+
+    assert manager.sync_event_index(max_age=0) == 1
+    assert events.calls[1]['syncToken'] == 'token-1'
+    assert index.get('fp2')['status'] == 'cancelled'
+    assert index.sync_state('primary')[0] == 'token-2'
+
+
+def test_sync_skips_when_recent(tmp_path):
+    manager, index, events = _synced_manager(tmp_path, [])
+    index.set_sync_token('primary', 'fresh')
+    assert manager.sync_event_index() == 0
+    assert events.calls == []
+
+
+def test_expired_sync_token_falls_back_to_a_full_sync(tmp_path):
+    gone = HttpError(httplib2.Response({'status': 410}), b'{"error": {"code": 410}}')
+    manager, index, events = _synced_manager(tmp_path, [
+        gone,
+        {'items': [{'id': 'evt1', 'status': 'confirmed',
+                    'extendedProperties': {'private': {FINGERPRINT_PROPERTY: 'fp1'}}}],
+         'nextPageToken': 'page-2'},
+        {'items': [], 'nextSyncToken': 'token-new'},
+    ])
+    index.set_sync_token('primary', 'token-old')
+
+    assert manager.sync_event_index(max_age=0) == 1
+    assert events.calls[0]['syncToken'] == 'token-old'
+    assert 'syncToken' not in events.calls[1]
+    assert 'syncToken' not in events.calls[2]
+    assert events.calls[2]['pageToken'] == 'page-2'
+    assert index.get('fp1')['event_id'] == 'evt1'
+    assert index.sync_state('primary')[0] == 'token-new'
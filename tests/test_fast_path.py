@@ -0,0 +1,55 @@
+"""Tests for the rule-based fast path"""
+import pytest
+
+from src.fast_path import RuleBasedExtractor
+
+
+@pytest.fixture
+def extractor():
+    return RuleBasedExtractor()
+
+
+@pytest.mark.parametrize('memo, category', [
+    # Keywords that are prefixes of unrelated words must not fire
+    ("Call Sonia tomorrow", 'calls'),           # son
+    ("Ring the taxi company", 'calls'),         # tax
+    ("Phone Dadson about the keys", 'calls'),   # dad
+    ("Call Rentokil about the mice", 'calls'),  # rent
+    ("Email Ordway the notes", 'emails'),       # order
+    # Whole words and their listed inflections still match
+    ("Call my son tomorrow", 'family'),
+    ("Pay the bills by Friday", 'finance'),
+    ("Call the dentist", 'health'),
+    ("Buy eggs and milk", 'shopping'),
+    ("Finish reading the chapter", 'learning'),
+])
+def test_category_keywords_match_whole_words(extractor, memo, category):
+    result = extractor.try_extract(memo)
+    assert result is not None
+    assert [task['category'] for task in result['tasks']] == [category]
+
+
+def test_unknown_words_fall_back_to_claude(extractor):
+    # "taxidermy" used to look like finance with high confidence
+    assert extractor.try_extract("Taxidermy something") is None
+
+
+@pytest.mark.parametrize('memo', [
+    # Verbs whose category depends on the object must not be guessed
+    "Run errands tomorrow",
+    "Run the dishwasher tonight",
+    "Book a car wash on Friday",
+])
+def test_ambiguous_verbs_fall_back_to_claude(extractor, memo):
+    assert extractor.try_extract(memo) is None
+
+
+@pytest.mark.parametrize('memo, category', [
+    ("Go for a run tomorrow", 'health'),
+    ("Book a trip to Rome", 'travel'),
+    ("Book flights to Denver next week", 'travel'),
+])
+def test_unambiguous_phrasings_still_match(extractor, memo, category):
+    result = extractor.try_extract(memo)
+    assert result is not None
+    assert [task['category'] for task in result['tasks']] == [category]
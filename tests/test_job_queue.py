@@ -0,0 +1,97 @@
+"""Tests for the durable job queue"""
+import pytest
+
+from src.job_queue import JobQueue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.db"))
+    yield queue
+    queue.close()
+
+
+def test_claim_takes_jobs_oldest_first(queue):
+    first = queue.submit('audio', '/memos/a.m4a', name='a')
+    second = queue.submit('transcript', 'Buy milk', name='b')
+
+    job = queue.claim('w1')
+    assert job['id'] == first
+    assert job['status'] == 'running'
+    assert job['worker'] == 'w1'
+    assert job['attempts'] == 1
+    assert queue.claim('w2')['id'] == second
+    assert queue.claim('w3') is None
+
+
+def test_claimed_jobs_are_not_handed_out_twice(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    producer, worker_a, worker_b = JobQueue(path), JobQueue(path), JobQueue(path)
+    for i in range(10):
+        producer.submit('transcript', f"memo {i}")
+
+    claimed = []
+    while True:
+        progress = False
+        for worker, name in ((worker_a, 'a'), (worker_b, 'b')):
+            job = worker.claim(name)
+            if job is not None:
+                claimed.append(job['id'])
+                progress = True
+        if not progress:
+            break
+    assert sorted(claimed) == sorted(set(claimed))
+    assert len(claimed) == 10
+    for q in (producer, worker_a, worker_b):
+        q.close()
+
+
+def test_unknown_kind_is_rejected(queue):
+    with pytest.raises(ValueError):
+        queue.submit('video', '/memos/a.m4v')
+
+
+def test_complete_and_fail_record_outcomes(queue):
+    done = queue.submit('transcript', 'one')
+    failed = queue.submit('transcript', 'two')
+    queue.claim('w')
+    queue.claim('w')
+    queue.complete(done, result='output/one.json')
+    queue.fail(failed, 'boom')
+
+    assert queue.get(done)['result'] == 'output/one.json'
+    assert queue.get(failed)['error'] == 'boom'
+    assert queue.counts() == {'queued': 0, 'running': 0, 'done': 1, 'failed': 1}
+
+
+def test_requeue_running_only_touches_the_given_worker(queue):
+    mine = queue.submit('audio', '/memos/a.m4a')
+    theirs = queue.submit('audio', '/memos/b.m4a')
+    queue.claim('crashed')
+    queue.claim('alive')
+
+    assert queue.requeue_running(worker='crashed') == 1
+    assert queue.get(mine)['status'] == 'queued'
+    assert queue.get(mine)['worker'] is None
+    assert queue.get(theirs)['status'] == 'running'
+    assert queue.active_payloads('audio') == {'/memos/a.m4a', '/memos/b.m4a'}
+
+    job = queue.claim('restarted')
+    assert job['id'] == mine
+    assert job['attempts'] == 2
+
+
+def test_jobs_interrupted_max_attempts_times_are_failed(queue):
+    job_id = queue.submit('audio', '/memos/crash.m4a')
+    for _ in range(2):
+        queue.claim('w')
+        assert queue.requeue_running(max_attempts=3) == 1
+
+    queue.claim('w')
+    assert queue.requeue_running(max_attempts=3) == 0
+    job = queue.get(job_id)
+    assert job['status'] == 'failed'
+    assert job['attempts'] == 3
+    assert job['error'] == 'Interrupted too many times'
+    assert queue.claim('w') is None
+    assert queue.active_payloads('audio') == set()
@@ -0,0 +1,55 @@
+"""Tests for the metrics registry"""
+import gc
+import weakref
+
+from src.metrics import Metrics
+
+
+def _counter(metrics, name):
+    return sum(sample['value'] for sample in metrics.snapshot()['counters'] if sample['name'] == name)
+
+
+class _Component:
+    def __init__(self, hits):
+        self.hits = hits
+
+    def collect(self):
+        return [('lookups_total', 'counter', {}, self.hits), ('open', 'gauge', {}, 1)]
+
+
+def test_collectors_with_the_same_counter_add_up():
+    metrics = Metrics()
+    metrics.add_collector(_Component(2).collect)
+    metrics.add_collector(_Component(3).collect)
+    assert _counter(metrics, 'lookups_total') == 5
+
+
+def test_removed_collector_keeps_its_counts_and_is_released():
+    metrics = Metrics()
+    component = _Component(4)
+    metrics.add_collector(component.collect)
+    metrics.remove_collector(component.collect)
+    metrics.remove_collector(component.collect)  # closing twice is harmless
+
+    reference = weakref.ref(component)
+    del component
+    gc.collect()
+    assert reference() is None
+    assert _counter(metrics, 'lookups_total') == 4
+    assert metrics.snapshot()['gauges'] == []
+
+
+def test_deltas_are_not_counted_twice_across_removal():
+    worker, parent = Metrics(), Metrics()
+    component = _Component(1)
+    worker.add_collector(component.collect)
+    worker.inc('jobs_total')
+    parent.merge(worker.take_delta())
+
+    component.hits = 3
+    worker.remove_collector(component.collect)
+    parent.merge(worker.take_delta())
+    parent.merge(worker.take_delta())
+
+    assert _counter(parent, 'lookups_total') == 3
+    assert _counter(parent, 'jobs_total') == 1
@@ -0,0 +1,34 @@
+"""Tests for the typed Task and Reminder models"""
+import json
+
+import pytest
+
+from src.models import Reminder, Task, parse_tasks, render_reminders
+
+
+@pytest.mark.parametrize('reminders', [
+    [],
+    [Reminder("Buy milk", "tomorrow", "shopping", "low")],
+    [Reminder("Café with Zoë 🎉", None, "social", "high")],
+    [Reminder('Reply to "urgent" email\\backslash', "Friday at 2pm", "work", "urgent")],
+    [Reminder("Line one\nline two\ttabbed", "next\nweek", "home sep", "medium")],
+    [Reminder("Pay rent", None), Reminder("Call \x00 mom", "Sunday", "family", "medium")],
+])
+def test_render_reminders_round_trips(reminders):
+    rendered = render_reminders(reminders)
+    assert [Reminder.from_dict(item) for item in json.loads(rendered)['reminders']] == reminders
+
+
+def test_from_dict_strips_priority():
+    reminder = Reminder.from_dict({"title": "Book flights", "priority": "  High \n"})
+    assert reminder.priority == 'high'
+
+
+def test_from_dict_reads_priority_from_notes():
+    reminder = Reminder.from_dict({"title": "Book flights", "notes": "Category: travel\nPriority:  urgent "})
+    assert (reminder.category, reminder.priority) == ('travel', 'urgent')
+
+
+def test_parse_tasks_applies_defaults():
+    tasks = parse_tasks({"tasks": [{"description": "  ", "priority": "asap"}, "not a task"]})
+    assert tasks == [Task("Untitled task", "medium", "general", None)]
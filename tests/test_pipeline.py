@@ -0,0 +1,67 @@
+"""Tests for the staged pipeline"""
+import random
+import threading
+import time
+
+import pytest
+
+from src.pipeline import Stage, StagedPipeline
+
+
+def _jitter(value):
+    time.sleep(random.random() * 0.005)
+    return value
+
+
+def test_results_come_back_in_input_order():
+    pipeline = StagedPipeline([
+        Stage('double', lambda n: _jitter(n * 2), workers=4),
+        Stage('inc', lambda n: _jitter(n + 1), workers=3),
+    ], queue_size=2)
+    assert pipeline.run(range(50)) == [n * 2 + 1 for n in range(50)]
+
+
+def test_ordered_stage_sees_jobs_in_input_order():
+    seen = []
+    pipeline = StagedPipeline([
+        Stage('slow', _jitter, workers=4),
+        Stage('write', lambda n: seen.append(n) or n, workers=1, ordered=True),
+    ])
+    pipeline.run(range(30))
+    assert seen == list(range(30))
+
+
+def test_failed_job_is_none_and_skips_later_stages():
+    downstream = []
+
+    def fail_on_three(n):
+        if n == 3:
+            raise RuntimeError("boom")
+        return n
+
+    def drop_five(n):
+        # Returning None also marks a job as failed
+        return None if n == 5 else n
+
+    pipeline = StagedPipeline([
+        Stage('first', fail_on_three, workers=2),
+        Stage('second', drop_five, workers=2),
+        Stage('last', lambda n: downstream.append(n) or n, workers=1, ordered=True),
+    ])
+    results = pipeline.run(range(8))
+    assert results == [0, 1, 2, None, 4, None, 6, 7]
+    assert downstream == [0, 1, 2, 4, 6, 7]
+
+
+def test_workers_shut_down_after_the_run():
+    pipeline = StagedPipeline([Stage('a', _jitter, workers=3), Stage('b', _jitter, workers=2, ordered=True)])
+    assert pipeline.run([]) == []
+    assert pipeline.run(range(5)) == list(range(5))
+    assert not [t for t in threading.enumerate() if t.name.startswith('pipeline-')]
+
+
+def test_stage_needs_a_worker():
+    with pytest.raises(ValueError):
+        Stage('none', _jitter, workers=0)
+    with pytest.raises(ValueError):
+        StagedPipeline([])
@@ -0,0 +1,126 @@
+"""Tests for the token buckets, Retry-After parsing and retry policy"""
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from types import SimpleNamespace
+
+import httplib2
+import pytest
+from googleapiclient.errors import HttpError
+
+from src import rate_limiter
+from src.rate_limiter import RateLimiter, RetryPolicy, TokenBucket, is_retriable_error, retry_after
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Frozen monotonic clock; sleeping advances it instead of blocking"""
+    state = SimpleNamespace(now=1000.0, slept=[])
+
+    def sleep(seconds):
+        state.slept.append(seconds)
+        state.now += seconds
+
+    monkeypatch.setattr(rate_limiter.time, 'monotonic', lambda: state.now)
+    monkeypatch.setattr(rate_limiter.time, 'sleep', sleep)
+    return state
+
+
+def test_bucket_serves_a_burst_then_goes_into_debt(clock):
+    bucket = TokenBucket(60)  # one per second, burst of 60
+    assert bucket.reserve(60) == 0.0
+    # Each further caller waits behind the ones already in debt
+    assert bucket.reserve(1) == pytest.approx(1.0)
+    assert bucket.reserve(1) == pytest.approx(2.0)
+
+
+def test_bucket_refills_and_caps_at_capacity(clock):
+    bucket = TokenBucket(60, capacity=10)
+    bucket.reserve(10)
+    clock.now += 5
+    assert bucket.reserve(5) == 0.0
+    clock.now += 3600
+    assert bucket.reserve(10) == 0.0
+    assert bucket.reserve(1) == pytest.approx(1.0)
+
+
+def test_adjust_pays_back_an_overestimate(clock):
+    bucket = TokenBucket(60)
+    bucket.reserve(90)  # estimate put the bucket 30 in debt
+    bucket.adjust(40)   # the call used 40 fewer than estimated
+    assert bucket.reserve(10) == 0.0
+
+
+def test_limiter_waits_for_the_slower_bucket_and_pauses(clock):
+    limiter = RateLimiter(requests_per_minute=600, tokens_per_minute=60, name='test')
+    assert limiter.acquire(tokens=60) == 0.0
+    assert limiter.acquire(tokens=30) == pytest.approx(30.0)
+    assert limiter.waits == 1
+
+    limiter.pause(10)
+    assert limiter.acquire() == pytest.approx(10.0)
+
+
+def _http_error(status, headers=None):
+    return SimpleNamespace(resp=httplib2.Response(dict(headers or {}, status=status)))
+
+
+def test_retry_after_reads_seconds_from_sdk_and_httplib2_errors():
+    sdk_error = SimpleNamespace(response=SimpleNamespace(headers={'retry-after': '7'}))
+    assert retry_after(sdk_error) == 7.0
+    assert retry_after(_http_error(429, {'retry-after': '2.5'})) == 2.5
+
+
+def test_retry_after_parses_http_dates():
+    when = datetime.now(timezone.utc) + timedelta(seconds=30)
+    error = _http_error(503, {'retry-after': format_datetime(when, usegmt=True)})
+    assert 25 <= retry_after(error) <= 30
+
+    past = format_datetime(datetime.now(timezone.utc) - timedelta(minutes=5), usegmt=True)
+    assert retry_after(_http_error(503, {'retry-after': past})) == 0.0
+
+
+def test_retry_after_ignores_missing_or_garbled_headers():
+    assert retry_after(ValueError("boom")) is None
+    assert retry_after(_http_error(429)) is None
+    assert retry_after(_http_error(429, {'retry-after': 'soon'})) is None
+
+
+def test_retriable_errors():
+    assert is_retriable_error(_http_error(429))
+    assert is_retriable_error(SimpleNamespace(status_code=529))
+    assert is_retriable_error(ConnectionError())
+    assert not is_retriable_error(_http_error(404))
+    assert not is_retriable_error(_http_error(403))
+    assert not is_retriable_error(ValueError())
+
+
+def test_policy_honours_retry_after_then_gives_up(clock):
+    limiter = RateLimiter(requests_per_minute=600, name='test')
+    policy = RetryPolicy(limiter=limiter, max_retries=2, base_delay=0.001)
+    throttled = HttpError(httplib2.Response({'status': 429, 'retry-after': '5'}), b'')
+    attempts = []
+
+    def call():
+        attempts.append(clock.now)
+        raise throttled
+
+    with pytest.raises(HttpError) as raised:
+        policy.call(call)
+    assert raised.value is throttled
+    assert len(attempts) == 3
+    assert policy.retries == 2
+    assert attempts[1] - attempts[0] >= 5
+
+
+def test_policy_does_not_retry_client_errors(clock):
+    policy = RetryPolicy(max_retries=3)
+    calls = []
+
+    def call():
+        calls.append(1)
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        policy.call(call)
+    assert len(calls) == 1
+    assert clock.slept == []
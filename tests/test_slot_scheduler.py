@@ -0,0 +1,64 @@
+"""Tests for free/busy-aware slot scheduling"""
+from datetime import date, datetime, timedelta
+
+from src.calendar_manager import _day_runs
+from src.slot_scheduler import BusyIntervals, SlotScheduler
+
+DAY = date(2026, 10, 19)  # a Monday
+
+
+def at(hour, minute=0, day=DAY):
+    return datetime.combine(day, datetime.min.time()) + timedelta(hours=hour, minutes=minute)
+
+
+def test_busy_intervals_merge_overlapping_and_touching_blocks():
+    busy = BusyIntervals([(at(10), at(11)), (at(9), at(10)), (at(10, 30), at(12)), (at(14), at(15))])
+    assert list(busy) == [(at(9), at(12)), (at(14), at(15))]
+
+
+def test_task_goes_into_the_first_gap_that_fits():
+    scheduler = SlotScheduler([(at(9), at(10)), (at(10, 30), at(12))])
+    # 30 minutes fits between the meetings, an hour does not
+    assert scheduler.place(DAY, 30) == at(10)
+    assert scheduler.place(DAY, 60) == at(12)
+
+
+def test_full_day_spills_to_the_next_day():
+    scheduler = SlotScheduler([(at(9), at(18))])
+    assert scheduler.place(DAY, 60) == at(9, day=DAY + timedelta(days=1))
+
+
+def test_every_day_full_falls_back_to_the_due_date():
+    busy = [(at(9, day=DAY + timedelta(days=n)), at(18, day=DAY + timedelta(days=n))) for n in range(3)]
+    scheduler = SlotScheduler(busy, max_spill_days=2)
+    assert scheduler.place(DAY, 30) == at(9)
+
+
+def test_nothing_is_placed_before_now():
+    scheduler = SlotScheduler(not_before=at(13, 17))
+    assert scheduler.place(DAY, 30) == at(13, 17)
+
+
+def test_fixed_times_are_kept_and_block_flexible_tasks():
+    scheduler = SlotScheduler()
+    starts = scheduler.schedule([
+        {'day': DAY, 'duration': 60, 'priority': 'medium'},
+        {'day': DAY, 'duration': 60, 'priority': 'low', 'fixed_start': at(9)},
+    ])
+    assert starts == [at(10), at(9)]
+
+
+def test_urgent_tasks_are_placed_first():
+    scheduler = SlotScheduler()
+    starts = scheduler.schedule([
+        {'day': DAY, 'duration': 30, 'priority': 'low'},
+        {'day': DAY, 'duration': 30, 'priority': 'urgent'},
+        {'day': DAY, 'duration': 30, 'priority': 'high'},
+    ])
+    assert starts == [at(10), at(9), at(9, 30)]
+
+
+def test_day_runs_groups_consecutive_days():
+    days = [DAY, DAY + timedelta(days=1), DAY + timedelta(days=3)]
+    assert _day_runs(days) == [(DAY, DAY + timedelta(days=1)), (DAY + timedelta(days=3),) * 2]
+    assert _day_runs([]) == []